@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, SpecialistProfile, Task, TaskResponse
+from .models import User, SpecialistProfile, Task, TaskResponse, ArchivedTask
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -23,3 +23,8 @@ class TaskAdmin(admin.ModelAdmin):
 @admin.register(TaskResponse)
 class ResponseAdmin(admin.ModelAdmin):
     list_display = ('task', 'specialist', 'price')
+
+@admin.register(ArchivedTask)
+class ArchivedTaskAdmin(admin.ModelAdmin):
+    list_display = ('title', 'client', 'category', 'status', 'created_at', 'archived_at')
+    list_filter = ('status', 'category')
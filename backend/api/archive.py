@@ -0,0 +1,87 @@
+"""
+Hot/cold archival of finished tasks.
+
+COMPLETED and CANCELED tasks that finished more than TASK_ARCHIVE_AFTER_DAYS
+ago (Task.finished_at) are copied,
+with their responses, into ArchivedTask / ArchivedTaskResponse and removed
+from the hot tables, TASK_ARCHIVE_BATCH_SIZE tasks per transaction. That
+keeps Task, TaskResponse and their indexes sized to the live marketplace.
+Archived rows keep their ids: messages and reviews still carry the same
+task_id (see SET_NULL_UNLESS_ARCHIVED) and detail endpoints fall back to
+the archive when the hot row is gone.
+
+The hot rows are removed with raw deletes, so none of the per-row
+post_delete handlers run (response counters, chat rules, catalog version);
+the caches they maintain are dropped once per batch instead.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .catalog import bump_catalog_version
+from .chat_rules import invalidate_many_task_chat_rules
+from .models import ArchivedTask, ArchivedTaskResponse, ResponseNotification, Task, TaskResponse
+
+FINISHED_STATUSES = [Task.Status.COMPLETED, Task.Status.CANCELED]
+
+TASK_FIELDS = [
+    'id', 'client_id', 'assigned_specialist_id', 'title', 'description', 'category', 'budget',
+    'budget_min', 'budget_max', 'location', 'date_info', 'status', 'lat', 'lng', 'created_at',
+    'responses_count', 'finished_at',
+]
+RESPONSE_FIELDS = ['id', 'task_id', 'specialist_id', 'message', 'price', 'created_at']
+
+
+def archive_cutoff(days=None):
+    if days is None:
+        days = getattr(settings, 'TASK_ARCHIVE_AFTER_DAYS', 180)
+    return timezone.now() - timedelta(days=days)
+
+
+def _archive_batch(cutoff, batch_size):
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(status__in=FINISHED_STATUSES, finished_at__lt=cutoff)
+            .order_by('id')
+            .values(*TASK_FIELDS)[:batch_size]
+        )
+        if not tasks:
+            return 0
+        task_ids = [task['id'] for task in tasks]
+        responses = list(TaskResponse.objects.filter(task_id__in=task_ids).values(*RESPONSE_FIELDS))
+
+        ArchivedTask.objects.bulk_create([ArchivedTask(**task) for task in tasks], ignore_conflicts=True)
+        ArchivedTaskResponse.objects.bulk_create(
+            [ArchivedTaskResponse(**response) for response in responses], ignore_conflicts=True,
+        )
+        # Children first, since raw deletes do not cascade; messages and reviews keep their task_id
+        response_ids = [response['id'] for response in responses]
+        for queryset in (
+            ResponseNotification.objects.filter(response_id__in=response_ids),
+            TaskResponse.objects.filter(id__in=response_ids),
+            Task.objects.filter(id__in=task_ids),
+        ):
+            queryset._raw_delete(queryset.db)
+        bump_catalog_version()
+        # Drop now, and again after commit in case a concurrent reader re-cached the old rules
+        invalidate_many_task_chat_rules(task_ids)
+        transaction.on_commit(lambda: invalidate_many_task_chat_rules(task_ids))
+    return len(task_ids)
+
+
+def archive_finished_tasks(days=None, batch_size=None, max_batches=None):
+    """Archive eligible tasks in bounded batches. Returns the number of tasks moved."""
+    cutoff = archive_cutoff(days)
+    batch_size = max(batch_size or getattr(settings, 'TASK_ARCHIVE_BATCH_SIZE', 500), 1)
+
+    archived = batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = _archive_batch(cutoff, batch_size)
+        archived += moved
+        batches += 1
+        if moved < batch_size:
+            break
+    return archived
@@ -9,13 +9,14 @@ from django.utils import timezone
 from rest_framework import status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.throttling import ScopedRateThrottle
 
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework_simplejwt.exceptions import TokenError
 
 from .models import EmailVerification, PasswordResetToken
+from .throttling import AtomicScopedRateThrottle
+from .ws_auth import revoke_access_token, revoke_user_tokens, stamp_revocation_generation
 from .serializers import (
     RegisterSerializer, UserSerializer, LoginSerializer,
     ForgotPasswordSerializer, ResetPasswordSerializer,
@@ -33,7 +34,7 @@ def generate_otp():
 
 def get_tokens_for_user(user):
     """Generate access and refresh tokens for a user."""
-    refresh = RefreshToken.for_user(user)
+    refresh = stamp_revocation_generation(RefreshToken.for_user(user), user.id)
     return {
         'access': str(refresh.access_token),
         'refresh': str(refresh),
@@ -49,7 +50,7 @@ class RegisterView(APIView):
     Creates inactive user, sends 6-digit OTP to email.
     """
     permission_classes = [permissions.AllowAny]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [AtomicScopedRateThrottle]
     throttle_scope = 'auth_register'
 
     def post(self, request):
@@ -121,7 +122,7 @@ class VerifyEmailView(APIView):
     Returns access + refresh tokens.
     """
     permission_classes = [permissions.AllowAny]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [AtomicScopedRateThrottle]
     throttle_scope = 'auth_verify_email'
 
     def post(self, request):
@@ -180,7 +181,7 @@ class ResendVerificationView(APIView):
     Re-sends OTP for email verification. Rate limited.
     """
     permission_classes = [permissions.AllowAny]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [AtomicScopedRateThrottle]
     throttle_scope = 'auth_resend_verification'
 
     def post(self, request):
@@ -237,7 +238,7 @@ class LoginView(APIView):
     Only works if user is active (email verified).
     """
     permission_classes = [permissions.AllowAny]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [AtomicScopedRateThrottle]
     throttle_scope = 'auth_login'
 
     def post(self, request):
@@ -299,7 +300,7 @@ class CustomTokenRefreshView(TokenRefreshView):
     Returns new access token (+ new refresh token due to rotation).
     Old refresh token is blacklisted automatically.
     """
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [AtomicScopedRateThrottle]
     throttle_scope = 'auth_refresh'
 
 
@@ -330,6 +331,10 @@ class LogoutView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        # Access tokens are not blacklisted by simplejwt; keep this one off the chat sockets
+        if isinstance(request.auth, AccessToken):
+            revoke_access_token(request.auth)
+
         return Response(
             {"message": "Вы успешно вышли."},
             status=status.HTTP_200_OK,
@@ -346,7 +351,7 @@ class ForgotPasswordView(APIView):
     Sends reset link with UUID token if user exists.
     """
     permission_classes = [permissions.AllowAny]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [AtomicScopedRateThrottle]
     throttle_scope = 'auth_forgot_password'
 
     def post(self, request):
@@ -399,7 +404,7 @@ class ResetPasswordView(APIView):
     Validates token, sets new password.
     """
     permission_classes = [permissions.AllowAny]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [AtomicScopedRateThrottle]
     throttle_scope = 'auth_reset_password'
 
     def post(self, request):
@@ -441,6 +446,7 @@ class ResetPasswordView(APIView):
                 BlacklistedToken.objects.get_or_create(token=outstanding)
         except Exception:
             pass  # If blacklist tables don't exist yet, skip
+        revoke_user_tokens(user.id)
 
         return Response(
             {"message": "Пароль успешно изменён. Войдите с новым паролем."},
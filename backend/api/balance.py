@@ -0,0 +1,51 @@
+"""
+Specialist balance ledger.
+
+Every balance change is a single conditional ``UPDATE ... SET balance =
+balance ± amount`` plus its Transaction row, inside one ``transaction.atomic``
+block. The database applies the arithmetic under the row lock, so
+concurrent debits never lose updates, and a debit that would take the
+balance below zero matches no row instead of overdrawing.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import SpecialistProfile, Transaction
+
+RESPONSE_FEE = Decimal(5000)  # UZS per task response
+
+
+class InsufficientFunds(Exception):
+    pass
+
+
+def debit(profile, amount, transaction_type, description=''):
+    """
+    Take ``amount`` from the profile's balance and record a SUCCESS ledger row.
+    Raises InsufficientFunds, leaving everything untouched, if the balance is short.
+    """
+    amount = Decimal(amount)
+    with transaction.atomic():
+        updated = SpecialistProfile.objects.filter(pk=profile.pk, balance__gte=amount).update(
+            balance=F('balance') - amount
+        )
+        if not updated:
+            raise InsufficientFunds()
+        return Transaction.objects.create(
+            user_id=profile.user_id,
+            amount=amount,
+            transaction_type=transaction_type,
+            status=Transaction.Status.SUCCESS,
+            description=description,
+        )
+
+
+def credit(profile, amount):
+    """Add ``amount`` to the profile's balance (the caller owns the ledger row)."""
+    SpecialistProfile.objects.filter(pk=profile.pk).update(balance=F('balance') + Decimal(amount))
+
+
+def charge_response_fee(profile):
+    return debit(profile, RESPONSE_FEE, Transaction.Type.RESPONSE_FEE, "Оплата за отклик на задание")
@@ -0,0 +1,65 @@
+"""
+Parse the free-form Task.budget text into a numeric UZS range.
+
+Clients type things like "100 000 UZS", "от 50 000", "до 1,5 млн" or
+"200-300 тыс"; the AI assistant fills in "100 000 - 200 000 UZS".
+``parse_budget`` turns these into ``(budget_min, budget_max)`` so the task
+feed can filter on indexed integer columns. Open-ended "от X" has no upper
+bound (``budget_max`` is None), "до X" starts at 0, and text without a
+number parses to ``(None, None)``.
+
+Migration 0016 keeps its own frozen copy of this parser for its backfill.
+"""
+import re
+
+MAX_BUDGET = 10 ** 12
+
+_MULTIPLIERS = {
+    'млрд': 10 ** 9,
+    'млн': 10 ** 6, 'mln': 10 ** 6, 'm': 10 ** 6,
+    'тыс': 10 ** 3, 'т': 10 ** 3, 'к': 10 ** 3, 'k': 10 ** 3,
+}
+_NUMBER_RE = re.compile(
+    r'(?P<int>\d{1,3}(?:[ \u00a0\u202f]\d{3})+|\d+)'
+    r'(?:[.,](?P<frac>\d+))?'
+    r'\s*(?P<unit>млрд|млн|mln|тыс|т|к|k|m)?(?![^\W\d_])'
+)
+_FROM_RE = re.compile(r'\b(?:от|from)\b')
+_TO_RE = re.compile(r'\b(?:до|to)\b')
+
+
+def _amount(match):
+    whole = re.sub(r'\D', '', match.group('int'))
+    frac = match.group('frac') or ''
+    unit = match.group('unit')
+    if frac and not unit and len(frac) == 3:
+        # "100.000" / "100,000" is a thousands separator, not a fraction
+        whole, frac = whole + frac, ''
+    value = float(f'{whole}.{frac or 0}') * _MULTIPLIERS.get(unit, 1)
+    return int(round(value))
+
+
+def parse_budget(text):
+    """Return ``(budget_min, budget_max)`` in UZS for a budget string."""
+    text = (text or '').casefold()
+    matches = list(_NUMBER_RE.finditer(text))
+    if not matches:
+        return None, None
+
+    amounts = [_amount(match) for match in matches[:2]]
+    if len(amounts) == 2 and matches[1].group('unit') and not matches[0].group('unit'):
+        # "200-300 тыс": the unit written once applies to both ends
+        amounts[0] *= _MULTIPLIERS[matches[1].group('unit')]
+    if any(amount > MAX_BUDGET for amount in amounts):
+        return None, None
+
+    if len(amounts) == 2:
+        low, high = sorted(amounts)
+        return low, high
+    amount = amounts[0]
+    before = text[:matches[0].start()]
+    if _TO_RE.search(before):
+        return 0, amount
+    if _FROM_RE.search(before):
+        return amount, None
+    return amount, amount
@@ -0,0 +1,113 @@
+"""
+Versioned snapshots of the public (anonymous) catalog responses.
+
+Anonymous GETs of the specialist and task lists are identical for every
+visitor, so the rendered JSON is stored in the cache under the current
+catalog version together with a strong ETag. Any change to a profile,
+user, task or response bumps the version (see the receivers in models.py),
+which orphans every old snapshot at once. A client presenting a matching
+If-None-Match gets a 304 that never touches the database.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+
+def _snapshot_ttl():
+    return getattr(settings, 'CATALOG_SNAPSHOT_TTL', 300)
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so a flushed cache never reuses an old version number.
+        cache.add(CATALOG_VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def _bump():
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, int(time.time() * 1000), timeout=None)
+
+
+def bump_catalog_version():
+    """
+    Invalidate every snapshot. Bumped immediately and again after commit, so a
+    snapshot rebuilt from pre-commit data by a concurrent request is discarded too.
+    """
+    _bump()
+    transaction.on_commit(_bump)
+
+
+# Parameters every catalog list understands, on top of the viewset's own filters.
+COMMON_PARAMS = ('cursor', 'page_size', 'fields')
+
+
+def snapshot_key(resource, request, params=()):
+    """
+    Key for one rendered list. Only the whitelisted ``params`` take part, with
+    their values sorted, so junk or reordered query strings share one entry.
+    Host and path stay in the key because the pagination links embed them.
+    """
+    query = sorted(
+        (name, sorted(request.query_params.getlist(name)))
+        for name in {*params, *COMMON_PARAMS} if name in request.query_params
+    )
+    raw = f'{request.get_host()}{request.path}?{query!r}'
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    return f'catalog:{resource}:v{get_catalog_version()}:{digest}'
+
+
+def store_snapshot(key, data):
+    body = JSONRenderer().render(data)
+    snapshot = {'body': body, 'etag': f'"{hashlib.sha1(body).hexdigest()}"'}
+    cache.set(key, snapshot, timeout=_snapshot_ttl())
+    return snapshot
+
+
+def etag_matches(request, etag):
+    header = request.headers.get('If-None-Match', '')
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix('W/') for tag in header.split(',')}
+    return '*' in candidates or etag in candidates
+
+
+def snapshot_response(request, snapshot):
+    headers = {'ETag': snapshot['etag'], 'Cache-Control': 'public, no-cache', 'Vary': 'Authorization'}
+    if etag_matches(request, snapshot['etag']):
+        return HttpResponse(status=304, headers=headers)
+    return HttpResponse(snapshot['body'], content_type='application/json', headers=headers)
+
+
+class CatalogSnapshotMixin:
+    """
+    Serve anonymous ``list`` requests from the versioned catalog snapshot.
+    Set ``catalog_resource`` on the viewset and list the query parameters its
+    ``list`` honours in ``catalog_params``; anything else is left out of the key.
+    """
+    catalog_resource = None
+    catalog_params = ()
+
+    def list(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+
+        key = snapshot_key(self.catalog_resource, request, self.catalog_params)
+        snapshot = cache.get(key)
+        if snapshot is None:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            snapshot = store_snapshot(key, response.data)
+        return snapshot_response(request, snapshot)
@@ -1,4 +1,72 @@
-from .models import TaskResponse
+"""
+Who may chat with whom about a task.
+
+Task chat is allowed only between the task's client and specialists who
+responded to it. The rules for a task (client id plus responding
+specialist user ids) are cached together with positive receiver lookups,
+so a steady-state chat send needs no queries before its INSERT. The
+Task/TaskResponse signals in models.py call invalidate_task_chat_rules
+when a response is added or removed, the task changes owner or is deleted.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Task, TaskResponse, User
+
+RECEIVER_NOT_FOUND = 'RECEIVER_NOT_FOUND'
+TASK_NOT_FOUND = 'TASK_NOT_FOUND'
+TASK_CHAT_FORBIDDEN = 'TASK_CHAT_FORBIDDEN'
+
+
+def _ttl():
+    return max(getattr(settings, 'CHAT_RULES_CACHE_TTL_SECONDS', 300), 1)
+
+
+def _rules_key(task_id):
+    return f'chat_rules:task:{task_id}'
+
+
+def _user_key(user_id):
+    return f'chat_rules:user:{user_id}'
+
+
+def _load_task_rules(task_id):
+    client_id = Task.objects.filter(pk=task_id).values_list('client_id', flat=True).first()
+    if client_id is None:
+        return None
+    specialist_user_ids = list(
+        TaskResponse.objects.filter(task_id=task_id).values_list('specialist__user_id', flat=True)
+    )
+    return {'client_id': client_id, 'specialist_user_ids': specialist_user_ids}
+
+
+def task_chat_rules(task_id):
+    """``{'client_id', 'specialist_user_ids'}`` for a task, or None if it does not exist."""
+    rules = cache.get(_rules_key(task_id))
+    if rules is None:
+        rules = _load_task_rules(task_id)
+        if rules is not None:
+            cache.set(_rules_key(task_id), rules, timeout=_ttl())
+    return rules
+
+
+def invalidate_task_chat_rules(task_id):
+    cache.delete(_rules_key(task_id))
+
+
+def invalidate_many_task_chat_rules(task_ids):
+    cache.delete_many([_rules_key(task_id) for task_id in task_ids])
+
+
+def _pair_allowed(rules, sender_id, receiver_id):
+    if sender_id == receiver_id:
+        return False
+    specialist_user_ids = rules['specialist_user_ids']
+    client_id = rules['client_id']
+    return (
+        (sender_id == client_id and receiver_id in specialist_user_ids)
+        or (receiver_id == client_id and sender_id in specialist_user_ids)
+    )
 
 
 def is_task_chat_pair_allowed(task, sender_id: int, receiver_id: int) -> bool:
@@ -7,17 +75,31 @@ def is_task_chat_pair_allowed(task, sender_id: int, receiver_id: int) -> bool:
     - the task client, and
     - a specialist user who has already responded to this task.
     """
-    if sender_id == receiver_id:
-        return False
+    rules = task_chat_rules(task.id)
+    return rules is not None and _pair_allowed(rules, sender_id, receiver_id)
 
-    specialist_user_ids = set(
-        TaskResponse.objects.filter(task_id=task.id).values_list('specialist__user_id', flat=True)
-    )
-    if not specialist_user_ids:
-        return False
 
-    client_id = task.client_id
-    return (
-        (sender_id == client_id and receiver_id in specialist_user_ids)
-        or (receiver_id == client_id and sender_id in specialist_user_ids)
-    )
+def check_chat_send(sender_id, receiver_id, task_id=None):
+    """
+    Validate a chat send from cached state. Returns None when allowed,
+    otherwise one of RECEIVER_NOT_FOUND, TASK_NOT_FOUND, TASK_CHAT_FORBIDDEN.
+    """
+    keys = [_user_key(receiver_id)]
+    if task_id is not None:
+        keys.append(_rules_key(task_id))
+    cached = cache.get_many(keys)
+
+    if _user_key(receiver_id) not in cached:
+        if not User.objects.filter(pk=receiver_id).exists():
+            return RECEIVER_NOT_FOUND
+        # Only hits are cached; a deleted receiver is still rejected by the FK on insert
+        cache.set(_user_key(receiver_id), True, timeout=_ttl())
+
+    if task_id is None:
+        return None
+    rules = cached.get(_rules_key(task_id)) or task_chat_rules(task_id)
+    if rules is None:
+        return TASK_NOT_FOUND
+    if not _pair_allowed(rules, sender_id, receiver_id):
+        return TASK_CHAT_FORBIDDEN
+    return None
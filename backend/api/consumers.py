@@ -1,46 +1,25 @@
 import json
+import math
 from urllib.parse import parse_qs
 
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from django.conf import settings
-from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
-from django.core.cache import cache
-from rest_framework_simplejwt.tokens import AccessToken
 
-from .chat_rules import is_task_chat_pair_allowed
-from .models import Message, Task
+from .chat_rules import RECEIVER_NOT_FOUND, TASK_CHAT_FORBIDDEN, TASK_NOT_FOUND, check_chat_send
+from .conversations import mark_read, read_receipt_event
+from .models import Message, ServiceCategory, SpecialistProfile
+from .rate_limit import ahit
+from .task_feed import category_group
+from .ws_auth import authenticate_ws_token
 
-User = get_user_model()
 CHAT_WS_RATE_LIMIT = max(getattr(settings, 'CHAT_WS_RATE_LIMIT', 30), 1)
 CHAT_WS_RATE_WINDOW_SECONDS = max(getattr(settings, 'CHAT_WS_RATE_WINDOW_SECONDS', 10), 1)
+# Read receipts are cheap but each one is an UPDATE and two group sends, so they get their own budget
+CHAT_WS_READ_RATE_LIMIT = max(getattr(settings, 'CHAT_WS_READ_RATE_LIMIT', 60), 1)
 CHAT_WS_MAX_TEXT_LENGTH = max(getattr(settings, 'CHAT_WS_MAX_TEXT_LENGTH', 2000), 1)
 
-@database_sync_to_async
-def get_user_from_token(token_string):
-    try:
-        access_token = AccessToken(token_string)
-        user_id = access_token['user_id']
-        return User.objects.get(id=user_id)
-    except Exception:
-        return AnonymousUser()
-
-@database_sync_to_async
-def is_ws_rate_limited(user_id):
-    key = f"chat_ws_rate:{user_id}"
-    count = cache.get(key)
-    if count is None:
-        cache.set(key, 1, timeout=CHAT_WS_RATE_WINDOW_SECONDS)
-        return False
-    if int(count) >= CHAT_WS_RATE_LIMIT:
-        return True
-    try:
-        cache.incr(key)
-    except ValueError:
-        cache.set(key, int(count) + 1, timeout=CHAT_WS_RATE_WINDOW_SECONDS)
-    return False
-
 @database_sync_to_async
 def create_message(sender, receiver_id, task_id, text):
     cleaned_text = (text or '').strip()
@@ -57,32 +36,31 @@ def create_message(sender, receiver_id, task_id, text):
     if receiver_id == sender.id:
         return {'error': 'SELF_MESSAGE', 'detail': 'Cannot send messages to yourself.'}
 
-    try:
-        receiver = User.objects.get(id=receiver_id)
-    except User.DoesNotExist:
-        return {'error': 'RECEIVER_NOT_FOUND', 'detail': 'Receiver does not exist.'}
-
-    task = None
-    if task_id not in (None, ''):
+    if task_id in (None, ''):
+        task_id = None
+    else:
         try:
             task_id = int(task_id)
         except (TypeError, ValueError):
             return {'error': 'INVALID_TASK', 'detail': 'task_id must be an integer.'}
-        try:
-            task = Task.objects.get(id=task_id)
-        except Task.DoesNotExist:
-            return {'error': 'TASK_NOT_FOUND', 'detail': 'Task does not exist.'}
-        if not is_task_chat_pair_allowed(task, sender.id, receiver.id):
-            return {
-                'error': 'TASK_CHAT_FORBIDDEN',
-                'detail': 'Chat for this task is allowed only between client and responding specialist.',
-            }
+
+    # Receiver and task rules come from cache (api/chat_rules.py): steady state is just the INSERT
+    denied = check_chat_send(sender.id, receiver_id, task_id)
+    if denied == RECEIVER_NOT_FOUND:
+        return {'error': denied, 'detail': 'Receiver does not exist.'}
+    if denied == TASK_NOT_FOUND:
+        return {'error': denied, 'detail': 'Task does not exist.'}
+    if denied == TASK_CHAT_FORBIDDEN:
+        return {
+            'error': denied,
+            'detail': 'Chat for this task is allowed only between client and responding specialist.',
+        }
 
     try:
         msg = Message.objects.create(
-            sender=sender,
-            receiver=receiver,
-            task=task,
+            sender_id=sender.id,
+            receiver_id=receiver_id,
+            task_id=task_id,
             text=cleaned_text
         )
     except Exception:
@@ -91,14 +69,18 @@ def create_message(sender, receiver_id, task_id, text):
     return {
         'message': {
             'id': msg.id,
-            'sender_id': msg.sender.id,
-            'receiver_id': msg.receiver.id,
-            'task_id': msg.task.id if msg.task else None,
+            'sender_id': msg.sender_id,
+            'receiver_id': msg.receiver_id,
+            'task_id': msg.task_id,
             'text': msg.text,
             'created_at': msg.created_at.isoformat(),
         }
     }
 
+@database_sync_to_async
+def mark_conversation_read(reader_id, counterpart_id, up_to):
+    return mark_read(reader_id, counterpart_id, up_to)
+
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.user = AnonymousUser()
@@ -106,7 +88,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
         token = (parse_qs(query_string).get('token') or [None])[0]
                 
         if token:
-            self.user = await get_user_from_token(token)
+            self.user = await authenticate_ws_token(token)
 
         if isinstance(self.user, AnonymousUser) or not self.user.is_authenticated:
             await self.close()
@@ -134,12 +116,18 @@ class ChatConsumer(AsyncWebsocketConsumer):
         try:
             data = json.loads(text_data)
         except json.JSONDecodeError:
+            data = None
+        if not isinstance(data, dict):
             await self.send(text_data=json.dumps({
                 'error': 'INVALID_JSON',
                 'detail': 'Invalid JSON payload.',
             }))
             return
 
+        if data.get('action') == 'read':
+            await self.receive_read(data)
+            return
+
         receiver_id = data.get('receiver_id')
         task_id = data.get('task_id')
         text = data.get('text')
@@ -151,12 +139,7 @@ class ChatConsumer(AsyncWebsocketConsumer):
             }))
             return
 
-        if await is_ws_rate_limited(self.user.id):
-            await self.send(text_data=json.dumps({
-                'error': 'RATE_LIMITED',
-                'detail': 'Too many messages. Slow down.',
-                'retry_after_seconds': CHAT_WS_RATE_WINDOW_SECONDS,
-            }))
+        if not await self.check_rate(f"chat_ws:{self.user.id}", CHAT_WS_RATE_LIMIT):
             return
 
         result = await create_message(self.user, receiver_id, task_id, text)
@@ -183,6 +166,37 @@ class ChatConsumer(AsyncWebsocketConsumer):
             }
         )
 
+    async def check_rate(self, key, limit):
+        allowed, retry_after = await ahit(key, limit, CHAT_WS_RATE_WINDOW_SECONDS)
+        if not allowed:
+            await self.send(text_data=json.dumps({
+                'error': 'RATE_LIMITED',
+                'detail': 'Too many messages. Slow down.',
+                'retry_after_seconds': math.ceil(retry_after),
+            }))
+        return allowed
+
+    # {"action": "read", "counterpart_id": ..., "up_to": ...}: bulk read receipt
+    async def receive_read(self, data):
+        try:
+            counterpart_id = int(data.get('counterpart_id'))
+            up_to = int(data.get('up_to'))
+        except (TypeError, ValueError):
+            await self.send(text_data=json.dumps({
+                'error': 'INVALID_READ',
+                'detail': 'counterpart_id and up_to must be integers.',
+            }))
+            return
+
+        if not await self.check_rate(f"chat_ws_read:{self.user.id}", CHAT_WS_READ_RATE_LIMIT):
+            return
+        updated, _ = await mark_conversation_read(self.user.id, counterpart_id, up_to)
+        if not updated:
+            return
+        event = read_receipt_event(self.user.id, counterpart_id, up_to)
+        await self.channel_layer.group_send(f"user_{counterpart_id}", event)
+        await self.channel_layer.group_send(self.user_group_name, event)
+
     # Receive message from room group
     async def chat_message(self, event):
         message = event['message']
@@ -191,3 +205,105 @@ class ChatConsumer(AsyncWebsocketConsumer):
         await self.send(text_data=json.dumps({
             'message': message
         }))
+
+    # Messages up to read['up_to'] were read by read['reader_id']
+    async def chat_read(self, event):
+        await self.send(text_data=json.dumps({
+            'read': event['read']
+        }))
+
+    # A newly created task matched this specialist (api/matching.py)
+    async def task_matched(self, event):
+        await self.send(text_data=json.dumps({
+            'task_match': event['task']
+        }))
+
+
+@database_sync_to_async
+def has_specialist_profile(user_id):
+    return SpecialistProfile.objects.filter(user_id=user_id).exists()
+
+
+class TaskFeedConsumer(AsyncWebsocketConsumer):
+    """
+    Live task feed: ``{"action": "subscribe", "categories": [...]}`` joins the
+    per-category groups (all categories when the list is omitted) and
+    ``"unsubscribe"`` leaves them. New OPEN tasks, status changes and
+    deletions arrive as ``{"event": ..., "task": {...}}``. Only accounts with
+    a specialist profile may connect.
+    """
+
+    async def connect(self):
+        self.user = AnonymousUser()
+        self.groups_joined = set()
+        query_string = self.scope.get('query_string', b'').decode('utf-8')
+        token = (parse_qs(query_string).get('token') or [None])[0]
+
+        if token:
+            self.user = await authenticate_ws_token(token)
+
+        # The feed is for specialists, like the REST endpoints that act on their profile
+        if not self.user.is_authenticated or not await has_specialist_profile(self.user.id):
+            await self.close()
+            return
+
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        for group in getattr(self, 'groups_joined', ()):
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def receive(self, text_data):
+        try:
+            data = json.loads(text_data)
+        except json.JSONDecodeError:
+            data = None
+        if not isinstance(data, dict):
+            await self.send(text_data=json.dumps({
+                'error': 'INVALID_JSON',
+                'detail': 'Invalid JSON payload.',
+            }))
+            return
+
+        action = data.get('action') if isinstance(data, dict) else None
+        if action not in ('subscribe', 'unsubscribe'):
+            await self.send(text_data=json.dumps({
+                'error': 'INVALID_ACTION',
+                'detail': 'action must be "subscribe" or "unsubscribe".',
+            }))
+            return
+
+        categories = data.get('categories')
+        if categories is None:
+            categories = ServiceCategory.values
+        if not isinstance(categories, list):
+            categories = [categories]
+        groups = {category_group(category) for category in categories if isinstance(category, str)}
+        if None in groups or not groups:
+            await self.send(text_data=json.dumps({
+                'error': 'INVALID_CATEGORY',
+                'detail': 'categories must be a list of known service categories.',
+            }))
+            return
+
+        if action == 'subscribe':
+            for group in groups - self.groups_joined:
+                await self.channel_layer.group_add(group, self.channel_name)
+            self.groups_joined |= groups
+        else:
+            for group in groups & self.groups_joined:
+                await self.channel_layer.group_discard(group, self.channel_name)
+            self.groups_joined -= groups
+
+        await self.send(text_data=json.dumps({
+            'subscribed': sorted(
+                category.value for category in ServiceCategory if category_group(category.value) in self.groups_joined
+            ),
+        }))
+
+    # A task in a subscribed category was created, changed status or was deleted (api/task_feed.py)
+    async def task_feed_event(self, event):
+        await self.send(text_data=json.dumps({
+            'event': event['event'],
+            'task': event['task'],
+        }))
@@ -0,0 +1,158 @@
+"""
+Denormalized conversation list.
+
+Each message touches two Conversation rows, one per participant, with a
+single UPDATE each (creating the row on first contact). The list endpoint
+then reads one indexed row per counterpart instead of the whole message
+history. Unread counts are recounted for the pair whenever messages are
+marked read; bulk "read up to message N" receipts (mark_read) are a single
+UPDATE and are pushed to both participants over the chat socket.
+
+A single conversation's history is loaded newest first in pages, each
+page being one range scan per direction on the (sender, receiver,
+created_at) and (receiver, sender, created_at) indexes.
+"""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Max, Q, Value, When
+from django.db.models.functions import Greatest
+
+from .models import Conversation, Message
+
+logger = logging.getLogger(__name__)
+
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 200
+
+
+def _touch(owner_id, counterpart_id, message, unread_delta):
+    rows = Conversation.objects.filter(owner_id=owner_id, counterpart_id=counterpart_id)
+    # Concurrent inserts may land out of order; never move last_message backwards
+    updated = rows.update(
+        last_message_id=Case(
+            When(last_message_id__gt=message.id, then=F('last_message_id')),
+            default=Value(message.id),
+        ),
+        updated_at=Greatest(F('updated_at'), Value(message.created_at)),
+        unread_count=F('unread_count') + unread_delta,
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            Conversation.objects.create(owner_id=owner_id, counterpart_id=counterpart_id, last_message=message,
+                                        unread_count=unread_delta, updated_at=message.created_at)
+    except IntegrityError:
+        # The other participant's first message created it concurrently
+        _touch(owner_id, counterpart_id, message, unread_delta)
+
+
+def record_message(message):
+    _touch(message.sender_id, message.receiver_id, message, 0)
+    _touch(message.receiver_id, message.sender_id, message, 0 if message.is_read else 1)
+
+
+def refresh_unread(owner_id, counterpart_id):
+    unread = Message.objects.filter(receiver_id=owner_id, sender_id=counterpart_id, is_read=False).count()
+    Conversation.objects.filter(owner_id=owner_id, counterpart_id=counterpart_id).update(unread_count=unread)
+    return unread
+
+
+def mark_read(reader_id, counterpart_id, up_to_id):
+    """
+    Mark everything the counterpart sent the reader, up to and including
+    message ``up_to_id``, as read with a single UPDATE. Returns
+    ``(updated, unread_left)``.
+    """
+    updated = Message.objects.filter(
+        receiver_id=reader_id, sender_id=counterpart_id, id__lte=up_to_id, is_read=False,
+    ).update(is_read=True)
+    # update() skips the post_save signal, so recount here
+    return updated, refresh_unread(reader_id, counterpart_id)
+
+
+def read_receipt_event(reader_id, counterpart_id, up_to_id):
+    """Channel-layer event for ChatConsumer.chat_read, sent to both participants' user groups."""
+    return {
+        'type': 'chat_read',
+        'read': {'reader_id': reader_id, 'counterpart_id': counterpart_id, 'up_to': up_to_id},
+    }
+
+
+def publish_read_receipt(reader_id, counterpart_id, up_to_id):
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    event = read_receipt_event(reader_id, counterpart_id, up_to_id)
+    try:
+        # The sender sees the ticks; the reader's other tabs clear their badge
+        for user_id in (counterpart_id, reader_id):
+            async_to_sync(channel_layer.group_send)(f'user_{user_id}', event)
+    except Exception:
+        logger.exception("Failed to publish read receipt from %s to %s", reader_id, counterpart_id)
+
+
+def rebuild_conversations(message_model=Message, conversation_model=Conversation):
+    """
+    Recreate every Conversation row from messages with one grouped query.
+    Migration 0021 keeps its own frozen copy of this backfill.
+    """
+    pairs = {}
+    rows = (
+        message_model.objects.values('sender_id', 'receiver_id')
+        .annotate(last_id=Max('id'), unread=Count('id', filter=Q(is_read=False)))
+        .order_by()
+    )
+    for row in rows.iterator():
+        sender, receiver = row['sender_id'], row['receiver_id']
+        for owner, counterpart, unread in ((sender, receiver, 0), (receiver, sender, row['unread'])):
+            entry = pairs.setdefault((owner, counterpart), {'last_id': 0, 'unread': 0})
+            entry['last_id'] = max(entry['last_id'], row['last_id'])
+            entry['unread'] += unread
+
+    created_at = dict(
+        message_model.objects.filter(id__in={entry['last_id'] for entry in pairs.values()})
+        .values_list('id', 'created_at')
+    )
+    with transaction.atomic():
+        conversation_model.objects.all().delete()
+        conversation_model.objects.bulk_create(
+            [
+                conversation_model(owner_id=owner, counterpart_id=counterpart, last_message_id=entry['last_id'],
+                                   unread_count=entry['unread'], updated_at=created_at[entry['last_id']])
+                for (owner, counterpart), entry in pairs.items()
+            ],
+            batch_size=1000,
+        )
+    return len(pairs)
+
+
+def message_history(user_id, counterpart_id, task_id=None, before=None, limit=HISTORY_PAGE_SIZE):
+    """
+    Messages between two users, newest first, strictly older than message
+    ``before``. Returns ``(messages, has_more)``.
+    """
+    pair = Q(sender_id=user_id, receiver_id=counterpart_id) | Q(sender_id=counterpart_id, receiver_id=user_id)
+    directions = [
+        Message.objects.filter(sender_id=user_id, receiver_id=counterpart_id),
+        Message.objects.filter(sender_id=counterpart_id, receiver_id=user_id),
+    ]
+    older = None
+    if before is not None:
+        anchor = Message.objects.filter(pair, pk=before).values_list('created_at', flat=True).first()
+        if anchor is None:
+            return [], False
+        older = Q(created_at__lt=anchor) | Q(created_at=anchor, id__lt=before)
+
+    page = []
+    for queryset in directions:
+        if task_id is not None:
+            queryset = queryset.filter(task_id=task_id)
+        if older is not None:
+            queryset = queryset.filter(older)
+        page.extend(queryset.select_related('sender', 'receiver').order_by('-created_at', '-id')[:limit + 1])
+    page.sort(key=lambda message: (message.created_at, message.id), reverse=True)
+    return page[:limit], len(page) > limit
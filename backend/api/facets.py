@@ -0,0 +1,84 @@
+"""
+Facet counts for the categories page and search filters.
+
+Each entity is counted with one grouped aggregate query; the result is
+cached under the public catalog version (api/catalog.py), so any profile
+or task change invalidates it through the same signals.
+"""
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, Value, When
+
+from .catalog import get_catalog_version
+from .models import ServiceCategory, SpecialistProfile, Task
+
+FACETS_CACHE_TIMEOUT = 60 * 60
+
+# (key, lower bound inclusive, upper bound exclusive or None) in UZS
+PRICE_BUCKETS = [
+    ('0-50000', 0, 50_000),
+    ('50000-100000', 50_000, 100_000),
+    ('100000-200000', 100_000, 200_000),
+    ('200000+', 200_000, None),
+]
+
+
+def _price_bucket_expression():
+    whens = [
+        When(price_start__lt=upper, then=Value(key))
+        for key, _lower, upper in PRICE_BUCKETS if upper is not None
+    ]
+    return Case(*whens, default=Value(PRICE_BUCKETS[-1][0]), output_field=CharField())
+
+
+def _empty_category_counts():
+    return {category.value: 0 for category in ServiceCategory}
+
+
+def specialist_facets():
+    rows = (
+        SpecialistProfile.objects.annotate(price_bucket=_price_bucket_expression())
+        .values('category', 'is_verified', 'price_bucket')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    categories = _empty_category_counts()
+    verified = {'true': 0, 'false': 0}
+    prices = {key: 0 for key, _lower, _upper in PRICE_BUCKETS}
+    total = 0
+    for row in rows:
+        count = row['count']
+        total += count
+        categories[row['category']] = categories.get(row['category'], 0) + count
+        verified['true' if row['is_verified'] else 'false'] += count
+        prices[row['price_bucket']] += count
+    return {
+        'total': total,
+        'category': categories,
+        'verified': verified,
+        'price': [
+            {'key': key, 'min': lower, 'max': upper, 'count': prices[key]}
+            for key, lower, upper in PRICE_BUCKETS
+        ],
+    }
+
+
+def open_task_facets():
+    rows = (
+        Task.objects.filter(status=Task.Status.OPEN)
+        .values('category')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    categories = _empty_category_counts()
+    for row in rows:
+        categories[row['category']] = categories.get(row['category'], 0) + row['count']
+    return {'total': sum(categories.values()), 'category': categories}
+
+
+def get_facets():
+    key = f'facets:v{get_catalog_version()}'
+    facets = cache.get(key)
+    if facets is None:
+        facets = {'specialists': specialist_facets(), 'tasks': open_task_facets()}
+        cache.set(key, facets, timeout=FACETS_CACHE_TIMEOUT)
+    return facets
@@ -0,0 +1,199 @@
+"""
+Geohash helpers for nearest-neighbour queries without PostGIS.
+
+Rows carrying coordinates also store a 9-character geohash in a B-tree
+indexed column. Every prefix of a geohash is a rectangular cell, so a
+radius query becomes a handful of index range scans over the cells
+covering the circle. The database also applies the circle's bounding box
+and orders by an approximate (equirectangular) distance, so only a bounded
+candidate set, a small multiple of the limit, gets the exact haversine check.
+"""
+import math
+
+from django.db.models import ExpressionWrapper, F, FloatField, Q
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+DEFAULT_RADIUS_KM = 5.0
+MAX_RADIUS_KM = 50.0
+DEFAULT_NEAR_LIMIT = 50
+MAX_NEAR_LIMIT = 200
+MAX_COVERING_CELLS = 32
+# Rows fetched per requested result: headroom for the flat-earth ordering error near the radius
+NEAR_CANDIDATE_FACTOR = 2
+
+
+def encode(lat, lng, precision=GEOHASH_PRECISION):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def decode(geohash):
+    """Return the (lat, lng) centre of a geohash cell."""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        index = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (index >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lng_range[0] + lng_range[1]) / 2
+
+
+def cell_size_degrees(precision):
+    """(height, width) of a geohash cell in degrees."""
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bbox_cells(south, west, north, east, max_cells=MAX_COVERING_CELLS, max_precision=GEOHASH_PRECISION):
+    """
+    Geohash cells whose union contains the bounding box: the finest grid
+    (up to ``max_precision``) that needs at most ``max_cells`` cells.
+    ``east`` may be smaller than ``west`` for boxes crossing the antimeridian.
+    """
+    south, north = max(south, -90.0), min(north, 90.0 - 1e-9)
+    if east < west:
+        east += 360.0
+
+    for precision in range(max_precision, 0, -1):
+        height, width = cell_size_degrees(precision)
+        rows = math.floor(north / height) - math.floor(south / height) + 1
+        cols = math.floor(east / width) - math.floor(west / width) + 1
+        if rows * cols <= max_cells or precision == 1:
+            break
+
+    cells = set()
+    for row in range(rows):
+        for col in range(cols):
+            cell_lat = min(south + row * height, north)
+            cell_lng = (min(west + col * width, east) + 180.0) % 360.0 - 180.0
+            cells.add(encode(cell_lat, cell_lng, precision))
+    return sorted(cells)
+
+
+def radius_bbox(lat, lng, radius_km):
+    """(south, west, north, east) of the box around the circle; west/east may pass ±180."""
+    d_lat = radius_km / KM_PER_DEGREE
+    d_lng = min(radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01)), 180.0)
+    return lat - d_lat, lng - d_lng, lat + d_lat, lng + d_lng
+
+
+def covering_cells(lat, lng, radius_km, max_cells=MAX_COVERING_CELLS):
+    """Geohash cells whose union contains the circle around (lat, lng)."""
+    return bbox_cells(*radius_bbox(lat, lng, radius_km), max_cells)
+
+
+def bbox_filter(south, west, north, east):
+    """Q object matching rows whose lat/lng fall inside the box (west/east may pass ±180)."""
+    condition = Q(lat__gte=south, lat__lte=north)
+    if east - west >= 360.0:
+        return condition
+    west, east = (west + 180.0) % 360.0 - 180.0, (east + 180.0) % 360.0 - 180.0
+    if west <= east:
+        return condition & Q(lng__gte=west, lng__lte=east)
+    return condition & (Q(lng__gte=west) | Q(lng__lte=east))
+
+
+def approx_distance(lat, lng):
+    """Squared equirectangular distance in degrees: orders rows like haversine does at city scale."""
+    lng_scale = math.cos(math.radians(lat)) ** 2
+    return ExpressionWrapper(
+        (F('lat') - lat) * (F('lat') - lat) + (F('lng') - lng) * (F('lng') - lng) * lng_scale,
+        output_field=FloatField(),
+    )
+
+
+def prefix_range(prefix):
+    """
+    Half-open [low, high) string range matching every geohash starting with
+    ``prefix``; ``high`` is None when the prefix is the last cell. Uses the
+    next base32 prefix rather than a sentinel character so the bound holds
+    under any database collation.
+    """
+    chars = list(prefix)
+    while chars:
+        index = BASE32.index(chars[-1])
+        if index + 1 < len(BASE32):
+            chars[-1] = BASE32[index + 1]
+            return prefix, ''.join(chars)
+        chars.pop()
+    return prefix, None
+
+
+def cells_filter(cells, field='geohash'):
+    """Q object matching rows whose ``field`` starts with any of ``cells``."""
+    condition = Q()
+    for cell in cells:
+        low, high = prefix_range(cell)
+        cell_q = Q(**{f'{field}__gte': low})
+        if high is not None:
+            cell_q &= Q(**{f'{field}__lt': high})
+        condition |= cell_q
+    return condition
+
+
+def in_bbox(lat, lng, south, west, north, east):
+    if not south <= lat <= north:
+        return False
+    if west <= east:
+        return west <= lng <= east
+    return lng >= west or lng <= east
+
+
+def nearby(queryset, lat, lng, radius_km=DEFAULT_RADIUS_KM, limit=DEFAULT_NEAR_LIMIT):
+    """
+    Objects from ``queryset`` within ``radius_km`` of (lat, lng), closest
+    first. Each returned object gets a ``distance_km`` attribute.
+
+    The database narrows rows to the covering cells and the circle's bounding
+    box, orders them by approximate distance and returns a bounded number of
+    candidates; only those are haversine-checked here.
+    """
+    bbox = radius_bbox(lat, lng, radius_km)
+    candidates = (
+        queryset.filter(cells_filter(bbox_cells(*bbox)), bbox_filter(*bbox))
+        .annotate(approx_distance=approx_distance(lat, lng))
+        .order_by('approx_distance', 'pk')[:limit * NEAR_CANDIDATE_FACTOR]
+    )
+    hits = []
+    for obj in candidates:
+        distance = haversine_km(lat, lng, obj.lat, obj.lng)
+        if distance <= radius_km:
+            obj.distance_km = round(distance, 3)
+            hits.append(obj)
+    hits.sort(key=lambda obj: (obj.distance_km, obj.pk))
+    return hits[:limit]
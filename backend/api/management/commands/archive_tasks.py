@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from api.archive import archive_finished_tasks
+
+
+class Command(BaseCommand):
+    help = "Move finished tasks (and their responses) older than --days into the archive tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help="Minimum task age; defaults to TASK_ARCHIVE_AFTER_DAYS.")
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help="Tasks moved per transaction; defaults to TASK_ARCHIVE_BATCH_SIZE.")
+        parser.add_argument('--max-batches', type=int, default=None)
+
+    def handle(self, *args, **options):
+        archived = archive_finished_tasks(
+            days=options['days'], batch_size=options['batch_size'], max_batches=options['max_batches'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} tasks."))
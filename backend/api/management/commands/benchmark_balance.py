@@ -0,0 +1,87 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+
+from api.balance import InsufficientFunds, debit
+from api.models import SpecialistProfile, Transaction, User
+
+AMOUNT = Decimal(10)
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer one specialist balance from many threads and report throughput and lost updates, "
+        "for the balance ledger vs the old read-modify-write debit. Deletes its rows afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--debits', type=int, default=200, help="Debits per thread.")
+
+    def handle(self, *args, **options):
+        threads, debits = options['threads'], options['debits']
+        self.stdout.write(f"{threads} threads x {debits} debits of {AMOUNT} UZS on {connection.vendor}")
+        for label, operation in [('read-modify-write', self._naive_debit), ('ledger (conditional F())', self._ledger_debit)]:
+            user = User.objects.create_user(username=f'bench_balance_{time.monotonic_ns()}', password=None,
+                                            role=User.Role.SPECIALIST)
+            profile = SpecialistProfile.objects.create(user=user, category='Другое', price_start=0,
+                                                       description='bench', balance=AMOUNT * threads * debits)
+            try:
+                elapsed, retries = self._hammer(profile, operation, threads, debits)
+                profile.refresh_from_db()
+                charged = Transaction.objects.filter(user=user).count()
+                lost = charged - int((AMOUNT * threads * debits - profile.balance) / AMOUNT)
+                self.stdout.write(
+                    f"{label:<26} {charged / elapsed:8.0f} debits/s  lost updates: {lost:5d}  lock retries: {retries}"
+                )
+            finally:
+                user.delete()
+
+    @staticmethod
+    def _naive_debit(profile):
+        fresh = SpecialistProfile.objects.get(pk=profile.pk)
+        if fresh.balance < AMOUNT:
+            raise InsufficientFunds()
+        fresh.balance -= AMOUNT
+        fresh.save(update_fields=['balance'])
+        Transaction.objects.create(user_id=profile.user_id, amount=AMOUNT,
+                                   transaction_type=Transaction.Type.RESPONSE_FEE, status=Transaction.Status.SUCCESS)
+
+    @staticmethod
+    def _ledger_debit(profile):
+        debit(profile, AMOUNT, Transaction.Type.RESPONSE_FEE)
+
+    @staticmethod
+    def _hammer(profile, operation, threads, debits):
+        retries = [0]
+        lock = threading.Lock()
+        start = threading.Barrier(threads + 1)
+
+        def worker():
+            start.wait()
+            try:
+                for _ in range(debits):
+                    while True:
+                        try:
+                            operation(profile)
+                        except OperationalError:
+                            # SQLite reports writer contention instead of queueing
+                            with lock:
+                                retries[0] += 1
+                            time.sleep(0.001)
+                            continue
+                        break
+            finally:
+                connection.close()
+
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in pool:
+            thread.start()
+        start.wait()
+        started = time.perf_counter()
+        for thread in pool:
+            thread.join()
+        return time.perf_counter() - started, retries[0]
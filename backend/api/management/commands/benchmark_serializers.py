@@ -0,0 +1,57 @@
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.models import SpecialistProfile, User
+from api.serializers import SpecialistListSerializer, SpecialistProfileSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare serialization time and payload size of the specialist list serializers (in memory, no DB)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        profiles = [self._profile(i) for i in range(rows)]
+
+        cases = [
+            ('SpecialistProfileSerializer', SpecialistProfileSerializer, ''),
+            ('SpecialistListSerializer', SpecialistListSerializer, ''),
+            ('SpecialistListSerializer ?fields=card', SpecialistListSerializer,
+             'id,name,category,rating,price_start,avatarUrl,is_verified'),
+        ]
+        self.stdout.write(f"{rows} rows, median of {repeat} runs")
+        for label, serializer_class, fields in cases:
+            context = {'request': self._request(fields)}
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                data = serializer_class(profiles, many=True, context=context).data
+                timings.append(time.perf_counter() - started)
+            body = JSONRenderer().render(data)
+            per_row_us = statistics.median(timings) / rows * 1_000_000
+            self.stdout.write(f"{label:<40} {per_row_us:8.1f} µs/row {len(body) / rows:8.1f} bytes/row")
+
+    @staticmethod
+    def _request(fields):
+        query = {'fields': fields} if fields else {}
+        return Request(APIRequestFactory().get('/api/specialists/', query))
+
+    @staticmethod
+    def _profile(i):
+        user = User(id=i + 1, username=f'bench_{i}', first_name='Алишер', last_name=f'Усманов {i}',
+                    avatar_url=f'https://images.example.com/avatars/{i}.jpg', location='Ташкент')
+        return SpecialistProfile(
+            id=i + 1, user=user, category='Ремонт', rating=4.8, reviews_count=37,
+            price_start=Decimal('100000'), is_verified=True, tags=['Сантехник', 'Электрик', 'Сборка мебели'],
+            description='Мастер универсал. Сантехника, электрика, сборка мебели. Опыт 10 лет. ' * 3,
+            telegram='@master', instagram='@master', balance=Decimal('25000'), lat=41.31, lng=69.24,
+        )
@@ -0,0 +1,95 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.models import ServiceCategory, SpecialistProfile, SpecialistTag, User
+from api.tags import filter_by_tags, normalize_tags
+
+TAG_POOL = [
+    'Сантехник', 'Трубы', 'Электрик', 'Сборка мебели', 'Английский', 'IELTS', 'Математика',
+    'Уборка', 'Мойка окон', 'Маникюр', 'Переезд', 'Грузчики', 'Бухгалтерия', 'Юрист',
+    'Фитнес', 'Йога', 'Няня', 'Повар', 'Ведущий', 'Фотограф', 'Python', 'Дизайн', 'SMM',
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Measure tag-filter latency (JSON scan vs SpecialistTag index) on synthetic profiles. Rolls back all rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options['profiles'], options['repeat'], random.Random(options['seed']))
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, total, repeat, rng):
+        self.stdout.write(f"Creating {total} synthetic profiles...")
+        categories = [choice.value for choice in ServiceCategory]
+        batch = 5000
+        for start in range(0, total, batch):
+            size = min(batch, total - start)
+            users = User.objects.bulk_create([
+                User(username=f'bench_tag_{start + i}', email=f'bench_tag_{start + i}@bench.local',
+                     password='!', role=User.Role.SPECIALIST)
+                for i in range(size)
+            ])
+            profiles = SpecialistProfile.objects.bulk_create([
+                SpecialistProfile(user=user, category=rng.choice(categories), price_start=50000,
+                                  description='bench', tags=rng.sample(TAG_POOL, rng.randint(1, 4)))
+                for user in users
+            ])
+            SpecialistTag.objects.bulk_create([
+                SpecialistTag(profile=profile, name=name)
+                for profile in profiles for name in normalize_tags(profile.tags)
+            ])
+
+        cases = [
+            ('any-of [Сантехник]', ['Сантехник'], None),
+            ('any-of [Йога, Фитнес]', ['Йога', 'Фитнес'], None),
+            ('all-of [Сантехник, Трубы]', None, ['Сантехник', 'Трубы']),
+        ]
+        for label, any_of, all_of in cases:
+            scan_ms, scan_hits = self._time(repeat, lambda: self._json_scan(any_of, all_of))
+            index_ms, index_hits = self._time(
+                repeat,
+                lambda: list(filter_by_tags(SpecialistProfile.objects.all(), any_of, all_of).values_list('id', flat=True)),
+            )
+            assert scan_hits == index_hits, (scan_hits, index_hits)
+            self.stdout.write(
+                f"{label:<28} matches={index_hits:<7} json-scan={scan_ms:8.1f} ms  tag-index={index_ms:8.1f} ms"
+            )
+
+    @staticmethod
+    def _json_scan(any_of, all_of):
+        any_names, all_names = normalize_tags(any_of), normalize_tags(all_of)
+        hits = []
+        for profile_id, tags in SpecialistProfile.objects.values_list('id', 'tags').iterator():
+            names = normalize_tags(tags)
+            if any_names and not any_names & names:
+                continue
+            if all_names and not all_names <= names:
+                continue
+            hits.append(profile_id)
+        return hits
+
+    @staticmethod
+    def _time(repeat, fn):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = fn()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), len(result)
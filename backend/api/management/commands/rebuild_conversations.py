@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.conversations import rebuild_conversations
+
+
+class Command(BaseCommand):
+    help = "Recreate the denormalized conversation list from the messages table."
+
+    def handle(self, *args, **options):
+        count = rebuild_conversations()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} conversations."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.map_tiles import rebuild_map_clusters
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-zoom specialist map clusters from SpecialistProfile coordinates."
+
+    def handle(self, *args, **options):
+        rows = rebuild_map_clusters()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} map cluster rows."))
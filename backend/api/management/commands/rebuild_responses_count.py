@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from api.models import Task, TaskResponse
+
+
+def recount_task_responses(tasks=None):
+    """Recompute Task.responses_count in one UPDATE ... SET = (SELECT COUNT(*) ...)."""
+    counts = (
+        TaskResponse.objects.filter(task=OuterRef('pk'))
+        .order_by()
+        .values('task')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    tasks = Task.objects.all() if tasks is None else tasks
+    return tasks.update(
+        responses_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+    )
+
+
+class Command(BaseCommand):
+    help = "Rebuild the denormalized Task.responses_count column from TaskResponse rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help="Tasks updated per statement, to keep locks short on big tables.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        updated = 0
+        last_id = 0
+        while True:
+            ids = list(
+                Task.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            updated += recount_task_responses(Task.objects.filter(id__in=ids))
+            last_id = ids[-1]
+        self.stdout.write(self.style.SUCCESS(f"Recounted responses for {updated} tasks."))
@@ -0,0 +1,158 @@
+"""
+Server-side clustering for the specialist map.
+
+MapCluster holds, for every geohash precision in MAP_CLUSTER_PRECISIONS,
+one row per (cell, category) with a count and coordinate sums. Saving or
+deleting a SpecialistProfile moves its point between cells with F()
+updates, so a map request only reads the handful of rows covering the
+viewport. At RAW_POINTS_MIN_ZOOM and above individual profiles are
+returned instead.
+"""
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from . import geo
+from .models import MapCluster, SpecialistProfile
+
+# Zoom 13 shows precision 6; from RAW_POINTS_MIN_ZOOM on raw points are served, so finer cells are never read
+MAP_CLUSTER_PRECISIONS = range(1, 7)
+RAW_POINTS_MIN_ZOOM = 14
+MAX_MAP_POINTS = 500
+MAX_VIEWPORT_CELLS = 16
+
+# Web-map zoom level -> geohash precision of the clusters shown at that zoom.
+_ZOOM_PRECISION = [(2, 1), (5, 2), (7, 3), (10, 4), (12, 5), (13, 6)]
+
+
+def precision_for_zoom(zoom):
+    for max_zoom, precision in _ZOOM_PRECISION:
+        if zoom <= max_zoom:
+            return precision
+    return MAP_CLUSTER_PRECISIONS[-1]
+
+
+def remember_map_point(profile):
+    """pre_save: stash the stored point so the post_save handler can diff it."""
+    previous = None
+    if profile.pk:
+        previous = (
+            SpecialistProfile.objects.filter(pk=profile.pk)
+            .values_list('lat', 'lng', 'category')
+            .first()
+        )
+    profile._map_previous_point = previous
+
+
+def move_map_point(profile):
+    """post_save: shift the profile's contribution if its point or category changed."""
+    if '_map_previous_point' not in profile.__dict__:
+        return
+    previous = profile.__dict__.pop('_map_previous_point')
+    current = (profile.lat, profile.lng, profile.category)
+    if previous == current:
+        return
+    with transaction.atomic():
+        if previous:
+            _apply_point(*previous, sign=-1)
+        _apply_point(*current, sign=1)
+
+
+def remove_map_point(profile):
+    _apply_point(profile.lat, profile.lng, profile.category, sign=-1)
+
+
+def _apply_point(lat, lng, category, sign):
+    if lat is None or lng is None:
+        return
+    geohash = geo.encode(lat, lng)
+    for precision in MAP_CLUSTER_PRECISIONS:
+        cell = geohash[:precision]
+        rows = MapCluster.objects.filter(precision=precision, cell=cell, category=category)
+        delta = dict(count=F('count') + sign, lat_sum=F('lat_sum') + sign * lat, lng_sum=F('lng_sum') + sign * lng)
+        if rows.update(**delta) or sign < 0:
+            continue
+        try:
+            with transaction.atomic():
+                MapCluster.objects.create(precision=precision, cell=cell, category=category,
+                                          count=1, lat_sum=lat, lng_sum=lng)
+        except IntegrityError:
+            # Another writer created the row first; fold into it.
+            rows.update(**delta)
+    if sign < 0:
+        MapCluster.objects.filter(
+            category=category, count__lte=0,
+            cell__in=[geohash[:precision] for precision in MAP_CLUSTER_PRECISIONS],
+        ).delete()
+
+
+def clusters_in_bbox(south, west, north, east, zoom):
+    precision = precision_for_zoom(zoom)
+    cells = geo.bbox_cells(south, west, north, east, max_cells=MAX_VIEWPORT_CELLS, max_precision=precision)
+    rows = (
+        MapCluster.objects.filter(precision=precision)
+        .filter(geo.cells_filter(cells, field='cell'))
+        .values_list('cell', 'category', 'count', 'lat_sum', 'lng_sum')
+    )
+
+    merged = defaultdict(lambda: {'count': 0, 'lat_sum': 0.0, 'lng_sum': 0.0, 'categories': {}})
+    for cell, category, count, lat_sum, lng_sum in rows:
+        bucket = merged[cell]
+        bucket['count'] += count
+        bucket['lat_sum'] += lat_sum
+        bucket['lng_sum'] += lng_sum
+        bucket['categories'][category] = count
+
+    clusters = []
+    for cell, bucket in merged.items():
+        lat, lng = bucket['lat_sum'] / bucket['count'], bucket['lng_sum'] / bucket['count']
+        if not geo.in_bbox(lat, lng, south, west, north, east):
+            continue
+        top_category = max(bucket['categories'].items(), key=lambda item: (item[1], item[0]))[0]
+        clusters.append({
+            'cell': cell,
+            'count': bucket['count'],
+            'lat': round(lat, 6),
+            'lng': round(lng, 6),
+            'top_category': top_category,
+        })
+    clusters.sort(key=lambda cluster: -cluster['count'])
+    return precision, clusters
+
+
+def points_in_bbox(queryset, south, west, north, east):
+    cells = geo.bbox_cells(south, west, north, east, max_cells=MAX_VIEWPORT_CELLS)
+    queryset = queryset.filter(geo.cells_filter(cells), lat__gte=south, lat__lte=north)
+    if west <= east:
+        queryset = queryset.filter(lng__gte=west, lng__lte=east)
+    points = []
+    for profile in queryset.order_by('-rating', 'id')[:MAX_MAP_POINTS]:
+        if geo.in_bbox(profile.lat, profile.lng, south, west, north, east):
+            points.append(profile)
+    return points
+
+
+def rebuild_map_clusters():
+    """Recompute every MapCluster row from scratch. Returns the number of rows written."""
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    profiles = SpecialistProfile.objects.exclude(lat=None).exclude(lng=None)
+    for lat, lng, category in profiles.values_list('lat', 'lng', 'category').iterator():
+        geohash = geo.encode(lat, lng)
+        for precision in MAP_CLUSTER_PRECISIONS:
+            bucket = totals[(precision, geohash[:precision], category)]
+            bucket[0] += 1
+            bucket[1] += lat
+            bucket[2] += lng
+
+    with transaction.atomic():
+        MapCluster.objects.all().delete()
+        MapCluster.objects.bulk_create(
+            [
+                MapCluster(precision=precision, cell=cell, category=category,
+                           count=count, lat_sum=lat_sum, lng_sum=lng_sum)
+                for (precision, cell, category), (count, lat_sum, lng_sum) in totals.items()
+            ],
+            batch_size=1000,
+        )
+    return len(totals)
@@ -0,0 +1,144 @@
+"""
+Match a newly created task to the specialists most likely to take it.
+
+Candidates are specialists in the task's category plus anyone whose tags
+appear in the task's title or description (via the indexed SpecialistTag
+table). Each candidate is scored on category, tag overlap and distance,
+and only the best TASK_MATCH_MAX_SPECIALISTS are notified. Fan-out goes
+out in batches of TASK_MATCH_BATCH_SIZE: one event-loop pass of channel
+layer sends and one BCC email per batch over a shared SMTP connection,
+so a busy category never turns into thousands of separate sends.
+"""
+import asyncio
+import logging
+import re
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+
+from .geo import haversine_km
+from .models import SpecialistProfile, SpecialistTag, Task
+from .tags import MAX_TAG_LENGTH, normalize_tag
+from .task_feed import task_payload
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_WEIGHT = 1.0
+TAG_WEIGHT = 0.5
+MAX_TAG_BONUS = 3
+DISTANCE_WEIGHT = 1.0
+MAX_TASK_TERMS = 200
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def _setting(name, default):
+    return max(int(getattr(settings, name, default)), 1)
+
+
+def task_terms(task):
+    """Normalized words and word pairs from the task text, comparable to SpecialistTag.name."""
+    words = _WORD_RE.findall(normalize_tag(f'{task.title} {task.description}'))
+    terms = set(words)
+    terms.update(f'{first} {second}' for first, second in zip(words, words[1:]))
+    return {term for term in terms if len(term) <= MAX_TAG_LENGTH}
+
+
+def score_candidates(task):
+    """
+    Return ``[(score, user_id, email), ...]`` best first. Reads plain tuples
+    and two indexed queries, so the cost is linear in the candidate count.
+    """
+    terms = sorted(task_terms(task))[:MAX_TASK_TERMS]
+    tag_hits = {}
+    if terms:
+        for profile_id in SpecialistTag.objects.filter(name__in=terms).values_list('profile_id', flat=True):
+            tag_hits[profile_id] = tag_hits.get(profile_id, 0) + 1
+
+    rows = (
+        SpecialistProfile.objects
+        .filter(Q(category=task.category) | Q(id__in=list(tag_hits)))
+        .filter(user__is_active=True)
+        .exclude(user_id=task.client_id)
+        .values_list('id', 'user_id', 'user__email', 'category', 'lat', 'lng')
+    )
+
+    radius_km = float(getattr(settings, 'TASK_MATCH_RADIUS_KM', 25))
+    has_location = task.lat is not None and task.lng is not None
+    scored = []
+    for profile_id, user_id, email, category, lat, lng in rows.iterator():
+        score = CATEGORY_WEIGHT if category == task.category else 0.0
+        score += TAG_WEIGHT * min(tag_hits.get(profile_id, 0), MAX_TAG_BONUS)
+        if has_location and lat is not None and lng is not None:
+            distance_km = haversine_km(task.lat, task.lng, lat, lng)
+            if distance_km > radius_km:
+                continue
+            score += DISTANCE_WEIGHT * (1 - distance_km / radius_km)
+        scored.append((score, user_id, email))
+
+    scored.sort(key=lambda row: (-row[0], row[1]))
+    return scored[:_setting('TASK_MATCH_MAX_SPECIALISTS', 500)]
+
+
+def _batches(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def _group_send_many(channel_layer, user_ids, event):
+    await asyncio.gather(*(channel_layer.group_send(f'user_{user_id}', event) for user_id in user_ids))
+
+
+def _match_email(task, recipients):
+    return EmailMessage(
+        subject=f"Новое задание в категории «{task.category}»: {task.title}",
+        body=(
+            f"Здравствуйте!\n\nПоявилось новое задание, которое может вам подойти: '{task.title}'.\n\n"
+            f"Бюджет: {task.budget or 'не указан'}\nМесто: {task.location or 'не указано'}\n\n"
+            f"Откликнуться: {settings.FRONTEND_URL}/specialist/dashboard"
+        ),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[settings.DEFAULT_FROM_EMAIL],
+        bcc=recipients,
+    )
+
+
+def notify_matched_specialists(task, matches):
+    """Push ``task_matched`` events and emails to ``matches`` in batches. Returns the batch count."""
+    channel_layer = get_channel_layer()
+    event = {'type': 'task_matched', 'task': task_payload(task)}
+    batch_size = _setting('TASK_MATCH_BATCH_SIZE', 100)
+
+    batches = 0
+    connection = get_connection()
+    try:
+        for batch in _batches(matches, batch_size):
+            batches += 1
+            if channel_layer is not None:
+                try:
+                    async_to_sync(_group_send_many)(channel_layer, [user_id for _, user_id, _ in batch], event)
+                except Exception:
+                    logger.exception("Failed to push task %s to a batch of %s specialists", task.id, len(batch))
+            recipients = [email for _, _, email in batch if email]
+            if recipients:
+                try:
+                    connection.open()  # no-op once open; keeps one SMTP session for all batches
+                    connection.send_messages([_match_email(task, recipients)])
+                except Exception:
+                    logger.exception("Failed to email task %s to a batch of %s specialists", task.id, len(recipients))
+    finally:
+        connection.close()
+    return batches
+
+
+def match_task(task_id):
+    task = Task.objects.filter(id=task_id, status=Task.Status.OPEN).first()
+    if task is None:
+        return 0
+    matches = score_candidates(task)
+    if matches:
+        notify_matched_specialists(task, matches)
+    return len(matches)
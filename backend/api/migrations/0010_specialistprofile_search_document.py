@@ -0,0 +1,60 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+SEARCH_CONFIG = 'simple'
+SEARCH_INDEX_NAME = 'api_specialist_search_gin'
+FTS_TABLE = 'api_specialistprofile_fts'
+
+
+def _document(profile):
+    user = profile.user
+    full_name = f"{user.first_name} {user.last_name}".strip()
+    parts = [full_name, user.username, ' '.join(profile.tags or []), profile.description]
+    return '\n'.join(part for part in parts if part)
+
+
+def create_search_index(apps, schema_editor):
+    SpecialistProfile = apps.get_model('api', 'SpecialistProfile')
+
+    profiles = list(SpecialistProfile.objects.select_related('user'))
+    for profile in profiles:
+        profile.search_document = _document(profile)
+    SpecialistProfile.objects.bulk_update(profiles, ['search_document'], batch_size=500)
+
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.add_index(
+            SpecialistProfile,
+            GinIndex(SearchVector('search_document', config=SEARCH_CONFIG), name=SEARCH_INDEX_NAME),
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(search_document)')
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, search_document) '
+            f'SELECT id, search_document FROM api_specialistprofile'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {SEARCH_INDEX_NAME}')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_alter_task_budget_alter_task_date_info_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='specialistprofile',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
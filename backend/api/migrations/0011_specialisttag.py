@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_tags(apps, schema_editor):
+    SpecialistProfile = apps.get_model('api', 'SpecialistProfile')
+    SpecialistTag = apps.get_model('api', 'SpecialistTag')
+
+    links = []
+    for profile_id, tags in SpecialistProfile.objects.values_list('id', 'tags').iterator():
+        names = {str(tag).strip().casefold()[:100] for tag in tags or []}
+        links.extend(SpecialistTag(profile_id=profile_id, name=name) for name in names if name)
+    SpecialistTag.objects.bulk_create(links, batch_size=1000, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_specialistprofile_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpecialistTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_links', to='api.specialistprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('name', 'profile'), name='uniq_specialist_tag')],
+            },
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:35
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+# Frozen copy of api.map_tiles.MAP_CLUSTER_PRECISIONS: zoom 13 shows precision 6, raw points from zoom 14
+MAP_CLUSTER_PRECISIONS = range(1, 7)
+
+
+def backfill_map_clusters(apps, schema_editor):
+    """Aggregate the profiles that already carry coordinates, from their stored geohash."""
+    SpecialistProfile = apps.get_model('api', 'SpecialistProfile')
+    MapCluster = apps.get_model('api', 'MapCluster')
+    totals = defaultdict(lambda: [0, 0.0, 0.0])
+    profiles = SpecialistProfile.objects.exclude(lat=None).exclude(lng=None).exclude(geohash='')
+    for lat, lng, category, geohash in profiles.values_list('lat', 'lng', 'category', 'geohash').iterator():
+        for precision in MAP_CLUSTER_PRECISIONS:
+            bucket = totals[(precision, geohash[:precision], category)]
+            bucket[0] += 1
+            bucket[1] += lat
+            bucket[2] += lng
+    MapCluster.objects.bulk_create(
+        [
+            MapCluster(precision=precision, cell=cell, category=category,
+                       count=count, lat_sum=lat_sum, lng_sum=lng_sum)
+            for (precision, cell, category), (count, lat_sum, lng_sum) in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_geo_coordinates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MapCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('precision', models.PositiveSmallIntegerField()),
+                ('cell', models.CharField(max_length=12)),
+                ('category', models.CharField(choices=[('Ремонт', 'Ремонт'), ('Репетиторы', 'Репетиторы'), ('Уборка', 'Уборка'), ('IT и фриланс', 'IT и фриланс'), ('Красота', 'Красота'), ('Перевозки', 'Перевозки'), ('Бухгалтеры и юристы', 'Бухгалтеры и юристы'), ('Спорт', 'Спорт'), ('Домашний персонал', 'Домашний персонал'), ('Артисты', 'Артисты'), ('Другое', 'Другое')], max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('lat_sum', models.FloatField(default=0.0)),
+                ('lng_sum', models.FloatField(default=0.0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('precision', 'cell', 'category'), name='uniq_map_cluster_cell')],
+            },
+        ),
+        migrations.RunPython(backfill_map_clusters, migrations.RunPython.noop),
+    ]
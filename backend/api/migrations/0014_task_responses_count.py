@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:44
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_responses_count(apps, schema_editor):
+    Task = apps.get_model('api', 'Task')
+    TaskResponse = apps.get_model('api', 'TaskResponse')
+    counts = (
+        TaskResponse.objects.filter(task=OuterRef('pk'))
+        .order_by()
+        .values('task')
+        .annotate(total=Count('id'))
+        .values('total')
+    )
+    Task.objects.update(responses_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_mapcluster'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='responses_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_responses_count, migrations.RunPython.noop),
+    ]
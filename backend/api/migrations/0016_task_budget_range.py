@@ -0,0 +1,97 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:51
+
+import re
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+# A frozen copy of api.budget at the time of this migration
+MAX_BUDGET = 10 ** 12
+
+_MULTIPLIERS = {
+    'млрд': 10 ** 9,
+    'млн': 10 ** 6, 'mln': 10 ** 6, 'm': 10 ** 6,
+    'тыс': 10 ** 3, 'т': 10 ** 3, 'к': 10 ** 3, 'k': 10 ** 3,
+}
+_NUMBER_RE = re.compile(
+    r'(?P<int>\d{1,3}(?:[ \u00a0\u202f]\d{3})+|\d+)'
+    r'(?:[.,](?P<frac>\d+))?'
+    r'\s*(?P<unit>млрд|млн|mln|тыс|т|к|k|m)?(?![^\W\d_])'
+)
+_FROM_RE = re.compile(r'\b(?:от|from)\b')
+_TO_RE = re.compile(r'\b(?:до|to)\b')
+
+
+def _amount(match):
+    whole = re.sub(r'\D', '', match.group('int'))
+    frac = match.group('frac') or ''
+    unit = match.group('unit')
+    if frac and not unit and len(frac) == 3:
+        # "100.000" / "100,000" is a thousands separator, not a fraction
+        whole, frac = whole + frac, ''
+    value = float(f'{whole}.{frac or 0}') * _MULTIPLIERS.get(unit, 1)
+    return int(round(value))
+
+
+def parse_budget(text):
+    """Return ``(budget_min, budget_max)`` in UZS for a budget string."""
+    text = (text or '').casefold()
+    matches = list(_NUMBER_RE.finditer(text))
+    if not matches:
+        return None, None
+
+    amounts = [_amount(match) for match in matches[:2]]
+    if len(amounts) == 2 and matches[1].group('unit') and not matches[0].group('unit'):
+        # "200-300 тыс": the unit written once applies to both ends
+        amounts[0] *= _MULTIPLIERS[matches[1].group('unit')]
+    if any(amount > MAX_BUDGET for amount in amounts):
+        return None, None
+
+    if len(amounts) == 2:
+        low, high = sorted(amounts)
+        return low, high
+    amount = amounts[0]
+    before = text[:matches[0].start()]
+    if _TO_RE.search(before):
+        return 0, amount
+    if _FROM_RE.search(before):
+        return amount, None
+    return amount, amount
+
+
+def backfill_budget_range(apps, schema_editor):
+    Task = apps.get_model('api', 'Task')
+    pending = []
+    rows = Task.objects.exclude(budget='').values_list('id', 'budget').order_by('id')
+    for task_id, budget in rows.iterator(chunk_size=BATCH_SIZE):
+        budget_min, budget_max = parse_budget(budget)
+        if budget_min is None:
+            continue
+        pending.append(Task(id=task_id, budget_min=budget_min, budget_max=budget_max))
+        if len(pending) >= BATCH_SIZE:
+            Task.objects.bulk_update(pending, ['budget_min', 'budget_max'])
+            pending = []
+    if pending:
+        Task.objects.bulk_update(pending, ['budget_min', 'budget_max'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_task_feed_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='budget_max',
+            field=models.PositiveBigIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='budget_min',
+            field=models.PositiveBigIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_budget_range, migrations.RunPython.noop),
+    ]
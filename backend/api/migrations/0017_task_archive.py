@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:54
+
+import api.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_task_budget_range'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='message',
+            name='task',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=api.models.SET_NULL_UNLESS_ARCHIVED, related_name='messages', to='api.task'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='task',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=api.models.SET_NULL_UNLESS_ARCHIVED, related_name='reviews', to='api.task'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('category', models.CharField(choices=[('Ремонт', 'Ремонт'), ('Репетиторы', 'Репетиторы'), ('Уборка', 'Уборка'), ('IT и фриланс', 'IT и фриланс'), ('Красота', 'Красота'), ('Перевозки', 'Перевозки'), ('Бухгалтеры и юристы', 'Бухгалтеры и юристы'), ('Спорт', 'Спорт'), ('Домашний персонал', 'Домашний персонал'), ('Артисты', 'Артисты'), ('Другое', 'Другое')], max_length=50)),
+                ('budget', models.CharField(blank=True, max_length=100)),
+                ('budget_min', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('budget_max', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('location', models.CharField(blank=True, max_length=255)),
+                ('date_info', models.CharField(blank=True, max_length=100)),
+                ('status', models.CharField(choices=[('OPEN', 'В поиске'), ('IN_PROGRESS', 'В работе'), ('COMPLETED', 'Завершен'), ('CANCELED', 'Отменен')], max_length=20)),
+                ('lat', models.FloatField(blank=True, null=True)),
+                ('lng', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('responses_count', models.PositiveIntegerField(default=0)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('assigned_specialist', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_assigned_tasks', to='api.specialistprofile')),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedTaskResponse',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('message', models.TextField()),
+                ('price', models.DecimalField(decimal_places=0, max_digits=12)),
+                ('created_at', models.DateTimeField()),
+                ('specialist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_responses', to='api.specialistprofile')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='responses', to='api.archivedtask')),
+            ],
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:02
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count, F, IntegerField, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+# Fee charged per response when the duplicates were created (api.balance.RESPONSE_FEE)
+RESPONSE_FEE = 5000
+# Frozen Transaction.Type.REFUND (the choice is added in 0023); kept out of my-stats earnings
+REFUND = 'REFUND'
+
+
+def delete_duplicate_responses(apps, schema_editor):
+    """
+    Keep the earliest response per (task, specialist) so the constraint can be
+    added, and refund the fee paid for every removed duplicate with a ledger row.
+    """
+    Task = apps.get_model('api', 'Task')
+    TaskResponse = apps.get_model('api', 'TaskResponse')
+    SpecialistProfile = apps.get_model('api', 'SpecialistProfile')
+    Transaction = apps.get_model('api', 'Transaction')
+    duplicates = (
+        TaskResponse.objects.values('task_id', 'specialist_id')
+        .annotate(first_id=Min('id'), total=Count('id'))
+        .filter(total__gt=1)
+        .order_by()
+    )
+    affected_tasks = set()
+    removed_per_specialist = Counter()
+    for row in duplicates.iterator():
+        TaskResponse.objects.filter(task_id=row['task_id'], specialist_id=row['specialist_id']).exclude(
+            id=row['first_id']
+        ).delete()
+        affected_tasks.add(row['task_id'])
+        removed_per_specialist[row['specialist_id']] += row['total'] - 1
+
+    owners = dict(SpecialistProfile.objects.filter(id__in=removed_per_specialist).values_list('id', 'user_id'))
+    for specialist_id, removed in removed_per_specialist.items():
+        refund = RESPONSE_FEE * removed
+        SpecialistProfile.objects.filter(id=specialist_id).update(balance=F('balance') + refund)
+        Transaction.objects.create(
+            user_id=owners[specialist_id],
+            amount=refund,
+            transaction_type=REFUND,
+            status='SUCCESS',
+            description=f"Возврат платы за повторные отклики ({removed})",
+        )
+
+    if affected_tasks:
+        counts = (
+            TaskResponse.objects.filter(task=OuterRef('pk'))
+            .order_by()
+            .values('task')
+            .annotate(total=Count('id'))
+            .values('total')
+        )
+        Task.objects.filter(id__in=affected_tasks).update(
+            responses_count=Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_task_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_responses, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='taskresponse',
+            constraint=models.UniqueConstraint(fields=('task', 'specialist'), name='uniq_task_response'),
+        ),
+    ]
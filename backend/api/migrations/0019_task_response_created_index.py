@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_task_response_unique'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskresponse',
+            index=models.Index(fields=['task', 'created_at'], name='api_response_task_created'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_task_response_created_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResponseNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_response_notifications', to=settings.AUTH_USER_MODEL)),
+                ('response', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='notification', to='api.taskresponse')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['client', 'created_at'], name='api_response_notif_client')],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_conversations(apps, schema_editor):
+    # A frozen copy of api.conversations.rebuild_conversations at the time of this migration
+    Message = apps.get_model('api', 'Message')
+    Conversation = apps.get_model('api', 'Conversation')
+    pairs = {}
+    rows = (
+        Message.objects.values('sender_id', 'receiver_id')
+        .annotate(last_id=models.Max('id'), unread=models.Count('id', filter=models.Q(is_read=False)))
+        .order_by()
+    )
+    for row in rows.iterator():
+        sender, receiver = row['sender_id'], row['receiver_id']
+        for owner, counterpart, unread in ((sender, receiver, 0), (receiver, sender, row['unread'])):
+            entry = pairs.setdefault((owner, counterpart), {'last_id': 0, 'unread': 0})
+            entry['last_id'] = max(entry['last_id'], row['last_id'])
+            entry['unread'] += unread
+
+    created_at = dict(
+        Message.objects.filter(id__in={entry['last_id'] for entry in pairs.values()})
+        .values_list('id', 'created_at')
+    )
+    Conversation.objects.bulk_create(
+        [
+            Conversation(owner_id=owner, counterpart_id=counterpart, last_message_id=entry['last_id'],
+                         unread_count=entry['unread'], updated_at=created_at[entry['last_id']])
+            for (owner, counterpart), entry in pairs.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_response_notification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField()),
+                ('counterpart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('last_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.message')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', '-updated_at', '-id'], name='api_conversation_recent')],
+                'constraints': [models.UniqueConstraint(fields=('owner', 'counterpart'), name='uniq_conversation')],
+            },
+        ),
+        migrations.RunPython(backfill_conversations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_message_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transaction',
+            name='transaction_type',
+            field=models.CharField(choices=[('TOP_UP', 'Пополнение баланса'), ('RESPONSE_FEE', 'Плата за отклик'), ('DEAL_FEE', 'Комиссия за сделку'), ('REFUND', 'Возврат средств')], max_length=20),
+        ),
+    ]
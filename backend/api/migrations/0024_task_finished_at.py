@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:22
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_finished_at(apps, schema_editor):
+    """
+    When existing finished tasks finished is unknown; start their archive clock
+    now so none is archived earlier than TASK_ARCHIVE_AFTER_DAYS after this point.
+    """
+    Task = apps.get_model('api', 'Task')
+    Task.objects.filter(status__in=['COMPLETED', 'CANCELED'], finished_at=None).update(finished_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_transaction_refund'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedtask',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'finished_at'], name='api_task_finished_idx'),
+        ),
+        migrations.RunPython(backfill_finished_at, migrations.RunPython.noop),
+    ]
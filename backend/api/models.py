@@ -1,5 +1,6 @@
 import uuid
-from django.db import models
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 from datetime import timedelta
@@ -57,6 +58,36 @@ class PasswordResetToken(models.Model):
         return f"Reset for {self.user.email} - used={self.is_used}"
 
 
+class GeoPointMixin(models.Model):
+    """
+    Optional coordinates plus a B-tree indexed geohash used for radius
+    queries without PostGIS (see api/geo.py). The geohash is derived on save.
+    """
+    lat = models.FloatField(null=True, blank=True,
+                            validators=[MinValueValidator(-90), MaxValueValidator(90)])
+    lng = models.FloatField(null=True, blank=True,
+                            validators=[MinValueValidator(-180), MaxValueValidator(180)])
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True, editable=False)
+
+    GEO_SOURCE_FIELDS = {'lat', 'lng'}
+
+    class Meta:
+        abstract = True
+
+    def refresh_geohash(self, kwargs):
+        from .geo import encode
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not self.GEO_SOURCE_FIELDS & set(update_fields):
+            return
+        if self.lat is None or self.lng is None:
+            self.geohash = ''
+        else:
+            self.geohash = encode(self.lat, self.lng)
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'geohash'}
+
+
 class ServiceCategory(models.TextChoices):
     REPAIR = 'Ремонт', 'Ремонт'
     TUTORS = 'Репетиторы', 'Репетиторы'
@@ -70,7 +101,7 @@ class ServiceCategory(models.TextChoices):
     EVENTS = 'Артисты', 'Артисты'
     OTHER = 'Другое', 'Другое'
 
-class SpecialistProfile(models.Model):
+class SpecialistProfile(GeoPointMixin):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='specialist_profile')
     category = models.CharField(max_length=50, choices=ServiceCategory.choices)
     rating = models.FloatField(default=0.0)
@@ -84,15 +115,72 @@ class SpecialistProfile(models.Model):
     telegram = models.CharField(max_length=100, blank=True)
     instagram = models.CharField(max_length=100, blank=True)
     balance = models.DecimalField(max_digits=12, decimal_places=0, default=0) # UZS
+    # Denormalized text for full-text search: name + tags + description (see api/search.py)
+    search_document = models.TextField(blank=True, default='', editable=False)
+
+    SEARCH_SOURCE_FIELDS = {'description', 'tags'}
 
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.category}"
 
+    def build_search_document(self):
+        parts = [self.user.get_full_name(), self.user.username, ' '.join(self.tags or []), self.description]
+        return '\n'.join(part for part in parts if part)
+
+    def save(self, *args, **kwargs):
+        self.refresh_geohash(kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.search_document = self.build_search_document()
+        elif self.SEARCH_SOURCE_FIELDS & set(update_fields):
+            self.search_document = self.build_search_document()
+            kwargs['update_fields'] = set(update_fields) | {'search_document'}
+        super().save(*args, **kwargs)
+
+class SpecialistTag(models.Model):
+    """
+    Normalized copy of SpecialistProfile.tags, one row per (tag, profile).
+    The JSON list stays the source of truth; this table exists so tag filters
+    are an index lookup instead of a JSON scan. Kept in sync by a post_save signal.
+    """
+    profile = models.ForeignKey(SpecialistProfile, on_delete=models.CASCADE, related_name='tag_links')
+    name = models.CharField(max_length=100)  # normalized: stripped + casefolded
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'profile'], name='uniq_specialist_tag'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} → {self.profile_id}"
+
+class MapCluster(models.Model):
+    """
+    Precomputed map aggregate: how many specialists of one category sit in one
+    geohash cell, plus coordinate sums for the centroid. One row per
+    (precision, cell, category); maintained incrementally by signals (api/map_tiles.py).
+    """
+    precision = models.PositiveSmallIntegerField()
+    cell = models.CharField(max_length=12)
+    category = models.CharField(max_length=50, choices=ServiceCategory.choices)
+    count = models.IntegerField(default=0)
+    lat_sum = models.FloatField(default=0.0)
+    lng_sum = models.FloatField(default=0.0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['precision', 'cell', 'category'], name='uniq_map_cluster_cell'),
+        ]
+
+    def __str__(self):
+        return f"{self.precision}:{self.cell} {self.category} × {self.count}"
+
 class Transaction(models.Model):
     class Type(models.TextChoices):
         TOP_UP = 'TOP_UP', 'Пополнение баланса'
         RESPONSE_FEE = 'RESPONSE_FEE', 'Плата за отклик'
         DEAL_FEE = 'DEAL_FEE', 'Комиссия за сделку'
+        REFUND = 'REFUND', 'Возврат средств'
 
     class Status(models.TextChoices):
         PENDING = 'PENDING', 'Ожидает'
@@ -113,7 +201,7 @@ class Transaction(models.Model):
     def __str__(self):
         return f"{self.user.email} - {self.transaction_type} - {self.amount} UZS"
 
-class Task(models.Model):
+class Task(GeoPointMixin):
     class Status(models.TextChoices):
         OPEN = 'OPEN', 'В поиске'
         IN_PROGRESS = 'IN_PROGRESS', 'В работе'
@@ -126,14 +214,82 @@ class Task(models.Model):
     description = models.TextField()
     category = models.CharField(max_length=50, choices=ServiceCategory.choices)
     budget = models.CharField(max_length=100, blank=True)  # e.g. "100 000 UZS"
+    # Parsed from budget on save (api/budget.py); NULL when it has no number or no upper bound
+    budget_min = models.PositiveBigIntegerField(null=True, blank=True, db_index=True, editable=False)
+    budget_max = models.PositiveBigIntegerField(null=True, blank=True, db_index=True, editable=False)
     location = models.CharField(max_length=255, blank=True)
     date_info = models.CharField(max_length=100, blank=True)  # e.g. "Завтра в 14:00"
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.OPEN)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Denormalized count of TaskResponse rows, maintained with F() updates by signals
+    responses_count = models.PositiveIntegerField(default=0, editable=False)
+    # Set when the task reaches COMPLETED/CANCELED; the archive counts its age from here
+    finished_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Task feed: equality on status/category, newest first
+            models.Index(fields=['status', 'category', '-created_at'], name='api_task_feed_idx'),
+            # Archival: finished tasks by completion time
+            models.Index(fields=['status', 'finished_at'], name='api_task_finished_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    BUDGET_SOURCE_FIELDS = {'budget'}
+    FINISHED_STATUSES = {Status.COMPLETED, Status.CANCELED}
+    # Written only by F() updates (signals, rebuild command); a full save must not overwrite them
+    COUNTER_FIELDS = {'responses_count'}
+
+    def save(self, *args, **kwargs):
+        from .budget import parse_budget
+
+        if kwargs.get('update_fields') is None and not self._state.adding and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = {
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            }
+        self.refresh_geohash(kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.BUDGET_SOURCE_FIELDS & set(update_fields):
+            self.budget_min, self.budget_max = parse_budget(self.budget)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'budget_min', 'budget_max'}
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'status' in update_fields:
+            self.refresh_finished_at()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'finished_at'}
+        super().save(*args, **kwargs)
+
+    def refresh_finished_at(self):
+        if self.status not in self.FINISHED_STATUSES:
+            self.finished_at = None
+        elif self.finished_at is None:
+            self.finished_at = timezone.now()
+
+def SET_NULL_UNLESS_ARCHIVED(collector, field, sub_objs, using):
+    """
+    on_delete for links to Task that should survive archival: rows pointing at
+    a task that was copied to ArchivedTask keep their task_id (the column has
+    no DB constraint), any other deleted task is set to NULL as before.
+
+    So a dangling task_id is intended and always names an ArchivedTask; read
+    it as an id (``message.task`` raises Task.DoesNotExist) and resolve it
+    against the archive, as the detail endpoints do.
+    """
+    if not isinstance(sub_objs, models.QuerySet):
+        sub_objs = field.model._base_manager.using(using).filter(pk__in=[obj.pk for obj in sub_objs])
+    archived = ArchivedTask.objects.using(using).filter(id=models.OuterRef(field.attname))
+    collector.add_field_update(field, None, sub_objs.exclude(models.Exists(archived)))
+
+
+# Ask the collector for a queryset rather than loaded rows, as Django's own SET_NULL
+# does. Optional: without it the handler rebuilds the queryset from the rows above.
+SET_NULL_UNLESS_ARCHIVED.lazy_sub_objs = True
+
+
 class TaskResponse(models.Model):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='responses')
     specialist = models.ForeignKey(SpecialistProfile, on_delete=models.CASCADE)
@@ -141,23 +297,67 @@ class TaskResponse(models.Model):
     price = models.DecimalField(max_digits=12, decimal_places=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # One response per specialist per task; also the (task, specialist) lookup index
+            models.UniqueConstraint(fields=['task', 'specialist'], name='uniq_task_response'),
+        ]
+        indexes = [
+            models.Index(fields=['task', 'created_at'], name='api_response_task_created'),
+        ]
+
 class Message(models.Model):
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages')
     receiver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='received_messages')
-    task = models.ForeignKey(Task, on_delete=models.SET_NULL, null=True, blank=True, related_name='messages')
+    # May point at an ArchivedTask id once the task is archived (see api/archive.py)
+    task = models.ForeignKey(Task, on_delete=SET_NULL_UNLESS_ARCHIVED, null=True, blank=True,
+                             related_name='messages', db_constraint=False)
     text = models.TextField(blank=True)
     image = models.ImageField(upload_to='message_images/', blank=True, null=True)
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # One per direction: a conversation's history is two range scans (api/conversations.py)
+            models.Index(fields=['sender', 'receiver', 'created_at'], name='api_message_sent_history'),
+            models.Index(fields=['receiver', 'sender', 'created_at'], name='api_message_recv_history'),
+        ]
+
     def __str__(self):
         return f"From {self.sender} to {self.receiver}: {self.text[:20]}"
 
 
+class Conversation(models.Model):
+    """
+    One row per (owner, counterpart): the latest message between them and how
+    many of the counterpart's messages the owner has not read. Maintained on
+    message insert/read by the Message signals (api/conversations.py).
+    """
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversations')
+    counterpart = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    last_message = models.ForeignKey(Message, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    unread_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'counterpart'], name='uniq_conversation'),
+        ]
+        indexes = [
+            models.Index(fields=['owner', '-updated_at', '-id'], name='api_conversation_recent'),
+        ]
+
+    def __str__(self):
+        return f"{self.owner_id} ↔ {self.counterpart_id} ({self.unread_count} unread)"
+
+
 class Review(models.Model):
     specialist = models.ForeignKey(SpecialistProfile, on_delete=models.CASCADE, related_name='reviews')
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='written_reviews')
-    task = models.ForeignKey(Task, on_delete=models.SET_NULL, null=True, blank=True, related_name='reviews')
+    # May point at an ArchivedTask id once the task is archived (see api/archive.py)
+    task = models.ForeignKey(Task, on_delete=SET_NULL_UNLESS_ARCHIVED, null=True, blank=True,
+                             related_name='reviews', db_constraint=False)
     text = models.TextField(blank=True)
 
     # Sub-scores (1-5)
@@ -177,9 +377,63 @@ class Review(models.Model):
         return f"{self.author.username} → {self.specialist}: {self.score_overall}★"
 
 
-from django.db.models.signals import post_save
+class ArchivedTask(models.Model):
+    """
+    Cold copy of a finished Task, moved here by api/archive.py. Keeps the
+    original id so links from messages, reviews and URLs still resolve.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    client = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_tasks')
+    assigned_specialist = models.ForeignKey(SpecialistProfile, on_delete=models.SET_NULL, null=True, blank=True,
+                                            related_name='archived_assigned_tasks')
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    category = models.CharField(max_length=50, choices=ServiceCategory.choices)
+    budget = models.CharField(max_length=100, blank=True)
+    budget_min = models.PositiveBigIntegerField(null=True, blank=True)
+    budget_max = models.PositiveBigIntegerField(null=True, blank=True)
+    location = models.CharField(max_length=255, blank=True)
+    date_info = models.CharField(max_length=100, blank=True)
+    status = models.CharField(max_length=20, choices=Task.Status.choices)
+    lat = models.FloatField(null=True, blank=True)
+    lng = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    responses_count = models.PositiveIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.title} (archived)"
+
+
+class ArchivedTaskResponse(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    task = models.ForeignKey(ArchivedTask, on_delete=models.CASCADE, related_name='responses')
+    specialist = models.ForeignKey(SpecialistProfile, on_delete=models.CASCADE, related_name='archived_responses')
+    message = models.TextField()
+    price = models.DecimalField(max_digits=12, decimal_places=0)
+    created_at = models.DateTimeField()
+
+
+class ResponseNotification(models.Model):
+    """
+    Outbox row for "new response to your task" emails. Rows are written in the
+    same commit as the response and flushed as one digest per client once the
+    oldest has waited RESPONSE_DIGEST_WINDOW_SECONDS (api/notifications.py).
+    """
+    client = models.ForeignKey(User, on_delete=models.CASCADE, related_name='pending_response_notifications')
+    response = models.OneToOneField(TaskResponse, on_delete=models.CASCADE, related_name='notification')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['client', 'created_at'], name='api_response_notif_client'),
+        ]
+
+
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from django.db.models import Avg
+from django.db.models import Avg, F
 
 @receiver(post_save, sender=Review)
 def update_specialist_rating(sender, instance, **kwargs):
@@ -194,3 +448,199 @@ def update_specialist_rating(sender, instance, **kwargs):
         profile.rating = round(avg, 2)
     profile.reviews_count = count
     profile.save(update_fields=['rating', 'reviews_count'])
+
+
+@receiver(post_save, sender=SpecialistProfile)
+def sync_specialist_search_index(sender, instance, update_fields=None, **kwargs):
+    """Keep the search index in step with the profile's search document."""
+    if update_fields is not None and 'search_document' not in update_fields:
+        return
+    from .search import index_specialist
+    index_specialist(instance)
+
+
+@receiver(post_save, sender=SpecialistProfile)
+def sync_specialist_tag_links(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'tags' not in update_fields:
+        return
+    from .tags import sync_specialist_tags
+    sync_specialist_tags(instance)
+
+
+@receiver(pre_save, sender=SpecialistProfile)
+def remember_specialist_map_point(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'lat', 'lng', 'category'} & set(update_fields):
+        return
+    from .map_tiles import remember_map_point
+    remember_map_point(instance)
+
+
+@receiver(post_save, sender=SpecialistProfile)
+def refresh_specialist_map_clusters(sender, instance, **kwargs):
+    from .map_tiles import move_map_point
+    move_map_point(instance)
+
+
+@receiver(post_delete, sender=SpecialistProfile)
+def remove_specialist_from_map_clusters(sender, instance, **kwargs):
+    from .map_tiles import remove_map_point
+    remove_map_point(instance)
+
+
+@receiver(post_save, sender=SpecialistProfile)
+def sync_specialist_typeahead(sender, instance, update_fields=None, **kwargs):
+    # A rename reaches the profile as a search_document-only save.
+    if update_fields is not None and not {'tags', 'search_document'} & set(update_fields):
+        return
+    from .typeahead import typeahead_index
+    typeahead_index.sync_profile(instance)
+
+
+@receiver(post_delete, sender=SpecialistProfile)
+def remove_specialist_from_typeahead(sender, instance, **kwargs):
+    from .typeahead import typeahead_index
+    typeahead_index.remove_profile(instance.pk)
+
+
+@receiver(post_delete, sender=SpecialistProfile)
+def remove_specialist_from_search_index(sender, instance, **kwargs):
+    from .search import unindex_specialist
+    unindex_specialist(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def refresh_specialist_search_name(sender, instance, created, update_fields=None, **kwargs):
+    """A renamed user must stay findable by the new name."""
+    if created:
+        return
+    if update_fields is not None and not {'first_name', 'last_name', 'username'} & set(update_fields):
+        return
+    try:
+        profile = instance.specialist_profile
+    except SpecialistProfile.DoesNotExist:
+        return
+    profile.user = instance
+    document = profile.build_search_document()
+    if document != profile.search_document:
+        profile.search_document = document
+        profile.save(update_fields=['search_document'])
+
+
+@receiver(post_save, sender=TaskResponse)
+def increment_task_responses_count(sender, instance, created, **kwargs):
+    if created:
+        Task.objects.filter(pk=instance.task_id).update(responses_count=F('responses_count') + 1)
+
+
+@receiver(post_delete, sender=TaskResponse)
+def decrement_task_responses_count(sender, instance, **kwargs):
+    Task.objects.filter(pk=instance.task_id, responses_count__gt=0).update(
+        responses_count=F('responses_count') - 1
+    )
+
+
+def _forget_task_chat_rules(task_id):
+    from .chat_rules import invalidate_task_chat_rules
+
+    # Drop now, and again after commit in case a concurrent reader re-cached the old rules
+    invalidate_task_chat_rules(task_id)
+    transaction.on_commit(lambda: invalidate_task_chat_rules(task_id))
+
+
+@receiver(post_save, sender=TaskResponse)
+def refresh_chat_rules_on_response(sender, instance, created, **kwargs):
+    if created:
+        _forget_task_chat_rules(instance.task_id)
+
+
+@receiver(post_delete, sender=TaskResponse)
+def refresh_chat_rules_on_response_delete(sender, instance, **kwargs):
+    _forget_task_chat_rules(instance.task_id)
+
+
+@receiver(post_save, sender=Message)
+def update_conversations(sender, instance, created, update_fields=None, **kwargs):
+    from .conversations import record_message, refresh_unread
+
+    if created:
+        record_message(instance)
+    elif update_fields is None or 'is_read' in update_fields:
+        refresh_unread(instance.receiver_id, instance.sender_id)
+
+
+@receiver(pre_save, sender=Task)
+def remember_task_status(sender, instance, update_fields=None, **kwargs):
+    instance._previous_status = instance._previous_client_id = None
+    if instance.pk is None or (update_fields is not None and not {'status', 'client'} & set(update_fields)):
+        return
+    previous = Task.objects.filter(pk=instance.pk).values_list('status', 'client_id').first()
+    if previous is not None:
+        instance._previous_status, instance._previous_client_id = previous
+
+
+@receiver(post_save, sender=Task)
+def refresh_chat_rules_on_owner_change(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_client_id', None)
+    if not created and previous is not None and previous != instance.client_id:
+        _forget_task_chat_rules(instance.pk)
+
+
+@receiver(post_save, sender=Task)
+def publish_task_to_feed(sender, instance, created, **kwargs):
+    """Push new open tasks and status changes to the live feed once committed."""
+    from .task_feed import EVENT_CREATED, EVENT_STATUS, publish_task_event, task_payload
+
+    if created:
+        if instance.status != Task.Status.OPEN:
+            return
+        event = EVENT_CREATED
+    else:
+        previous = getattr(instance, '_previous_status', None)
+        if previous is None or previous == instance.status:
+            return
+        event = EVENT_STATUS
+    payload = task_payload(instance)
+    transaction.on_commit(lambda: publish_task_event(event, payload))
+
+
+@receiver(post_delete, sender=Task)
+def remove_task_from_feed(sender, instance, **kwargs):
+    if instance.status != Task.Status.OPEN:
+        return
+    from .task_feed import EVENT_DELETED, publish_task_event, task_payload
+
+    payload = task_payload(instance)
+    transaction.on_commit(lambda: publish_task_event(EVENT_DELETED, payload))
+
+
+PUBLIC_USER_FIELDS = {'first_name', 'last_name', 'username', 'avatar_url', 'location'}
+
+
+@receiver(post_save, sender=SpecialistProfile)
+@receiver(post_delete, sender=SpecialistProfile)
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=TaskResponse)
+@receiver(post_delete, sender=TaskResponse)
+def invalidate_public_catalog(sender, **kwargs):
+    from .catalog import bump_catalog_version
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_ws_user_snapshot(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'is_active', 'role'} & set(update_fields):
+        return
+    from .ws_auth import forget_user_snapshot
+    forget_user_snapshot(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_public_catalog_for_user(sender, update_fields=None, **kwargs):
+    # Logins save last_login only; that is not part of the public catalog.
+    if update_fields is not None and not PUBLIC_USER_FIELDS & set(update_fields):
+        return
+    from .catalog import bump_catalog_version
+    bump_catalog_version()
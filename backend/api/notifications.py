@@ -0,0 +1,128 @@
+"""
+Digest emails for new task responses.
+
+Creating a response only writes a ResponseNotification outbox row in the
+same commit. The periodic flush (api.tasks.flush_response_digests) picks
+every client whose oldest pending row is older than
+RESPONSE_DIGEST_WINDOW_SECONDS and sends that client one email listing
+all their new responses. All digests in a run share one SMTP connection.
+A client's rows are claimed (deleted) in a short transaction before the
+send and put back if it fails, so no locks are held across SMTP. Clients
+without an email address are never claimed; their rows wait until one is set.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Case, Min, Value, When
+from django.utils import timezone
+
+from .models import ResponseNotification, TaskResponse
+
+logger = logging.getLogger(__name__)
+
+MAX_CLIENTS_PER_FLUSH = 500
+
+
+def enqueue_response_notification(response):
+    ResponseNotification.objects.create(client_id=response.task.client_id, response=response)
+
+
+def _window():
+    return timedelta(seconds=max(getattr(settings, 'RESPONSE_DIGEST_WINDOW_SECONDS', 300), 0))
+
+
+def due_client_ids(now=None):
+    cutoff = (now or timezone.now()) - _window()
+    return list(
+        ResponseNotification.objects.exclude(client__email='')
+        .values('client_id')
+        .annotate(oldest=Min('created_at'))
+        .filter(oldest__lte=cutoff)
+        .order_by('oldest')
+        .values_list('client_id', flat=True)[:MAX_CLIENTS_PER_FLUSH]
+    )
+
+
+def build_digest(client, notifications):
+    count = len(notifications)
+    lines = [f"Здравствуйте!\n\nНа ваши задания пришло новых откликов: {count}.\n"]
+    for notification in notifications:
+        response = notification.response
+        lines.append(
+            f"• «{response.task.title}»: {response.specialist.user.get_full_name() or 'Специалист'}, "
+            f"{response.price} UZS\n  {response.message}"
+        )
+    lines.append("\nЗайдите в личный кабинет, чтобы ответить.")
+    return EmailMessage(
+        subject=f"Новые отклики на ваши задания ({count})",
+        body='\n'.join(lines),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[client.email],
+    )
+
+
+def _claim(client_id):
+    """Delete one client's pending rows in a short transaction and return them, oldest first."""
+    with transaction.atomic():
+        notifications = list(
+            ResponseNotification.objects.select_for_update(skip_locked=True, of=('self',))
+            .filter(client_id=client_id)
+            .exclude(client__email='')
+            .select_related('client', 'response__task', 'response__specialist__user')
+            .order_by('created_at')
+        )
+        ResponseNotification.objects.filter(id__in=[n.id for n in notifications]).delete()
+    return notifications
+
+
+def _restore(notifications):
+    """Put claimed rows back after a failed send so the next run retries them."""
+    alive = set(TaskResponse.objects.filter(id__in=[n.response_id for n in notifications])
+                .values_list('id', flat=True))
+    rows = [n for n in notifications if n.response_id in alive]
+    ResponseNotification.objects.bulk_create(
+        [ResponseNotification(id=n.id, client_id=n.client_id, response_id=n.response_id) for n in rows],
+        ignore_conflicts=True,
+    )
+    # auto_now_add stamped them afresh; keep the original age so the window is not restarted
+    ResponseNotification.objects.filter(id__in=[n.id for n in rows]).update(created_at=Case(
+        *[When(id=n.id, then=Value(n.created_at)) for n in rows],
+    ))
+
+
+def _flush_client(client_id, connection):
+    """Send and clear one client's pending rows; returns 1 if a digest went out."""
+    # SMTP runs outside the transaction so no row locks are held while it talks to the server
+    notifications = _claim(client_id)
+    if not notifications:
+        return 0
+    client = notifications[0].client
+    try:
+        connection.open()  # no-op once open
+        connection.send_messages([build_digest(client, notifications)])
+    except Exception:
+        _restore(notifications)
+        raise
+    return 1
+
+
+def flush_response_digests(now=None):
+    """Send a digest to every client whose window has elapsed. Returns the number of emails sent."""
+    client_ids = due_client_ids(now)
+    if not client_ids:
+        return 0
+    sent = 0
+    connection = get_connection()
+    try:
+        for client_id in client_ids:
+            try:
+                sent += _flush_client(client_id, connection)
+            except Exception:
+                logger.exception("Failed to send response digest to client %s", client_id)
+                connection.close()  # reconnect for the next client
+    finally:
+        connection.close()
+    return sent
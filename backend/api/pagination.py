@@ -0,0 +1,57 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class SpecialistCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the public specialist directory.
+
+    Ordering is on the primary key, which is unique and never changes,
+    so pages stay stable while profiles are being created or edited.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = '-id'
+
+
+class SpecialistSearchPagination(PageNumberPagination):
+    """
+    Search results are ordered by a floating-point relevance score, which
+    makes a poor cursor, so they are paged by number instead. Cost is
+    bounded by the number of matches, not the size of the catalog.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class TaskCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the task feed, newest first. Each page is a range
+    scan on the (status, category, created_at) index, so its cost does not
+    depend on how deep into the feed the client is.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = '-created_at'
+
+
+class TaskResponseCursorPagination(CursorPagination):
+    """Responses to one task in the order they arrived, walked along the (task, created_at) index."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = 'created_at'
+
+
+class ConversationCursorPagination(CursorPagination):
+    """
+    A user's conversations, most recently active first, walked along the
+    (owner, updated_at, id) index. updated_at is not unique, so id breaks ties
+    and keeps the order total.
+    """
+    page_size = 30
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-updated_at', '-id')
@@ -0,0 +1,128 @@
+"""
+GCRA rate limiter shared by the chat socket and the DRF throttles.
+
+Each key holds a single number, the theoretical arrival time (TAT) of the
+next request, so state is O(1) per key whatever the rate. With the Redis
+cache backend a check is one EVALSHA of LIMIT_SCRIPT: read, decide and
+write happen atomically on the server using its own clock. ``ahit`` talks
+to Redis through redis.asyncio, so ChatConsumer checks without a thread
+hop; the local fallback below runs in a worker thread instead, since it
+blocks on a lock and sync cache calls.
+
+Without Redis (local development, tests) the same algorithm runs against
+the Django cache under a process-wide lock. That is atomic only within
+one process, which is all a locmem cache offers anyway.
+"""
+import asyncio
+import threading
+import time
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+REDIS_BACKEND = 'django.core.cache.backends.redis.RedisCache'
+KEY_PREFIX = 'rl'
+
+# KEYS[1]: limiter key; ARGV[1]: emission interval (ms); ARGV[2]: burst tolerance (ms).
+# Returns {allowed, retry_after_ms}.
+LIMIT_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = now_parts[1] * 1000 + math.floor(now_parts[2] / 1000)
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - tolerance
+if allow_at > now then
+    return {0, allow_at - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.max(math.ceil(new_tat - now), 1))
+return {1, 0}
+"""
+
+_local_lock = threading.Lock()
+_sync_scripts = {}
+_async_scripts = weakref.WeakKeyDictionary()
+
+
+def _params(limit, period):
+    interval = period * 1000 / max(limit, 1)
+    # Tolerance lets a full window's worth of requests through back to back
+    return interval, interval * max(limit, 1)
+
+
+def _redis_location():
+    config = settings.CACHES.get('default', {})
+    if config.get('BACKEND') != REDIS_BACKEND:
+        return None
+    location = config.get('LOCATION')
+    if isinstance(location, (list, tuple)):
+        location = location[0]
+    return location
+
+
+def _redis_key(key):
+    return cache.make_key(f'{KEY_PREFIX}:{key}')
+
+
+def _sync_script(location):
+    script = _sync_scripts.get(location)
+    if script is None:
+        import redis
+
+        script = redis.Redis.from_url(location).register_script(LIMIT_SCRIPT)
+        _sync_scripts[location] = script
+    return script
+
+
+def _async_script(location):
+    # redis.asyncio connections belong to the event loop that opened them
+    scripts = _async_scripts.setdefault(asyncio.get_running_loop(), {})
+    script = scripts.get(location)
+    if script is None:
+        import redis.asyncio
+
+        script = redis.asyncio.Redis.from_url(location).register_script(LIMIT_SCRIPT)
+        scripts[location] = script
+    return script
+
+
+def _local_hit(key, interval, tolerance):
+    cache_key = f'{KEY_PREFIX}:{key}'
+    with _local_lock:
+        now = time.time() * 1000
+        tat = max(cache.get(cache_key) or now, now)
+        new_tat = tat + interval
+        allow_at = new_tat - tolerance
+        if allow_at > now:
+            return False, (allow_at - now) / 1000
+        cache.set(cache_key, new_tat, timeout=max((new_tat - now) / 1000, 1))
+    return True, 0.0
+
+
+def hit(key, limit, period):
+    """
+    Count one request against ``limit`` per ``period`` seconds for ``key``.
+    Returns ``(allowed, retry_after_seconds)``.
+    """
+    interval, tolerance = _params(limit, period)
+    location = _redis_location()
+    if location is None:
+        return _local_hit(key, interval, tolerance)
+    allowed, retry_after_ms = _sync_script(location)(keys=[_redis_key(key)], args=[interval, tolerance])
+    return bool(allowed), int(retry_after_ms) / 1000
+
+
+async def ahit(key, limit, period):
+    """Native-async ``hit`` for consumers."""
+    interval, tolerance = _params(limit, period)
+    location = _redis_location()
+    if location is None:
+        return await sync_to_async(_local_hit)(key, interval, tolerance)
+    allowed, retry_after_ms = await _async_script(location)(keys=[_redis_key(key)], args=[interval, tolerance])
+    return bool(allowed), int(retry_after_ms) / 1000
@@ -4,4 +4,5 @@ from . import consumers
 websocket_urlpatterns = [
     re_path(r'ws/chat/(?P<task_id>\w+)/$', consumers.ChatConsumer.as_asgi()),
     re_path(r'ws/chat/$', consumers.ChatConsumer.as_asgi()),
+    re_path(r'ws/tasks/$', consumers.TaskFeedConsumer.as_asgi()),
 ]
@@ -0,0 +1,98 @@
+"""
+Full-text search over specialist profiles.
+
+Each profile keeps a denormalized ``search_document`` (name, tags and
+description). On PostgreSQL it is covered by a GIN index on
+``to_tsvector('simple', search_document)``; on SQLite (local dev) it is
+mirrored into an FTS5 virtual table. Both backends are created by
+migration 0010.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'simple'
+SEARCH_INDEX_NAME = 'api_specialist_search_gin'
+FTS_TABLE = 'api_specialistprofile_fts'
+MAX_QUERY_TERMS = 8
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(query):
+    """Split raw user input into at most MAX_QUERY_TERMS lowercase word tokens."""
+    return _TERM_RE.findall((query or '').lower())[:MAX_QUERY_TERMS]
+
+
+def search_vector():
+    return SearchVector('search_document', config=SEARCH_CONFIG)
+
+
+def _uses_fts5():
+    return connection.vendor == 'sqlite'
+
+
+def search_specialists(queryset, query):
+    """
+    Filter ``queryset`` to profiles matching every term of ``query`` (prefix
+    match) and order them by relevance. The result is annotated with
+    ``search_rank`` (higher is better).
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+
+    if connection.vendor == 'postgresql':
+        ts_query = SearchQuery(' & '.join(f'{term}:*' for term in terms),
+                               config=SEARCH_CONFIG, search_type='raw')
+        vector = search_vector()
+        return (
+            queryset.annotate(search=vector)
+            .filter(search=ts_query)
+            .annotate(search_rank=SearchRank(vector, ts_query))
+            .order_by('-search_rank', '-id')
+        )
+
+    if _uses_fts5():
+        match = ' '.join(f'"{term}"*' for term in terms)
+        table = queryset.model._meta.db_table
+        matched_ids = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        # bm25() is negative, lower meaning more relevant; flip it so both backends sort desc.
+        rank = RawSQL(
+            f'SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id',
+            [match],
+            output_field=FloatField(),
+        )
+        return (
+            queryset.filter(id__in=matched_ids)
+            .annotate(search_rank=rank)
+            .order_by('-search_rank', '-id')
+        )
+
+    # Unknown backend: unranked substring match, still correct just not indexed.
+    for term in terms:
+        queryset = queryset.filter(search_document__icontains=term)
+    return queryset.order_by('-id')
+
+
+def index_specialist(profile):
+    """Write the profile's search document into the SQLite FTS5 mirror."""
+    if not _uses_fts5():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [profile.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, search_document) VALUES (%s, %s)',
+            [profile.pk, profile.search_document],
+        )
+
+
+def unindex_specialist(profile_id):
+    if not _uses_fts5():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [profile_id])
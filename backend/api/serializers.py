@@ -1,7 +1,34 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
-from .models import User, SpecialistProfile, Task, TaskResponse, Message, Review
+from .models import (
+    User, SpecialistProfile, Task, TaskResponse, Message, Review, ArchivedTask, ArchivedTaskResponse, Conversation,
+)
+
+
+def requested_fields(context):
+    """
+    Field names from a ``?fields=a,b`` query parameter on GET requests, or
+    None when the client did not ask for a sparse fieldset.
+    """
+    request = context.get('request') if context else None
+    if request is None or request.method != 'GET':
+        return None
+    raw = request.query_params.get('fields')
+    if not raw:
+        return None
+    return {name.strip() for name in raw.split(',') if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """Drop every field not listed in ``?fields=`` (unknown names are ignored)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = requested_fields(self.context)
+        if wanted and wanted & set(self.fields):
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -111,15 +138,61 @@ class SpecialistProfileSerializer(serializers.ModelSerializer):
         model = SpecialistProfile
         fields = ['id', 'user', 'name', 'category', 'rating', 'reviews_count', 'location',
                   'price_start', 'avatarUrl', 'description', 'is_verified', 'tags',
-                  'passport_image', 'profile_image', 'telegram', 'instagram', 'balance']
-        read_only_fields = ['is_verified']
+                  'passport_image', 'profile_image', 'telegram', 'instagram', 'balance', 'lat', 'lng']
+        # balance moves only through api.balance.debit/credit
+        read_only_fields = ['is_verified', 'balance']
 
+    def update(self, instance, validated_data):
+        # Write only the submitted columns so the pre_save handlers can skip their lookups
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
 
-class TaskResponseSerializer(serializers.ModelSerializer):
+
+class SpecialistListSerializer(serializers.BaseSerializer):
+    """
+    Read-only compact row for specialist lists. Builds plain dicts straight
+    from the model instead of going through ModelSerializer field objects,
+    and leaves out private or heavy fields (passport, balance, uploads).
+    Honours ``?fields=``.
+    """
+    GETTERS = {
+        'id': lambda p: p.id,
+        'user': lambda p: p.user_id,
+        'name': lambda p: p.user.get_full_name(),
+        'category': lambda p: p.category,
+        'rating': lambda p: p.rating,
+        'reviews_count': lambda p: p.reviews_count,
+        'location': lambda p: p.user.location,
+        'price_start': lambda p: str(p.price_start),
+        'avatarUrl': lambda p: p.user.avatar_url,
+        'description': lambda p: p.description,
+        'is_verified': lambda p: p.is_verified,
+        'tags': lambda p: p.tags,
+        'telegram': lambda p: p.telegram,
+        'instagram': lambda p: p.instagram,
+        'lat': lambda p: p.lat,
+        'lng': lambda p: p.lng,
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = requested_fields(self.context)
+        if wanted and wanted & set(self.GETTERS):
+            self._getters = [(name, getter) for name, getter in self.GETTERS.items() if name in wanted]
+        else:
+            self._getters = list(self.GETTERS.items())
+
+    def to_representation(self, instance):
+        return {name: getter(instance) for name, getter in self._getters}
+
+
+class TaskResponseSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     specialistName = serializers.CharField(source='specialist.user.get_full_name', read_only=True)
     specialistAvatar = serializers.CharField(source='specialist.user.avatar_url', read_only=True)
     specialistRating = serializers.FloatField(source='specialist.rating', read_only=True)
-    specialist_user_id = serializers.ReadOnlyField(source='specialist.user.id')
+    specialist_user_id = serializers.ReadOnlyField(source='specialist.user_id')
 
     class Meta:
         model = TaskResponse
@@ -128,7 +201,7 @@ class TaskResponseSerializer(serializers.ModelSerializer):
         read_only_fields = ['specialist', 'specialist_user_id', 'specialistName', 'specialistAvatar', 'specialistRating']
 
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     sender_name = serializers.CharField(source='sender.get_full_name', read_only=True)
     sender_avatar = serializers.CharField(source='sender.avatar_url', read_only=True)
     receiver_name = serializers.CharField(source='receiver.get_full_name', read_only=True)
@@ -148,17 +221,49 @@ class MessageSerializer(serializers.ModelSerializer):
         return False
 
 
-class TaskSerializer(serializers.ModelSerializer):
-    responses_count = serializers.IntegerField(source='responses.count', read_only=True)
+class ConversationSerializer(serializers.ModelSerializer):
+    """One row of the caller's conversation list (api/conversations.py)."""
+    counterpart_name = serializers.CharField(source='counterpart.get_full_name', read_only=True)
+    counterpart_avatar = serializers.CharField(source='counterpart.avatar_url', read_only=True)
+    last_message = MessageSerializer(read_only=True)
 
+    class Meta:
+        model = Conversation
+        fields = ['counterpart', 'counterpart_name', 'counterpart_avatar', 'last_message', 'unread_count', 'updated_at']
+        read_only_fields = fields
+
+
+class MarkReadSerializer(serializers.Serializer):
+    """Body of POST /api/messages/read/."""
+    counterpart = serializers.IntegerField(min_value=1)
+    up_to = serializers.IntegerField(min_value=1)
+
+
+class TaskSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Task
-        fields = ['id', 'client', 'title', 'description', 'category', 'budget',
-                  'location', 'date_info', 'status', 'created_at', 'responses_count', 'assigned_specialist']
-        read_only_fields = ['client']
+        fields = ['id', 'client', 'title', 'description', 'category', 'budget', 'budget_min', 'budget_max',
+                  'location', 'date_info', 'status', 'created_at', 'responses_count', 'assigned_specialist',
+                  'lat', 'lng']
+        read_only_fields = ['client', 'responses_count', 'budget_min', 'budget_max']
+
+
+class ArchivedTaskSerializer(TaskSerializer):
+    """Read-only detail representation of a task moved to the archive (api/archive.py)."""
+    class Meta:
+        model = ArchivedTask
+        fields = TaskSerializer.Meta.fields + ['archived_at']
+        read_only_fields = fields
+
+
+class ArchivedTaskResponseSerializer(TaskResponseSerializer):
+    class Meta:
+        model = ArchivedTaskResponse
+        fields = TaskResponseSerializer.Meta.fields
+        read_only_fields = fields
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     author_name = serializers.CharField(source='author.get_full_name', read_only=True)
     author_avatar = serializers.CharField(source='author.avatar_url', read_only=True)
 
@@ -0,0 +1,61 @@
+"""
+Tag filtering backed by the normalized SpecialistTag table.
+
+SpecialistProfile.tags is a free-form JSON list; SpecialistTag mirrors it
+one row per tag under a unique (name, profile) index, so "tagged X" is an
+index range scan instead of decoding JSON on every row.
+"""
+from django.db.models import Count
+
+from .models import SpecialistTag
+
+MAX_TAG_LENGTH = 100
+MAX_FILTER_TAGS = 10
+
+
+def normalize_tag(tag):
+    return str(tag).strip().casefold()[:MAX_TAG_LENGTH]
+
+
+def normalize_tags(tags):
+    return {name for name in (normalize_tag(tag) for tag in tags or []) if name}
+
+
+def sync_specialist_tags(profile):
+    """Make the profile's SpecialistTag rows match its tags list."""
+    wanted = normalize_tags(profile.tags)
+    existing = set(SpecialistTag.objects.filter(profile=profile).values_list('name', flat=True))
+
+    stale = existing - wanted
+    if stale:
+        SpecialistTag.objects.filter(profile=profile, name__in=stale).delete()
+    missing = wanted - existing
+    if missing:
+        SpecialistTag.objects.bulk_create(
+            [SpecialistTag(profile=profile, name=name) for name in missing],
+            ignore_conflicts=True,
+        )
+
+
+def filter_by_tags(queryset, any_of=None, all_of=None):
+    """
+    Restrict a SpecialistProfile queryset to profiles carrying at least one
+    of ``any_of`` and every one of ``all_of``. Callers cap each list at
+    MAX_FILTER_TAGS (SpecialistViewSet answers 400 beyond it).
+    """
+    any_names = normalize_tags(any_of)
+    if any_names:
+        queryset = queryset.filter(
+            id__in=SpecialistTag.objects.filter(name__in=any_names).values('profile_id')
+        )
+
+    all_names = normalize_tags(all_of)
+    if all_names:
+        queryset = queryset.filter(
+            id__in=SpecialistTag.objects.filter(name__in=all_names)
+            .values('profile_id')
+            .annotate(matched=Count('id'))
+            .filter(matched=len(all_names))
+            .values('profile_id')
+        )
+    return queryset
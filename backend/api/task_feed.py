@@ -0,0 +1,58 @@
+"""
+Live task feed: one channel-layer group per service category.
+
+Category values are Cyrillic ("Ремонт") and channel group names must be
+ASCII, so groups are keyed by the enum member name: ``task_feed_REPAIR``.
+TaskFeedConsumer (consumers.py) joins the groups a client subscribes to;
+the Task signals in models.py publish here after the transaction commits.
+"""
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from .models import ServiceCategory
+
+logger = logging.getLogger(__name__)
+
+EVENT_CREATED = 'created'
+EVENT_STATUS = 'status'
+EVENT_DELETED = 'deleted'
+
+
+def category_group(category):
+    """Group name for a category value, or None if it is not a known category."""
+    try:
+        return f'task_feed_{ServiceCategory(category).name}'
+    except ValueError:
+        return None
+
+
+def task_payload(task):
+    return {
+        'id': task.id,
+        'title': task.title,
+        'description': task.description,
+        'category': task.category,
+        'budget': task.budget,
+        'budget_min': task.budget_min,
+        'budget_max': task.budget_max,
+        'location': task.location,
+        'date_info': task.date_info,
+        'status': task.status,
+        'lat': task.lat,
+        'lng': task.lng,
+        'responses_count': task.responses_count,
+        'created_at': task.created_at.isoformat() if task.created_at else None,
+    }
+
+
+def publish_task_event(event, payload):
+    group = category_group(payload['category'])
+    channel_layer = get_channel_layer()
+    if group is None or channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(group, {'type': 'task_feed_event', 'event': event, 'task': payload})
+    except Exception:
+        logger.exception("Failed to publish %s event for task %s", event, payload['id'])
@@ -23,3 +23,40 @@ def send_notification_email(subject, message, recipient_list):
     except Exception as e:
         logger.error(f"Failed to send email to {recipient_list}: {e}")
         return False
+
+
+@shared_task(ignore_result=True)
+def match_task_specialists(task_id):
+    """
+    Scores specialists for a newly created task and notifies the best
+    matches over WebSocket and email in batches (see api/matching.py).
+    """
+    from .matching import match_task
+
+    matched = match_task(task_id)
+    logger.info(f"Task {task_id} matched {matched} specialists")
+
+
+@shared_task(ignore_result=True)
+def archive_finished_tasks():
+    """
+    Nightly: moves finished tasks older than TASK_ARCHIVE_AFTER_DAYS, with
+    their responses, into the archive tables (see api/archive.py).
+    """
+    from .archive import archive_finished_tasks as archive
+
+    archived = archive()
+    logger.info(f"Archived {archived} finished tasks")
+
+
+@shared_task(ignore_result=True)
+def flush_response_digests():
+    """
+    Every minute: one digest email per client whose oldest pending response
+    notification has waited RESPONSE_DIGEST_WINDOW_SECONDS (see api/notifications.py).
+    """
+    from .notifications import flush_response_digests as flush
+
+    sent = flush()
+    if sent:
+        logger.info(f"Sent {sent} response digest emails")
@@ -0,0 +1,29 @@
+from rest_framework.throttling import ScopedRateThrottle
+
+from .rate_limit import hit
+
+
+class AtomicScopedRateThrottle(ScopedRateThrottle):
+    """
+    ScopedRateThrottle with the same scopes, rates and cache keys, but
+    counted by the GCRA limiter in api/rate_limit.py: one atomic round trip
+    and one number per key instead of a growing list of timestamps.
+    """
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        allowed, self.retry_after = hit(self.key, self.num_requests, self.duration)
+        return allowed
+
+    def wait(self):
+        return self.retry_after or None
@@ -0,0 +1,229 @@
+"""
+In-process typeahead over tags, categories and specialist names.
+
+Suggestions come from one sorted list of ``(key, kind, ref)`` tuples, so
+a prefix lookup is a bisect plus a short forward scan and never touches
+the database. Multi-word labels get a key per word so "мебели" finds
+"Сборка мебели". The index is loaded lazily on first use, kept current
+by the SpecialistProfile signals in models.py once their transaction
+commits, and rebuilt after TYPEAHEAD_REBUILD_SECONDS so other worker
+processes converge on changes they did not see. That rebuild runs in a
+background thread; requests keep reading the stale index meanwhile.
+Profile edits applied while a rebuild is loading are journaled and
+replayed onto the new index before it is swapped in, so none are lost.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .models import ServiceCategory, SpecialistProfile
+
+KIND_CATEGORY = 'category'
+KIND_TAG = 'tag'
+KIND_SPECIALIST = 'specialist'
+_KIND_ORDER = {KIND_CATEGORY: 0, KIND_TAG: 1, KIND_SPECIALIST: 2}
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 25
+MAX_SCAN = 200
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text):
+    return ' '.join(str(text).casefold().split())
+
+
+def keys_for(label):
+    """The label itself plus every suffix starting at a word boundary."""
+    words = normalize(label).split()
+    return {' '.join(words[i:]) for i in range(len(words))}
+
+
+class TypeaheadIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()  # single flight; released by the rebuild thread
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._items = []
+            self._tags = {}       # normalized tag -> [display label, profile count]
+            self._profiles = {}   # profile id -> (name, frozenset of normalized tags)
+            self._loaded_at = None
+            self._pending = None  # edits seen while a rebuild is loading, else None
+
+    @property
+    def loaded(self):
+        return self._loaded_at is not None
+
+    # -- building -----------------------------------------------------------
+    # Incremental writers edit the sorted list in place and readers scan it,
+    # both under ``self._lock``; a full rebuild swaps in a new list after
+    # replaying the edits journaled while it was loading.
+
+    def _insert(self, items, label, kind, ref, bulk=False):
+        for key in keys_for(label):
+            if bulk:
+                items.append((key, kind, ref))
+            else:
+                insort(items, (key, kind, ref))
+
+    @staticmethod
+    def _delete(items, label, kind, ref):
+        for key in keys_for(label):
+            item = (key, kind, ref)
+            index = bisect_left(items, item)
+            if index < len(items) and items[index] == item:
+                del items[index]
+
+    def _add_profile(self, items, profile_id, name, tags, bulk=False):
+        tag_names = set()
+        for tag in tags or []:
+            norm = normalize(tag)
+            if not norm or norm in tag_names:
+                continue
+            tag_names.add(norm)
+            entry = self._tags.get(norm)
+            if entry is None:
+                self._tags[norm] = [str(tag).strip(), 1]
+                self._insert(items, norm, KIND_TAG, norm, bulk)
+            else:
+                entry[1] += 1
+        if name:
+            self._insert(items, name, KIND_SPECIALIST, profile_id, bulk)
+        self._profiles[profile_id] = (name, frozenset(tag_names))
+
+    def _drop_profile(self, items, profile_id):
+        previous = self._profiles.pop(profile_id, None)
+        if previous is None:
+            return
+        name, tag_names = previous
+        if name:
+            self._delete(items, name, KIND_SPECIALIST, profile_id)
+        for norm in tag_names:
+            entry = self._tags[norm]
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._tags[norm]
+                self._delete(items, norm, KIND_TAG, norm)
+
+    def _replace_profile(self, items, profile_id, name=None, tags=None):
+        self._drop_profile(items, profile_id)
+        if tags is not None:
+            self._add_profile(items, profile_id, name, tags)
+
+    def rebuild(self):
+        """Load everything from the database into a fresh index, then swap it in."""
+        with self._lock:
+            # Edits committed from here on may be missing from the rows read below
+            self._pending = []
+        try:
+            fresh = TypeaheadIndex()
+            items = []
+            for category in ServiceCategory:
+                fresh._insert(items, category.label, KIND_CATEGORY, category.value, bulk=True)
+            rows = SpecialistProfile.objects.values_list('id', 'tags', 'user__first_name', 'user__last_name')
+            for profile_id, tags, first_name, last_name in rows.iterator():
+                fresh._add_profile(items, profile_id, f'{first_name} {last_name}'.strip(), tags, bulk=True)
+            items.sort()
+
+            with self._lock:
+                # Replaying an edit the rows already contain is harmless: it carries the same state
+                for edit in self._pending:
+                    fresh._replace_profile(items, *edit)
+                self._items, self._tags, self._profiles = items, fresh._tags, fresh._profiles
+                self._loaded_at = time.monotonic()
+        finally:
+            with self._lock:
+                self._pending = None
+
+    def ensure_fresh(self):
+        if self._loaded_at is None:
+            # Nothing to serve yet: the first caller loads, concurrent ones wait for it
+            with self._rebuild_lock:
+                if self._loaded_at is None:
+                    self.rebuild()
+            return
+        max_age = getattr(settings, 'TYPEAHEAD_REBUILD_SECONDS', 300)
+        if time.monotonic() - self._loaded_at > max_age and self._rebuild_lock.acquire(blocking=False):
+            threading.Thread(target=self._rebuild_in_background, name='typeahead-rebuild', daemon=True).start()
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception("Typeahead rebuild failed; serving the previous index")
+        finally:
+            self._rebuild_lock.release()
+            connections.close_all()  # this thread's connections only
+
+    # -- incremental updates (from signals, applied after commit) -------------
+
+    def _tracking(self):
+        return self.loaded or self._pending is not None
+
+    def sync_profile(self, profile):
+        if not self._tracking():
+            return
+        profile_id, name, tags = profile.pk, profile.user.get_full_name(), list(profile.tags or [])
+        transaction.on_commit(lambda: self._apply(profile_id, name, tags))
+
+    def remove_profile(self, profile_id):
+        if not self._tracking():
+            return
+        transaction.on_commit(lambda: self._apply(profile_id))
+
+    def _apply(self, profile_id, name=None, tags=None):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((profile_id, name, tags))
+            self._replace_profile(self._items, profile_id, name, tags)
+
+    # -- queries --------------------------------------------------------------
+
+    def suggest(self, prefix, limit=DEFAULT_LIMIT):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        self.ensure_fresh()
+
+        matches, seen = [], set()
+        with self._lock:
+            items = self._items
+            index = bisect_left(items, (prefix,))
+            while index < len(items) and len(matches) < MAX_SCAN:
+                key, kind, ref = items[index]
+                if not key.startswith(prefix):
+                    break
+                index += 1
+                if (kind, ref) in seen:
+                    continue
+                seen.add((kind, ref))
+                suggestion = self._describe(kind, ref)
+                if suggestion is not None:
+                    matches.append(suggestion)
+
+        matches.sort(key=lambda s: (_KIND_ORDER[s['type']], -(s.get('count') or 0), s['label']))
+        return matches[:limit]
+
+    def _describe(self, kind, ref):
+        if kind == KIND_CATEGORY:
+            return {'type': KIND_CATEGORY, 'label': ServiceCategory(ref).label, 'value': ref}
+        if kind == KIND_TAG:
+            entry = self._tags.get(ref)
+            if entry is None:
+                return None
+            return {'type': KIND_TAG, 'label': entry[0], 'count': entry[1]}
+        profile = self._profiles.get(ref)
+        if profile is None:
+            return None
+        return {'type': KIND_SPECIALIST, 'label': profile[0], 'id': ref}
+
+
+typeahead_index = TypeaheadIndex()
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import SpecialistViewSet, AdminSpecialistViewSet, TaskViewSet, TaskResponseViewSet, MessageViewSet, AIAnalyzeView, GenerateDescriptionView, ReviewViewSet
+from .views import SpecialistViewSet, AdminSpecialistViewSet, TaskViewSet, TaskResponseViewSet, MessageViewSet, AIAnalyzeView, GenerateDescriptionView, ReviewViewSet, FacetsView, SuggestView
 from .auth_views import (
     RegisterView, VerifyEmailView, ResendVerificationView,
     LoginView, LogoutView, ForgotPasswordView, ResetPasswordView,
@@ -20,6 +20,8 @@ urlpatterns = [
     path('', include(router.urls)),
     path('health/live/', HealthLiveView.as_view(), name='health-live'),
     path('health/ready/', HealthReadyView.as_view(), name='health-ready'),
+    path('facets/', FacetsView.as_view(), name='facets'),
+    path('suggest/', SuggestView.as_view(), name='suggest'),
     path('ai/analyze/', AIAnalyzeView.as_view(), name='ai-analyze'),
     path('ai/generate-description/', GenerateDescriptionView.as_view(), name='ai-generate-description'),
     # === Auth endpoints ===
@@ -6,20 +6,79 @@ from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
-from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.generics import get_object_or_404
+from rest_framework.utils.urls import replace_query_param
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import Http404
 from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
-from .models import SpecialistProfile, Task, TaskResponse, User, Message, Review
-from .serializers import SpecialistProfileSerializer, TaskSerializer, TaskResponseSerializer, MessageSerializer, ReviewSerializer
+from .models import (
+    SpecialistProfile, Task, TaskResponse, User, Message, Review, ArchivedTask, ArchivedTaskResponse, Conversation,
+)
+from .serializers import (
+    SpecialistProfileSerializer, SpecialistListSerializer, TaskSerializer, TaskResponseSerializer,
+    MessageSerializer, ReviewSerializer, ArchivedTaskSerializer, ArchivedTaskResponseSerializer,
+    ConversationSerializer, MarkReadSerializer,
+)
 from .permissions import IsSpecialistProfileOwnerOrAdmin, IsTaskOwnerOrAdmin
+from .pagination import (
+    SpecialistCursorPagination, SpecialistSearchPagination, TaskCursorPagination, TaskResponseCursorPagination,
+    ConversationCursorPagination,
+)
+from .search import search_specialists
+from .tags import MAX_FILTER_TAGS, filter_by_tags, normalize_tags
 from .chat_rules import is_task_chat_pair_allowed
+from .throttling import AtomicScopedRateThrottle
+from .catalog import CatalogSnapshotMixin
+from .facets import get_facets
+from .balance import InsufficientFunds, charge_response_fee
+from .notifications import enqueue_response_notification
+from .conversations import (
+    HISTORY_MAX_PAGE_SIZE, HISTORY_PAGE_SIZE, mark_read, message_history, publish_read_receipt,
+)
+from . import geo, map_tiles, typeahead
 
 # Configure Gemini API Key (used by AIAnalyzeView and GenerateDescriptionView)
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 logger = logging.getLogger(__name__)
 
+class NearbyListMixin:
+    """
+    Adds a ``?near=lat,lng&radius=km&limit=n`` mode to ``list``: results
+    within the radius, closest first, each with a ``distance_km`` field.
+    """
+
+    def list(self, request, *args, **kwargs):
+        near = request.query_params.get('near')
+        if not near:
+            return super().list(request, *args, **kwargs)
+
+        lat, lng, radius_km, limit = self._parse_near_params(near, request.query_params)
+        objects = geo.nearby(self.filter_queryset(self.get_queryset()), lat, lng, radius_km, limit)
+        data = self.get_serializer(objects, many=True).data
+        for row, obj in zip(data, objects):
+            row['distance_km'] = obj.distance_km
+        return Response({'next': None, 'previous': None, 'results': data})
+
+    @staticmethod
+    def _parse_near_params(near, params):
+        try:
+            lat, lng = (float(part) for part in near.split(','))
+            radius_km = float(params.get('radius', geo.DEFAULT_RADIUS_KM))
+            limit = int(params.get('limit', geo.DEFAULT_NEAR_LIMIT))
+        except ValueError:
+            raise serializers.ValidationError({'near': 'Ожидается near=lat,lng и числовые radius/limit.'})
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise serializers.ValidationError({'near': 'Координаты вне допустимого диапазона.'})
+        if not 0 < radius_km <= geo.MAX_RADIUS_KM:
+            raise serializers.ValidationError({'radius': f'Радиус должен быть от 0 до {geo.MAX_RADIUS_KM:g} км.'})
+        return lat, lng, radius_km, min(max(limit, 1), geo.MAX_NEAR_LIMIT)
+
+
 class AdminSpecialistViewSet(viewsets.ReadOnlyModelViewSet):
     """
     Admin endpoint to review and verify specialist profiles.
@@ -49,10 +108,34 @@ class AdminSpecialistViewSet(viewsets.ReadOnlyModelViewSet):
         specialist.save(update_fields=['is_verified', 'passport_image'])
         return Response({"status": "rejected"})
 
-class SpecialistViewSet(viewsets.ModelViewSet):
-    queryset = SpecialistProfile.objects.all()
+class SpecialistViewSet(CatalogSnapshotMixin, NearbyListMixin, viewsets.ModelViewSet):
+    queryset = SpecialistProfile.objects.select_related('user')
     serializer_class = SpecialistProfileSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = SpecialistCursorPagination
+    catalog_resource = 'specialists'
+    catalog_params = ('user', 'tag', 'tag_all', 'near', 'radius', 'limit')
+
+    def get_serializer_class(self):
+        if self.action in ['list', 'search']:
+            return SpecialistListSerializer
+        return SpecialistProfileSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in ['list', 'search']:
+            return queryset
+
+        params = self.request.query_params
+        user_id = params.get('user')
+        if user_id and user_id.isdigit():
+            queryset = queryset.filter(user_id=user_id)
+        # ?tag=a&tag=b matches any of the tags, ?tag_all=a&tag_all=b requires all of them
+        any_of, all_of = params.getlist('tag'), params.getlist('tag_all')
+        for name, tags in (('tag', any_of), ('tag_all', all_of)):
+            if len(normalize_tags(tags)) > MAX_FILTER_TAGS:
+                raise serializers.ValidationError({name: f'Можно указать не более {MAX_FILTER_TAGS} тегов.'})
+        return filter_by_tags(queryset, any_of=any_of, all_of=all_of)
 
     def get_permissions(self):
         if self.action in ['create', 'my_stats']:
@@ -68,6 +151,49 @@ class SpecialistViewSet(viewsets.ModelViewSet):
             raise serializers.ValidationError("Только специалисты могут создать профиль специалиста.")
         serializer.save(user=self.request.user, is_verified=False)
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Relevance-ranked full-text search: /api/specialists/search/?q=..."""
+        queryset = search_specialists(self.get_queryset(), request.query_params.get('q', ''))
+        paginator = SpecialistSearchPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='map')
+    def map_tiles(self, request):
+        """
+        /api/specialists/map/?bbox=west,south,east,north&zoom=z
+        Clusters (count, centroid, top category) below RAW_POINTS_MIN_ZOOM, raw points above it.
+        """
+        try:
+            west, south, east, north = (float(part) for part in request.query_params.get('bbox', '').split(','))
+            zoom = int(request.query_params.get('zoom', 0))
+        except ValueError:
+            raise serializers.ValidationError({'bbox': 'Ожидается bbox=west,south,east,north и целый zoom.'})
+        if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180 and 0 <= zoom <= 22):
+            raise serializers.ValidationError({'bbox': 'Некорректная область карты.'})
+
+        if zoom < map_tiles.RAW_POINTS_MIN_ZOOM:
+            precision, clusters = map_tiles.clusters_in_bbox(south, west, north, east, zoom)
+            return Response({'zoom': zoom, 'precision': precision, 'clusters': clusters})
+
+        points = map_tiles.points_in_bbox(self.get_queryset(), south, west, north, east)
+        return Response({
+            'zoom': zoom,
+            'points': [
+                {
+                    'id': profile.id,
+                    'name': profile.user.get_full_name(),
+                    'category': profile.category,
+                    'rating': profile.rating,
+                    'lat': profile.lat,
+                    'lng': profile.lng,
+                }
+                for profile in points
+            ],
+        })
+
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated], url_path='my-stats')
     def my_stats(self, request):
         """Analytics KPIs for the currently logged-in specialist."""
@@ -79,7 +205,7 @@ class SpecialistViewSet(viewsets.ModelViewSet):
         from django.db.models import Sum, Avg
         from .models import Transaction
 
-        # Earnings: all successful TOP_UP transactions for this specialist's user
+        # Earnings: all successful TOP_UP transactions for this specialist's user (refunds are not earnings)
         earnings_qs = Transaction.objects.filter(
             user=request.user,
             transaction_type=Transaction.Type.TOP_UP,
@@ -87,10 +213,12 @@ class SpecialistViewSet(viewsets.ModelViewSet):
         )
         total_earnings = earnings_qs.aggregate(total=Sum('amount'))['total'] or 0
 
-        # Responses
-        all_responses = TaskResponse.objects.filter(specialist=profile)
-        total_responses = all_responses.count()
-        accepted = all_responses.filter(task__assigned_specialist=profile).count()
+        # Responses, including those moved to the archive with their finished tasks
+        total_responses = accepted = 0
+        for responses in (TaskResponse.objects.filter(specialist=profile),
+                          ArchivedTaskResponse.objects.filter(specialist=profile)):
+            total_responses += responses.count()
+            accepted += responses.filter(task__assigned_specialist=profile).count()
         conversion = round((accepted / total_responses * 100), 1) if total_responses > 0 else 0.0
 
         # Recent reviews (last 3)
@@ -117,13 +245,88 @@ class SpecialistViewSet(viewsets.ModelViewSet):
         })
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(CatalogSnapshotMixin, NearbyListMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all().order_by('-created_at')
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = TaskCursorPagination
+    catalog_resource = 'tasks'
+    catalog_params = ('status', 'category', 'client', 'budget_gte', 'budget_lte', 'created_before',
+                      'near', 'radius', 'limit')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            return queryset
+
+        # ?status=OPEN&category=Ремонт&created_before=<ISO datetime>; status and
+        # category may be repeated. Together they match the api_task_feed_idx index.
+        params = self.request.query_params
+        statuses = params.getlist('status')
+        if statuses:
+            unknown = set(statuses) - set(Task.Status.values)
+            if unknown:
+                raise serializers.ValidationError({'status': f'Неизвестный статус: {", ".join(sorted(unknown))}.'})
+            queryset = queryset.filter(status__in=statuses)
+        categories = params.getlist('category')
+        if categories:
+            queryset = queryset.filter(category__in=categories)
+        client_id = params.get('client')
+        if client_id and client_id.isdigit():
+            queryset = queryset.filter(client_id=client_id)
+
+        # ?budget_gte / ?budget_lte keep tasks whose budget range overlaps the requested one
+        budget_gte = self._budget_param(params, 'budget_gte')
+        if budget_gte is not None:
+            queryset = queryset.filter(
+                Q(budget_max__gte=budget_gte) | Q(budget_max__isnull=True, budget_min__isnull=False)
+            )
+        budget_lte = self._budget_param(params, 'budget_lte')
+        if budget_lte is not None:
+            queryset = queryset.filter(budget_min__lte=budget_lte)
+
+        created_before = params.get('created_before')
+        if created_before:
+            moment = parse_datetime(created_before)
+            if moment is None:
+                raise serializers.ValidationError({'created_before': 'Ожидается дата и время в формате ISO 8601.'})
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment)
+            queryset = queryset.filter(created_at__lt=moment)
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            # Finished tasks move to the archive after a while (api/archive.py)
+            archived = get_object_or_404(ArchivedTask, pk=self.kwargs[self.lookup_field])
+            return Response(ArchivedTaskSerializer(archived, context=self.get_serializer_context()).data)
+
+    @action(detail=True, methods=['get'])
+    def responses(self, request, pk=None):
+        """Responses to one task, oldest first: all of them for the owner, otherwise only the caller's own."""
+        task = self.get_object()
+        queryset = TaskResponse.objects.filter(task=task).select_related('specialist__user')
+        if task.client_id != request.user.id and not request.user.is_staff:
+            queryset = queryset.filter(specialist__user=request.user)
+
+        paginator = TaskResponseCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = TaskResponseSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @staticmethod
+    def _budget_param(params, name):
+        value = params.get(name)
+        if value in (None, ''):
+            return None
+        if not value.isdigit():
+            raise serializers.ValidationError({name: 'Ожидается целое число (UZS).'})
+        return int(value)
 
     def get_permissions(self):
-        if self.action == 'create':
+        if self.action in ['create', 'responses']:
             return [permissions.IsAuthenticated()]
         if self.action in ['update', 'partial_update', 'destroy']:
             return [permissions.IsAuthenticated(), IsTaskOwnerOrAdmin()]
@@ -132,7 +335,16 @@ class TaskViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         if self.request.user.role != User.Role.CLIENT:
             raise serializers.ValidationError("Только заказчики могут создавать задания.")
-        serializer.save(client=self.request.user)
+        task = serializer.save(client=self.request.user)
+        transaction.on_commit(lambda: self._schedule_matching(task.id))
+
+    @staticmethod
+    def _schedule_matching(task_id):
+        from .tasks import match_task_specialists
+        try:
+            match_task_specialists.delay(task_id)
+        except Exception as e:
+            logger.error("Failed to schedule specialist matching for task %s (is Redis running?): %s", task_id, e)
 
 
 class TaskResponseViewSet(viewsets.ModelViewSet):
@@ -144,12 +356,26 @@ class TaskResponseViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if user.role == 'CLIENT':
             # Clients see responses to THEIR tasks
-            return TaskResponse.objects.filter(task__client=user)
+            return TaskResponse.objects.filter(task__client=user).select_related('specialist__user')
         elif hasattr(user, 'specialist_profile'):
             # Specialists see responses THEY made
-            return TaskResponse.objects.filter(specialist=user.specialist_profile)
+            return TaskResponse.objects.filter(specialist=user.specialist_profile).select_related('specialist__user')
         return TaskResponse.objects.none()
 
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            user = request.user
+            if user.role == 'CLIENT':
+                archived = ArchivedTaskResponse.objects.filter(task__client=user)
+            elif hasattr(user, 'specialist_profile'):
+                archived = ArchivedTaskResponse.objects.filter(specialist=user.specialist_profile)
+            else:
+                raise
+            response = get_object_or_404(archived, pk=self.kwargs[self.lookup_field])
+            return Response(ArchivedTaskResponseSerializer(response, context=self.get_serializer_context()).data)
+
     def perform_create(self, serializer):
         # Create response as the current specialist
         if not hasattr(self.request.user, 'specialist_profile'):
@@ -162,43 +388,22 @@ class TaskResponseViewSet(viewsets.ModelViewSet):
             raise serializers.ValidationError("Нельзя откликаться на собственное задание.")
         if task.status != Task.Status.OPEN:
             raise serializers.ValidationError("Можно откликаться только на открытые задания.")
-        if TaskResponse.objects.filter(task=task, specialist=specialist).exists():
-            raise serializers.ValidationError("Вы уже откликались на это задание.")
-        
-        # Free vs Paid business logic logic goes here
-        RESPONSE_FEE = 5000 # 5,000 UZS
-        
-        if specialist.balance < RESPONSE_FEE:
+
+        # Paid response: the fee debit, its ledger row and the response commit together.
+        # A second response to the same task hits uniq_task_response and rolls the fee back.
+        try:
+            with transaction.atomic():
+                response_obj = serializer.save(specialist=specialist)
+                charge_response_fee(specialist)
+                # The client hears about it in the next digest email (api/notifications.py)
+                enqueue_response_notification(response_obj)
+        except InsufficientFunds:
             raise serializers.ValidationError({"error": "INSUFFICIENT_FUNDS", "message": "Недостаточно средств. Пожалуйста, пополните баланс."})
-            
-        # Deduct balance
-        specialist.balance -= RESPONSE_FEE
-        specialist.save(update_fields=['balance'])
-        
-        from .models import Transaction
-        Transaction.objects.create(
-            user=self.request.user,
-            amount=RESPONSE_FEE,
-            transaction_type=Transaction.Type.RESPONSE_FEE,
-            status=Transaction.Status.SUCCESS,
-            description="Оплата за отклик на задание"
-        )
-        
-        response_obj = serializer.save(specialist=specialist)
-        
-        # Trigger async email notification
-        from .tasks import send_notification_email
-        client_email = response_obj.task.client.email
-        if client_email:
-            try:
-                send_notification_email.delay(
-                    subject=f"Новый отклик на ваше задание: {response_obj.task.title}",
-                    message=f"Здравствуйте!\n\nСпециалист {specialist.user.get_full_name()} откликнулся на ваше задание '{response_obj.task.title}'.\n\nЕго цена: {response_obj.price} UZS\nСообщение: {response_obj.message}\n\nЗайдите в личный кабинет, чтобы ответить.",
-                    recipient_list=[client_email]
-                )
-            except Exception as e:
-                import logging
-                logging.error("Failed to send notification email (is Redis running?): %s", e)
+        except IntegrityError:
+            # Only a clash on uniq_task_response means "already responded"; anything else is a real error
+            if not TaskResponse.objects.filter(task=task, specialist=specialist).exists():
+                raise
+            raise serializers.ValidationError("Вы уже откликались на это задание.")
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAuthenticated])
     def accept(self, request, pk=None):
@@ -211,7 +416,7 @@ class TaskResponseViewSet(viewsets.ModelViewSet):
             
         task.assigned_specialist = response.specialist
         task.status = Task.Status.IN_PROGRESS # Set to in progress
-        task.save()
+        task.save(update_fields=['assigned_specialist', 'status'])
         
         return Response({"status": "accepted", "task_id": task.id})
 
@@ -229,9 +434,64 @@ class MessageViewSet(viewsets.ModelViewSet):
     def get_throttles(self):
         if self.action == 'create':
             self.throttle_scope = 'chat_http_send'
-            return [ScopedRateThrottle()]
+            return [AtomicScopedRateThrottle()]
         return []
 
+    @action(detail=False, methods=['get'])
+    def conversations(self, request):
+        """One row per counterpart with the last message and unread count, most recent first."""
+        queryset = Conversation.objects.filter(owner=request.user).select_related(
+            'counterpart', 'last_message__sender', 'last_message__receiver',
+        )
+        paginator = ConversationCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = ConversationSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """
+        One conversation, newest first: ``?counterpart=<user id>[&task=<id>]``,
+        then follow ``next`` (``before=<oldest message id>``) to scroll back.
+        """
+        params = request.query_params
+        counterpart_id = self._int_param(params, 'counterpart')
+        if counterpart_id is None:
+            raise serializers.ValidationError({'counterpart': 'Укажите собеседника.'})
+        task_id = self._int_param(params, 'task')
+        before = self._int_param(params, 'before')
+        limit = min(self._int_param(params, 'page_size') or HISTORY_PAGE_SIZE, HISTORY_MAX_PAGE_SIZE)
+
+        messages, has_more = message_history(request.user.id, counterpart_id, task_id=task_id, before=before,
+                                             limit=limit)
+        next_url = None
+        if has_more:
+            next_url = replace_query_param(request.build_absolute_uri(), 'before', messages[-1].id)
+        serializer = MessageSerializer(messages, many=True, context=self.get_serializer_context())
+        return Response({'next': next_url, 'results': serializer.data})
+
+    @action(detail=False, methods=['post'])
+    def read(self, request):
+        """Mark the conversation with ``counterpart`` read up to and including message ``up_to``."""
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        counterpart_id, up_to = serializer.validated_data['counterpart'], serializer.validated_data['up_to']
+
+        updated, unread = mark_read(request.user.id, counterpart_id, up_to)
+        if updated:
+            publish_read_receipt(request.user.id, counterpart_id, up_to)
+        return Response({'updated': updated, 'unread_count': unread})
+
+    @staticmethod
+    def _int_param(params, name):
+        value = params.get(name)
+        if value in (None, ''):
+            return None
+        value = str(value)
+        if not value.isdigit():
+            raise serializers.ValidationError({name: 'Ожидается целое число.'})
+        return int(value)
+
     def _broadcast_message(self, msg: Message):
         """Push a saved message to both participants via personal WS groups."""
         channel_layer = get_channel_layer()
@@ -294,6 +554,27 @@ class MessageViewSet(viewsets.ModelViewSet):
         serializer.save()
 
 
+class FacetsView(APIView):
+    """Counts per category, verified flag and price bucket for specialists and open tasks."""
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        return Response(get_facets())
+
+
+class SuggestView(APIView):
+    """Typeahead: /api/suggest/?q=сан&limit=10 → categories, tags and specialist names."""
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', typeahead.DEFAULT_LIMIT))
+        except ValueError:
+            limit = typeahead.DEFAULT_LIMIT
+        limit = min(max(limit, 1), typeahead.MAX_LIMIT)
+        return Response(typeahead.typeahead_index.suggest(request.query_params.get('q', ''), limit))
+
+
 class AIAnalyzeView(APIView):
     permission_classes = [permissions.AllowAny]
     
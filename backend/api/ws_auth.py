@@ -0,0 +1,139 @@
+"""
+WebSocket handshake authentication without the database.
+
+The access token's signature and expiry prove who the client is, so the
+connect path trusts its user_id claim. What the token cannot tell us is
+whether the account was deactivated or the session revoked after it was
+issued. Those answers live in the cache and are read with one get_many:
+
+* ``ws_user:<id>``: a short-lived snapshot of the account (is_active,
+  role). It is dropped by the User post_save signal, and a miss is the
+  only time connect touches the database.
+* ``ws_revoked:<jti>``: set at logout for the access token that made
+  the request, until that token would have expired anyway.
+* ``ws_revoked_before:<id>``: the user's revocation generation, bumped
+  by a password reset. A login copies the current value into the refresh
+  token's ``revocation_gen`` claim (rotation and access tokens inherit
+  it), and tokens from an older generation are refused. No clocks are
+  compared, so a login in the same second as the reset still connects.
+  Tokens without the claim fall back to their whole-second iat.
+
+A reconnect storm after a deploy is then served from the cache.
+"""
+import time
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+GENERATION_CLAIM = 'revocation_gen'
+
+
+class WebSocketUser:
+    """The authenticated principal of a socket: ids and role, not a model instance."""
+    is_authenticated = True
+    is_anonymous = False
+    is_active = True
+
+    def __init__(self, user_id, role=None):
+        self.id = self.pk = user_id
+        self.role = role
+
+    def __repr__(self):
+        return f'<WebSocketUser {self.id}>'
+
+
+def _snapshot_key(user_id):
+    return f'ws_user:{user_id}'
+
+
+def _revoked_token_key(jti):
+    return f'ws_revoked:{jti}'
+
+
+def _revoked_before_key(user_id):
+    return f'ws_revoked_before:{user_id}'
+
+
+def _snapshot_ttl():
+    return max(getattr(settings, 'WS_AUTH_SNAPSHOT_TTL_SECONDS', 300), 1)
+
+
+def _access_lifetime_seconds():
+    return int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+
+
+@database_sync_to_async
+def load_user_snapshot(user_id):
+    row = User.objects.filter(pk=user_id).values('is_active', 'role').first()
+    # A deleted account is cached as inactive too, so it cannot be used to hammer the database
+    snapshot = row or {'is_active': False, 'role': None}
+    cache.set(_snapshot_key(user_id), snapshot, timeout=_snapshot_ttl())
+    return snapshot
+
+
+def forget_user_snapshot(user_id):
+    cache.delete(_snapshot_key(user_id))
+
+
+def _now_ms():
+    return time.time_ns() // 1_000_000
+
+
+def stamp_revocation_generation(refresh, user_id):
+    """Tie a new login to the user's current generation; call before deriving the access token."""
+    refresh[GENERATION_CLAIM] = cache.get(_revoked_before_key(user_id), 0)
+    return refresh
+
+
+def revoke_access_token(token):
+    """Refuse this access token on future socket connects (logout)."""
+    remaining = int(token['exp'] - time.time())
+    if remaining > 0:
+        cache.set(_revoked_token_key(token[api_settings.JTI_CLAIM]), True, timeout=remaining)
+
+
+def revoke_user_tokens(user_id):
+    """Refuse every access token issued to the user so far (password reset)."""
+    key = _revoked_before_key(user_id)
+    # Epoch ms keeps generations increasing even if the key was evicted meanwhile
+    generation = max(_now_ms(), cache.get(key, 0) + 1)
+    cache.set(key, generation, timeout=_access_lifetime_seconds())
+
+
+async def authenticate_ws_token(token_string):
+    """The WebSocketUser for a valid, unrevoked token of an active account, else AnonymousUser."""
+    try:
+        token = AccessToken(token_string)
+        user_id = int(token[api_settings.USER_ID_CLAIM])
+        jti = token[api_settings.JTI_CLAIM]
+    except (TokenError, KeyError, TypeError, ValueError):
+        return AnonymousUser()
+
+    keys = [_snapshot_key(user_id), _revoked_token_key(jti), _revoked_before_key(user_id)]
+    cached = await cache.aget_many(keys)
+    if _revoked_token_key(jti) in cached:
+        return AnonymousUser()
+    revoked_before = cached.get(_revoked_before_key(user_id))
+    if revoked_before is not None:
+        generation = token.get(GENERATION_CLAIM)
+        if generation is None:
+            stale = token.get('iat', 0) * 1000 <= revoked_before
+        else:
+            stale = generation < revoked_before
+        if stale:
+            return AnonymousUser()
+
+    snapshot = cached.get(_snapshot_key(user_id))
+    if snapshot is None:
+        snapshot = await load_user_snapshot(user_id)
+    if not snapshot['is_active']:
+        return AnonymousUser()
+    return WebSocketUser(user_id, snapshot['role'])
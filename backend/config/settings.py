@@ -2,6 +2,7 @@ from pathlib import Path
 import os
 import environ
 from datetime import timedelta
+from celery.schedules import crontab
 from django.core.exceptions import ImproperlyConfigured
 
 # Initialize environ
@@ -142,6 +143,16 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Tashkent'
+CELERY_BEAT_SCHEDULE = {
+    'archive-finished-tasks': {
+        'task': 'api.tasks.archive_finished_tasks',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    'flush-response-digests': {
+        'task': 'api.tasks.flush_response_digests',
+        'schedule': 60.0,
+    },
+}
 
 # ---------------------------------------------------------------------------
 # Database
@@ -258,12 +269,42 @@ REST_FRAMEWORK = {
     },
 }
 
+# ---------------------------------------------------------------------------
+# Public catalog snapshots (anonymous specialist/task lists, see api/catalog.py)
+# ---------------------------------------------------------------------------
+CATALOG_SNAPSHOT_TTL = env.int('CATALOG_SNAPSHOT_TTL', default=300)
+# In-process typeahead index is rebuilt in the background this often so every worker converges (api/typeahead.py)
+TYPEAHEAD_REBUILD_SECONDS = env.int('TYPEAHEAD_REBUILD_SECONDS', default=300)
+
+# ---------------------------------------------------------------------------
+# New task -> specialist matching (Celery, see api/matching.py)
+# ---------------------------------------------------------------------------
+TASK_MATCH_MAX_SPECIALISTS = env.int('TASK_MATCH_MAX_SPECIALISTS', default=500)
+TASK_MATCH_BATCH_SIZE = env.int('TASK_MATCH_BATCH_SIZE', default=100)
+TASK_MATCH_RADIUS_KM = env.int('TASK_MATCH_RADIUS_KM', default=25)
+
+# ---------------------------------------------------------------------------
+# Task archive (nightly Celery beat job, see api/archive.py)
+# ---------------------------------------------------------------------------
+TASK_ARCHIVE_AFTER_DAYS = env.int('TASK_ARCHIVE_AFTER_DAYS', default=180)
+TASK_ARCHIVE_BATCH_SIZE = env.int('TASK_ARCHIVE_BATCH_SIZE', default=500)
+
+# ---------------------------------------------------------------------------
+# New-response digest emails (outbox flushed every minute, see api/notifications.py)
+# ---------------------------------------------------------------------------
+RESPONSE_DIGEST_WINDOW_SECONDS = env.int('RESPONSE_DIGEST_WINDOW_SECONDS', default=300)
+
 # ---------------------------------------------------------------------------
 # WebSocket Chat Limits
 # ---------------------------------------------------------------------------
 CHAT_WS_RATE_LIMIT = env.int('CHAT_WS_RATE_LIMIT', default=30)
 CHAT_WS_RATE_WINDOW_SECONDS = env.int('CHAT_WS_RATE_WINDOW_SECONDS', default=10)
+CHAT_WS_READ_RATE_LIMIT = env.int('CHAT_WS_READ_RATE_LIMIT', default=60)
 CHAT_WS_MAX_TEXT_LENGTH = env.int('CHAT_WS_MAX_TEXT_LENGTH', default=2000)
+# Cached task chat rules and receiver lookups (api/chat_rules.py); invalidated on change
+CHAT_RULES_CACHE_TTL_SECONDS = env.int('CHAT_RULES_CACHE_TTL_SECONDS', default=300)
+# Cached account snapshot for socket handshakes (api/ws_auth.py); dropped when the user is saved
+WS_AUTH_SNAPSHOT_TTL_SECONDS = env.int('WS_AUTH_SNAPSHOT_TTL_SECONDS', default=300)
 
 # ---------------------------------------------------------------------------
 # Simple JWT — production-ready settings
@@ -2,6 +2,8 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 import uuid
+from django.db import transaction as db_transaction
+from api.balance import credit
 from api.models import Transaction
 
 class CreateTransactionView(APIView):
@@ -47,7 +49,7 @@ class CreateTransactionView(APIView):
 
 from django.conf import settings
 from decimal import Decimal
-from api.models import Transaction, SpecialistProfile
+from api.models import Transaction
 import base64
 
 class PaymeWebhookView(APIView):
@@ -137,13 +139,12 @@ class PaymeWebhookView(APIView):
                  })
                  
             if txn.status == Transaction.Status.PENDING:
-                txn.status = Transaction.Status.SUCCESS
-                txn.save(update_fields=['status'])
-                
-                # Credit specialist
-                profile = txn.user.specialist_profile
-                profile.balance += Decimal(str(txn.amount))
-                profile.save(update_fields=['balance'])
+                # Flip PENDING -> SUCCESS and credit in one commit; a concurrent retry credits nothing
+                with db_transaction.atomic():
+                    if Transaction.objects.filter(pk=txn.pk, status=Transaction.Status.PENDING).update(
+                        status=Transaction.Status.SUCCESS
+                    ):
+                        credit(txn.user.specialist_profile, txn.amount)
                 
                 return Response({
                      "jsonrpc": "2.0",
@@ -237,13 +238,11 @@ class ClickWebhookView(APIView):
                  })
 
             if txn.status == Transaction.Status.PENDING:
-                txn.status = Transaction.Status.SUCCESS
-                txn.gateway_transaction_id = click_trans_id
-                txn.save(update_fields=['status', 'gateway_transaction_id'])
-                
-                profile = txn.user.specialist_profile
-                profile.balance += txn.amount
-                profile.save(update_fields=['balance'])
+                with db_transaction.atomic():
+                    if Transaction.objects.filter(pk=txn.pk, status=Transaction.Status.PENDING).update(
+                        status=Transaction.Status.SUCCESS, gateway_transaction_id=click_trans_id
+                    ):
+                        credit(txn.user.specialist_profile, txn.amount)
                 
                 return Response({
                     "click_trans_id": click_trans_id,
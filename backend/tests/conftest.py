@@ -0,0 +1,35 @@
+import pytest
+from django.core.cache import cache
+
+from api.models import SpecialistProfile, User
+from api.typeahead import typeahead_index
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    # Catalog snapshots and other cached state must not leak between tests.
+    cache.clear()
+    typeahead_index.reset()
+    yield
+    cache.clear()
+    typeahead_index.reset()
+
+
+@pytest.fixture
+def make_user(db):
+    """Factory: ``make_user('alice', role='SPECIALIST', first_name='Alice')``."""
+    def make(username, role=User.Role.CLIENT, **fields):
+        return User.objects.create_user(username=username, email=f'{username}@test.com',
+                                        password='password123', role=role, **fields)
+    return make
+
+
+@pytest.fixture
+def make_specialist(make_user):
+    """Factory for a specialist account with its profile; extra keywords go to the profile."""
+    def make(username, first_name='', last_name='', category='Ремонт', price_start=50000,
+             description='Test specialist', **fields):
+        user = make_user(username, role=User.Role.SPECIALIST, first_name=first_name, last_name=last_name)
+        return SpecialistProfile.objects.create(user=user, category=category, price_start=price_start,
+                                                description=description, **fields)
+    return make
@@ -0,0 +1,79 @@
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+from django.db import OperationalError, connection
+from rest_framework.test import APIClient
+
+from api.balance import InsufficientFunds, RESPONSE_FEE, charge_response_fee, debit
+from api.models import Transaction
+
+
+@pytest.mark.django_db
+def test_debit_writes_ledger_row_and_refuses_overdraft(make_specialist):
+    profile = make_specialist('ledger_single', balance=7000)
+
+    charge_response_fee(profile)
+    with pytest.raises(InsufficientFunds):
+        charge_response_fee(profile)
+
+    profile.refresh_from_db()
+    assert profile.balance == Decimal(7000) - RESPONSE_FEE
+    assert Transaction.objects.filter(user=profile.user, transaction_type=Transaction.Type.RESPONSE_FEE).count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_debits_lose_no_updates(make_specialist):
+    threads_count, attempts_per_thread = 8, 25
+    # Enough for 150 debits of 10 UZS; the other 50 attempts must be refused
+    profile = make_specialist('ledger_stress', balance=1500)
+    results = {'ok': 0, 'refused': 0}
+    lock = threading.Lock()
+    start = threading.Barrier(threads_count)
+
+    def worker():
+        start.wait()
+        try:
+            for _ in range(attempts_per_thread):
+                while True:
+                    try:
+                        debit(profile, 10, Transaction.Type.RESPONSE_FEE)
+                        outcome = 'ok'
+                    except InsufficientFunds:
+                        outcome = 'refused'
+                    except OperationalError:
+                        # The shared-cache SQLite test DB reports contention instead of
+                        # waiting; the attempt was rolled back, so just try it again.
+                        time.sleep(0.001)
+                        continue
+                    break
+                with lock:
+                    results[outcome] += 1
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    profile.refresh_from_db()
+    ledger = Transaction.objects.filter(user=profile.user)
+    assert results == {'ok': 150, 'refused': 50}
+    assert profile.balance == 0
+    assert ledger.count() == 150
+    assert sum(row.amount for row in ledger) == 1500
+
+
+@pytest.mark.django_db
+def test_refunds_are_not_counted_as_earnings(make_specialist):
+    profile = make_specialist('ledger_refund')
+    for transaction_type, amount in ((Transaction.Type.TOP_UP, 20000), (Transaction.Type.REFUND, 5000)):
+        Transaction.objects.create(user=profile.user, amount=amount, transaction_type=transaction_type,
+                                   status=Transaction.Status.SUCCESS)
+    api_client = APIClient()
+    api_client.force_authenticate(user=profile.user)
+
+    assert api_client.get('/api/specialists/my-stats/').data['total_earnings'] == 20000
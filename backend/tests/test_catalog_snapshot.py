@@ -0,0 +1,87 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import Task
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def specialist(make_specialist):
+    return make_specialist('catalog_spec', first_name='Каталог', description='Catalog specialist')
+
+
+@pytest.mark.django_db
+def test_repeat_anonymous_request_gets_304_without_db(api_client, specialist):
+    first = api_client.get('/api/specialists/')
+    assert first.status_code == 200
+    etag = first['ETag']
+
+    with CaptureQueriesContext(connection) as queries:
+        cached = api_client.get('/api/specialists/')
+        revalidated = api_client.get('/api/specialists/', HTTP_IF_NONE_MATCH=etag)
+
+    assert cached.status_code == 200
+    assert cached.content == first.content
+    assert revalidated.status_code == 304
+    assert len(queries.captured_queries) == 0
+
+
+@pytest.mark.django_db
+def test_snapshot_is_invalidated_by_profile_and_user_changes(api_client, specialist):
+    etag = api_client.get('/api/specialists/')['ETag']
+
+    specialist.description = 'Updated'
+    specialist.save()
+    after_profile = api_client.get('/api/specialists/', HTTP_IF_NONE_MATCH=etag)
+    assert after_profile.status_code == 200
+    assert after_profile.json()['results'][0]['description'] == 'Updated'
+
+    specialist.user.first_name = 'Новое'
+    specialist.user.save(update_fields=['first_name'])
+    after_user = api_client.get('/api/specialists/', HTTP_IF_NONE_MATCH=after_profile['ETag'])
+    assert after_user.status_code == 200
+    assert after_user.json()['results'][0]['name'] == 'Новое'
+
+
+@pytest.mark.django_db
+def test_task_snapshot_tracks_new_tasks(api_client, make_user):
+    client = make_user('catalog_client')
+    assert api_client.get('/api/tasks/').json()['results'] == []
+
+    Task.objects.create(client=client, title='Fresh task', description='d', category='Ремонт')
+
+    assert [task['title'] for task in api_client.get('/api/tasks/').json()['results']] == ['Fresh task']
+
+
+@pytest.mark.django_db
+def test_authenticated_requests_bypass_snapshot(api_client, specialist):
+    api_client.force_authenticate(user=specialist.user)
+
+    response = api_client.get('/api/specialists/')
+
+    assert response.status_code == 200
+    assert 'ETag' not in response
+
+
+@pytest.mark.django_db
+def test_junk_and_reordered_params_share_one_snapshot(api_client, specialist):
+    first = api_client.get('/api/specialists/?tag=a&tag=b&page_size=5')
+    assert first.status_code == 200
+
+    with CaptureQueriesContext(connection) as queries:
+        reordered = api_client.get('/api/specialists/?page_size=5&tag=b&tag=a')
+        junk = api_client.get('/api/specialists/?tag=a&utm_source=x&tag=b&page_size=5&_=123')
+
+    assert reordered.content == first.content
+    assert junk.content == first.content
+    assert len(queries.captured_queries) == 0
+
+    with CaptureQueriesContext(connection) as queries:
+        api_client.get('/api/specialists/?tag=a&page_size=5')
+    assert len(queries.captured_queries) > 0
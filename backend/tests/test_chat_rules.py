@@ -0,0 +1,59 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.chat_rules import RECEIVER_NOT_FOUND, TASK_CHAT_FORBIDDEN, TASK_NOT_FOUND, check_chat_send
+from api.consumers import create_message
+from api.models import Message, SpecialistProfile, Task, TaskResponse
+
+
+def _respond(task, user):
+    profile = SpecialistProfile.objects.create(user=user, category='Ремонт', price_start=50000, description='d')
+    return TaskResponse.objects.create(task=task, specialist=profile, message='hi', price=1000)
+
+
+@pytest.fixture
+def task(make_user):
+    return Task.objects.create(client=make_user('rules_client'), title='t', description='d', category='Ремонт')
+
+
+@pytest.mark.django_db
+def test_steady_state_send_is_a_single_message_insert(task, make_user):
+    specialist = make_user('rules_spec', role='SPECIALIST')
+    _respond(task, specialist)
+    client = task.client
+    send = async_to_sync(create_message)
+
+    assert 'message' in send(client, specialist.id, task.id, 'warm up')
+    with CaptureQueriesContext(connection) as ctx:
+        result = send(client, specialist.id, task.id, 'second')
+
+    assert result['message']['task_id'] == task.id
+    assert not [q for q in ctx.captured_queries if q['sql'].startswith('SELECT')]
+    inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT')]
+    assert len(inserts) == 1 and '"api_message"' in inserts[0]['sql']
+
+
+@pytest.mark.django_db
+def test_new_response_and_owner_change_invalidate_cached_rules(task, make_user):
+    client = task.client
+    specialist = make_user('late_spec', role='SPECIALIST')
+
+    assert check_chat_send(client.id, specialist.id, task.id) == TASK_CHAT_FORBIDDEN
+    _respond(task, specialist)
+    assert check_chat_send(client.id, specialist.id, task.id) is None
+
+    task.client = make_user('new_owner')
+    task.save(update_fields=['client'])
+    assert check_chat_send(client.id, specialist.id, task.id) == TASK_CHAT_FORBIDDEN
+    assert check_chat_send(task.client_id, specialist.id, task.id) is None
+
+
+@pytest.mark.django_db
+def test_missing_receiver_and_task_are_reported(task, make_user):
+    assert check_chat_send(task.client_id, 999999) == RECEIVER_NOT_FOUND
+    other = make_user('other')
+    assert check_chat_send(task.client_id, other.id, 999999) == TASK_NOT_FOUND
+    assert async_to_sync(create_message)(task.client, 999999, None, 'hi')['error'] == RECEIVER_NOT_FOUND
+    assert not Message.objects.exists()
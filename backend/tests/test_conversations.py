@@ -0,0 +1,91 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.conversations import rebuild_conversations
+from api.models import Conversation, Message
+
+
+@pytest.fixture
+def me(make_user):
+    return make_user('me')
+
+
+@pytest.mark.django_db
+def test_one_row_per_counterpart_with_last_message_and_unread(me, make_user):
+    alice, bob = make_user('alice', first_name='Alice'), make_user('bob', first_name='Bob')
+    Message.objects.create(sender=alice, receiver=me, text='a1')
+    Message.objects.create(sender=me, receiver=alice, text='a2')
+    Message.objects.create(sender=alice, receiver=me, text='a3')
+    Message.objects.create(sender=bob, receiver=me, text='b1')
+    api_client = APIClient()
+    api_client.force_authenticate(user=me)
+
+    rows = api_client.get('/api/messages/conversations/').data['results']
+
+    assert [row['counterpart'] for row in rows] == [bob.id, alice.id]
+    assert rows[0]['counterpart_name'] == 'Bob'
+    assert rows[1]['last_message']['text'] == 'a3'
+    assert [row['unread_count'] for row in rows] == [1, 2]
+
+
+@pytest.mark.django_db
+def test_marking_read_recounts_unread(me, make_user):
+    alice = make_user('alice')
+    first = Message.objects.create(sender=alice, receiver=me, text='1')
+    Message.objects.create(sender=alice, receiver=me, text='2')
+    api_client = APIClient()
+    api_client.force_authenticate(user=me)
+
+    api_client.patch(f'/api/messages/{first.id}/', {'is_read': True}, format='json')
+
+    assert Conversation.objects.get(owner=me, counterpart=alice).unread_count == 1
+    assert Conversation.objects.get(owner=alice, counterpart=me).unread_count == 0
+
+
+@pytest.mark.django_db
+def test_rebuild_matches_incremental_rows(me, make_user):
+    alice, bob = make_user('alice'), make_user('bob')
+    Message.objects.create(sender=alice, receiver=me, text='1')
+    Message.objects.create(sender=me, receiver=bob, text='2', is_read=True)
+    Message.objects.create(sender=bob, receiver=me, text='3')
+    fields = ('owner_id', 'counterpart_id', 'last_message_id', 'unread_count', 'updated_at')
+    before = sorted(Conversation.objects.values_list(*fields))
+
+    assert rebuild_conversations() == 4
+    assert sorted(Conversation.objects.values_list(*fields)) == before
+
+
+@pytest.mark.django_db
+def test_query_count_does_not_grow_with_conversations(me, make_user):
+    api_client = APIClient()
+    api_client.force_authenticate(user=me)
+
+    def list_queries():
+        with CaptureQueriesContext(connection) as ctx:
+            assert api_client.get('/api/messages/conversations/').status_code == 200
+        return len(ctx.captured_queries)
+
+    Message.objects.create(sender=make_user('first'), receiver=me, text='hi')
+    baseline = list_queries()
+    for i in range(5):
+        Message.objects.create(sender=make_user(f'other{i}'), receiver=me, text='hi')
+    assert list_queries() == baseline
+
+
+@pytest.mark.django_db
+def test_pages_walk_every_conversation_once_despite_equal_timestamps(me, make_user):
+    for i in range(5):
+        Message.objects.create(sender=make_user(f'tie{i}'), receiver=me, text='hi')
+    Conversation.objects.filter(owner=me).update(updated_at=Conversation.objects.filter(owner=me).first().updated_at)
+    api_client = APIClient()
+    api_client.force_authenticate(user=me)
+
+    seen, url, params = [], '/api/messages/conversations/', {'page_size': 2}
+    while url:
+        page = api_client.get(url, params).data
+        seen += [row['counterpart'] for row in page['results']]
+        url, params = page['next'], None
+
+    assert len(seen) == len(set(seen)) == 5
@@ -0,0 +1,49 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import Task, User
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.mark.django_db
+def test_facet_counts(api_client, make_specialist):
+    make_specialist('facet_a', category='Ремонт', price_start=30000, is_verified=True)
+    make_specialist('facet_b', category='Ремонт', price_start=150000)
+    make_specialist('facet_c', category='Уборка', price_start=500000)
+    client = User.objects.create_user(username='facet_client', email='facet_client@test.com',
+                                      password='password123', role='CLIENT')
+    Task.objects.create(client=client, title='Open', description='d', category='Уборка')
+    Task.objects.create(client=client, title='Done', description='d', category='Уборка',
+                        status=Task.Status.COMPLETED)
+
+    data = api_client.get('/api/facets/').data
+
+    specialists = data['specialists']
+    assert specialists['total'] == 3
+    assert specialists['category']['Ремонт'] == 2
+    assert specialists['category']['Спорт'] == 0
+    assert specialists['verified'] == {'true': 1, 'false': 2}
+    assert {bucket['key']: bucket['count'] for bucket in specialists['price']} == {
+        '0-50000': 1, '50000-100000': 0, '100000-200000': 1, '200000+': 1,
+    }
+    assert data['tasks']['total'] == 1
+    assert data['tasks']['category']['Уборка'] == 1
+
+
+@pytest.mark.django_db
+def test_facets_are_cached_until_catalog_changes(api_client, make_specialist):
+    make_specialist('facet_cached', category='Ремонт', price_start=30000)
+    api_client.get('/api/facets/')
+
+    with CaptureQueriesContext(connection) as queries:
+        api_client.get('/api/facets/')
+    assert len(queries.captured_queries) == 0
+
+    make_specialist('facet_new', category='Ремонт', price_start=30000)
+    assert api_client.get('/api/facets/').data['specialists']['total'] == 2
@@ -0,0 +1,91 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api import geo
+from api.models import SpecialistProfile, Task, User
+
+TASHKENT = (41.311081, 69.240562)
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+def test_covering_cells_contain_points_inside_radius():
+    lat, lng = TASHKENT
+    for radius_km in (0.3, 2, 5, 25):
+        cells = geo.covering_cells(lat, lng, radius_km)
+        assert len(cells) <= geo.MAX_COVERING_CELLS
+        # Probe points on the circle's boundary in eight directions.
+        d_lat = radius_km / geo.KM_PER_DEGREE * 0.99
+        d_lng = d_lat / 0.75
+        for p_lat, p_lng in [(lat + d_lat, lng), (lat - d_lat, lng), (lat, lng + d_lng), (lat, lng - d_lng),
+                             (lat + d_lat * 0.7, lng + d_lng * 0.7), (lat - d_lat * 0.7, lng - d_lng * 0.7)]:
+            if geo.haversine_km(lat, lng, p_lat, p_lng) <= radius_km:
+                point_hash = geo.encode(p_lat, p_lng)
+                assert any(point_hash.startswith(cell) for cell in cells)
+
+
+@pytest.mark.django_db
+def test_profile_geohash_tracks_coordinates(make_specialist):
+    profile = make_specialist('geo_hash', lat=TASHKENT[0], lng=TASHKENT[1])
+    assert profile.geohash == geo.encode(*TASHKENT)
+
+    profile.lat, profile.lng = None, None
+    profile.save(update_fields=['lat', 'lng'])
+    profile.refresh_from_db()
+    assert profile.geohash == ''
+
+
+@pytest.mark.django_db
+def test_specialists_near_are_sorted_by_distance(api_client, make_specialist):
+    lat, lng = TASHKENT
+    far = make_specialist('geo_far', lat=lat + 0.03, lng=lng)      # ~3.3 km
+    near = make_specialist('geo_near', lat=lat + 0.005, lng=lng)   # ~0.6 km
+    make_specialist('geo_outside', lat=lat + 0.2, lng=lng)         # ~22 km
+    make_specialist('geo_unknown')
+
+    response = api_client.get('/api/specialists/', {'near': f'{lat},{lng}', 'radius': 5})
+
+    assert response.status_code == 200
+    assert [row['id'] for row in response.json()['results']] == [near.id, far.id]
+    assert response.json()['results'][0]['distance_km'] < response.json()['results'][1]['distance_km'] <= 5
+
+
+@pytest.mark.django_db
+def test_tasks_near(api_client):
+    client = User.objects.create_user(username='geo_client', email='geo_client@test.com',
+                                      password='password123', role='CLIENT')
+    lat, lng = TASHKENT
+    task = Task.objects.create(client=client, title='Near task', description='d', category='Ремонт',
+                               lat=lat + 0.001, lng=lng + 0.001)
+    Task.objects.create(client=client, title='Far task', description='d', category='Ремонт',
+                        lat=lat + 1, lng=lng)
+
+    response = api_client.get('/api/tasks/', {'near': f'{lat},{lng}', 'radius': 1})
+
+    assert [row['id'] for row in response.json()['results']] == [task.id]
+
+
+@pytest.mark.django_db
+def test_near_rejects_bad_parameters(api_client):
+    assert api_client.get('/api/specialists/', {'near': 'abc'}).status_code == 400
+    assert api_client.get('/api/specialists/', {'near': '91,10'}).status_code == 400
+    assert api_client.get('/api/specialists/', {'near': '41,69', 'radius': 500}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_nearby_fetches_a_bounded_candidate_set(make_specialist):
+    lat, lng = TASHKENT
+    crowd = [make_specialist(f'geo_crowd_{i}', lat=lat + 0.001 * (i + 1), lng=lng - 0.001 * (i + 1))
+             for i in range(20)]
+
+    with CaptureQueriesContext(connection) as ctx:
+        hits = geo.nearby(SpecialistProfile.objects.all(), lat, lng, radius_km=50, limit=3)
+
+    assert [hit.id for hit in hits] == [profile.id for profile in crowd[:3]]
+    assert len(ctx.captured_queries) == 1
+    assert f'LIMIT {3 * geo.NEAR_CANDIDATE_FACTOR}' in ctx.captured_queries[0]['sql']
@@ -0,0 +1,88 @@
+import pytest
+from rest_framework.test import APIClient
+
+from api.map_tiles import rebuild_map_clusters
+from api.models import MapCluster
+
+TASHKENT_BBOX = '69.0,41.0,69.6,41.6'
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+def _snapshot():
+    return sorted(MapCluster.objects.values_list('precision', 'cell', 'category', 'count'))
+
+
+@pytest.mark.django_db
+def test_city_zoom_returns_one_cluster_with_centroid_and_top_category(api_client, make_specialist):
+    make_specialist('map_a', lat=41.30, lng=69.24)
+    make_specialist('map_b', lat=41.32, lng=69.26)
+    make_specialist('map_c', lat=41.31, lng=69.25, category='Уборка')
+
+    response = api_client.get('/api/specialists/map/', {'bbox': TASHKENT_BBOX, 'zoom': 5})
+
+    assert response.status_code == 200
+    [cluster] = response.data['clusters']
+    assert cluster['count'] == 3
+    assert cluster['top_category'] == 'Ремонт'
+    assert cluster['lat'] == pytest.approx(41.31)
+    assert cluster['lng'] == pytest.approx(69.25)
+
+
+@pytest.mark.django_db
+def test_high_zoom_returns_raw_points_inside_bbox(api_client, make_specialist):
+    inside = make_specialist('map_inside', lat=41.311, lng=69.241)
+    make_specialist('map_outside', lat=41.40, lng=69.40)
+
+    response = api_client.get('/api/specialists/map/', {'bbox': '69.23,41.30,69.25,41.32', 'zoom': 15})
+
+    assert [point['id'] for point in response.data['points']] == [inside.id]
+
+
+@pytest.mark.django_db
+def test_incremental_updates_match_full_rebuild(make_specialist):
+    moved = make_specialist('map_moved', lat=41.30, lng=69.24)
+    recategorized = make_specialist('map_recat', lat=41.31, lng=69.25)
+    deleted = make_specialist('map_deleted', lat=40.78, lng=72.35)
+
+    moved.lat, moved.lng = 39.65, 66.96
+    moved.save()
+    recategorized.category = 'Уборка'
+    recategorized.save(update_fields=['category'])
+    deleted.delete()
+
+    incremental = _snapshot()
+    rebuild_map_clusters()
+    assert incremental == _snapshot()
+    assert not MapCluster.objects.filter(cell__startswith='tx5').exists()  # the deleted Andijan point
+
+
+@pytest.mark.django_db
+def test_map_rejects_bad_bbox(api_client):
+    assert api_client.get('/api/specialists/map/', {'bbox': '1,2,3', 'zoom': 5}).status_code == 400
+    assert api_client.get('/api/specialists/map/', {'bbox': '69,42,70,41', 'zoom': 5}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_clusters_stop_at_the_precision_shown_before_raw_points(make_specialist):
+    make_specialist('map_precision', lat=41.30, lng=69.24)
+
+    assert MapCluster.objects.values_list('precision', flat=True).order_by('-precision').first() == 6
+
+
+@pytest.mark.django_db
+def test_profile_patch_only_looks_up_the_map_point_when_it_moves(api_client, monkeypatch, make_specialist):
+    profile = make_specialist('map_patch', lat=41.30, lng=69.24)
+    api_client.force_authenticate(user=profile.user)
+    lookups = []
+    monkeypatch.setattr('api.map_tiles.remember_map_point', lambda instance: lookups.append(instance.pk))
+
+    assert api_client.patch(f'/api/specialists/{profile.id}/', {'telegram': '@map'}, format='json').status_code == 200
+    assert lookups == []
+
+    assert api_client.patch(f'/api/specialists/{profile.id}/', {'lat': 39.65, 'lng': 66.96},
+                            format='json').status_code == 200
+    assert lookups == [profile.id]
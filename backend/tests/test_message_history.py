@@ -0,0 +1,83 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import Message, Task
+
+
+@pytest.fixture
+def pair(make_user):
+    return make_user('history_me'), make_user('history_them')
+
+
+@pytest.fixture
+def api_client(pair):
+    api_client = APIClient()
+    api_client.force_authenticate(user=pair[0])
+    return api_client
+
+
+def _chat(me, them, count):
+    return [
+        Message.objects.create(sender=me if i % 2 else them, receiver=them if i % 2 else me, text=str(i))
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+def test_history_pages_back_newest_first(pair, api_client, make_user):
+    me, them = pair
+    messages = _chat(me, them, 5)
+    Message.objects.create(sender=make_user('stranger'), receiver=me, text='elsewhere')
+
+    first = api_client.get('/api/messages/history/', {'counterpart': them.id, 'page_size': 3}).data
+    second = api_client.get(first['next']).data
+
+    assert [row['id'] for row in first['results']] == [m.id for m in messages[:1:-1]]
+    assert [row['id'] for row in second['results']] == [messages[1].id, messages[0].id]
+    assert second['next'] is None
+
+
+@pytest.mark.django_db
+def test_history_can_be_narrowed_to_a_task(pair, api_client):
+    me, them = pair
+    task = Task.objects.create(client=me, title='t', description='d', category='Ремонт')
+    _chat(me, them, 2)
+    on_task = Message.objects.create(sender=them, receiver=me, task=task, text='about the task')
+
+    response = api_client.get('/api/messages/history/', {'counterpart': them.id, 'task': task.id})
+
+    assert [row['id'] for row in response.data['results']] == [on_task.id]
+
+
+@pytest.mark.django_db
+def test_history_validates_params(pair, api_client):
+    assert api_client.get('/api/messages/history/').status_code == 400
+    assert api_client.get('/api/messages/history/', {'counterpart': 'x'}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_cursor_from_another_conversation_returns_nothing(pair, api_client, make_user):
+    me, them = pair
+    _chat(me, them, 2)
+    foreign = Message.objects.create(sender=make_user('a'), receiver=make_user('b'), text='private')
+
+    response = api_client.get('/api/messages/history/', {'counterpart': them.id, 'before': foreign.id})
+
+    assert response.data['results'] == []
+
+
+@pytest.mark.django_db
+def test_history_query_count_is_constant(pair, api_client):
+    me, them = pair
+
+    def page_queries():
+        with CaptureQueriesContext(connection) as ctx:
+            assert api_client.get('/api/messages/history/', {'counterpart': them.id}).status_code == 200
+        return len(ctx.captured_queries)
+
+    _chat(me, them, 2)
+    baseline = page_queries()
+    _chat(me, them, 10)
+    assert page_queries() == baseline
@@ -1,6 +1,7 @@
 import pytest
+from django.db import IntegrityError
 from rest_framework.test import APIClient
-from api.models import User, SpecialistProfile, Task, TaskResponse, Transaction
+from api.models import User, SpecialistProfile, Task, TaskResponse, Transaction, ResponseNotification
 from decimal import Decimal
 from unittest.mock import patch
 
@@ -81,8 +82,9 @@ def test_respond_task_success_deduces_fee(mock_delay, api_client, specialist_use
     txn = Transaction.objects.first()
     assert txn.amount == Decimal('5000.00')
     
-    # Check that celery task was called
-    assert mock_delay.called
+    # The client is notified through the digest outbox, not an immediate email
+    assert not mock_delay.called
+    assert ResponseNotification.objects.filter(client=task.client).count() == 1
 
 @pytest.mark.django_db
 def test_client_cannot_respond(api_client, client_user, task):
@@ -97,3 +99,40 @@ def test_client_cannot_respond(api_client, client_user, task):
     # Expect 403 or Validation Error
     assert response.status_code in [400, 403]
     assert 'Only specialists can respond' in str(response.data) or 'specialist_profile' in str(response.data)
+
+@pytest.mark.django_db
+@patch('api.tasks.send_notification_email.delay')
+def test_duplicate_response_rejected_without_second_fee(mock_delay, api_client, specialist_user, task):
+    specialist_user.specialist_profile.balance = Decimal('20000.00')
+    specialist_user.specialist_profile.save()
+    api_client.force_authenticate(user=specialist_user)
+    payload = {'task': task.id, 'message': 'I can do this!', 'price': 90000}
+
+    first = api_client.post('/api/responses/', payload)
+    second = api_client.post('/api/responses/', payload)
+
+    assert first.status_code == 201
+    assert second.status_code == 400
+    assert 'Вы уже откликались на это задание.' in str(second.data)
+    specialist_user.specialist_profile.refresh_from_db()
+    assert specialist_user.specialist_profile.balance == Decimal('15000.00')
+    assert TaskResponse.objects.count() == 1
+    assert Transaction.objects.filter(transaction_type=Transaction.Type.RESPONSE_FEE).count() == 1
+    task.refresh_from_db()
+    assert task.responses_count == 1
+
+
+@pytest.mark.django_db
+def test_unrelated_integrity_error_is_not_reported_as_duplicate(api_client, specialist_user, task, monkeypatch):
+    def broken_enqueue(response):
+        raise IntegrityError('some other constraint')
+
+    monkeypatch.setattr('api.views.enqueue_response_notification', broken_enqueue)
+    specialist_user.specialist_profile.balance = Decimal('20000.00')
+    specialist_user.specialist_profile.save()
+    api_client.force_authenticate(user=specialist_user)
+
+    with pytest.raises(IntegrityError):
+        api_client.post('/api/responses/', {'task': task.id, 'message': 'I can do this!', 'price': 90000})
+
+    assert TaskResponse.objects.count() == 0
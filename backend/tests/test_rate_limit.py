@@ -0,0 +1,82 @@
+import json
+import threading
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.testing import WebsocketCommunicator
+from django.test import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import rate_limit
+from api.consumers import ChatConsumer
+from api.models import User
+
+
+def test_local_limiter_allows_a_burst_then_spaces_requests():
+    results = [rate_limit.hit('test:burst', 2, 60) for _ in range(3)]
+
+    assert [allowed for allowed, _ in results] == [True, True, False]
+    assert 29 < results[2][1] <= 30
+
+
+def test_async_hit_shares_state_with_sync_hit():
+    assert rate_limit.hit('test:shared', 1, 60)[0]
+    allowed, retry_after = async_to_sync(rate_limit.ahit)('test:shared', 1, 60)
+    assert not allowed and retry_after > 0
+
+
+def test_async_local_hit_runs_off_the_event_loop(monkeypatch):
+    threads = []
+    local_hit = rate_limit._local_hit
+
+    def recording_hit(*args):
+        threads.append(threading.get_ident())
+        return local_hit(*args)
+
+    monkeypatch.setattr(rate_limit, '_local_hit', recording_hit)
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        await rate_limit.ahit('test:offloop', 5, 60)
+        return loop_thread
+
+    loop_thread = async_to_sync(scenario)()
+    assert threads and threads[0] != loop_thread
+
+
+def test_redis_backend_is_one_script_call(monkeypatch):
+    calls = []
+
+    def script(keys, args):
+        calls.append((keys, args))
+        return [0, 1500]
+
+    redis_cache = {'default': {'BACKEND': rate_limit.REDIS_BACKEND, 'LOCATION': 'redis://limiter:6379/0'}}
+    monkeypatch.setattr(rate_limit, '_sync_script', lambda location: script)
+    with override_settings(CACHES=redis_cache):
+        assert rate_limit.hit('chat_ws:7', 30, 10) == (False, 1.5)
+
+    assert calls == [([':1:rl:chat_ws:7'], [10000 / 30, 10000.0])]
+
+
+@pytest.mark.django_db
+@override_settings(CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}})
+def test_chat_socket_reports_retry_after(monkeypatch):
+    sender = User.objects.create_user(username='ws_rate_a', email='ws_rate_a@test.com', password='password123')
+    receiver = User.objects.create_user(username='ws_rate_b', email='ws_rate_b@test.com', password='password123')
+    monkeypatch.setattr('api.consumers.CHAT_WS_RATE_LIMIT', 1)
+
+    async def scenario():
+        communicator = WebsocketCommunicator(ChatConsumer.as_asgi(), f'/ws/chat/?token={AccessToken.for_user(sender)}')
+        assert (await communicator.connect())[0]
+
+        await communicator.send_to(text_data=json.dumps({'receiver_id': receiver.id, 'text': 'one'}))
+        assert 'message' in json.loads(await communicator.receive_from())
+        await communicator.send_to(text_data=json.dumps({'receiver_id': receiver.id, 'text': 'two'}))
+        limited = json.loads(await communicator.receive_from())
+        assert limited['error'] == 'RATE_LIMITED'
+        assert limited['retry_after_seconds'] == 10
+
+        await communicator.disconnect()
+
+    async_to_sync(scenario)()
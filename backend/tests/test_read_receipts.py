@@ -0,0 +1,105 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.testing import WebsocketCommunicator
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.consumers import ChatConsumer
+from api.models import Conversation, Message
+
+IN_MEMORY_LAYER = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@pytest.fixture
+def pair(make_user):
+    return make_user('reader'), make_user('writer')
+
+
+@pytest.mark.django_db
+def test_http_read_marks_up_to_watermark_in_one_update(pair, make_user):
+    reader, writer = pair
+    messages = [Message.objects.create(sender=writer, receiver=reader, text=str(i)) for i in range(4)]
+    other = Message.objects.create(sender=make_user('other'), receiver=reader, text='elsewhere')
+    api_client = APIClient()
+    api_client.force_authenticate(user=reader)
+
+    with CaptureQueriesContext(connection) as ctx:
+        response = api_client.post('/api/messages/read/', {'counterpart': writer.id, 'up_to': messages[2].id},
+                                   format='json')
+
+    assert response.data == {'updated': 3, 'unread_count': 1}
+    message_updates = [q['sql'] for q in ctx.captured_queries
+                       if q['sql'].startswith('UPDATE') and '"api_message"' in q['sql']]
+    assert len(message_updates) == 1
+    assert list(Message.objects.filter(is_read=True).values_list('id', flat=True).order_by('id')) == [
+        m.id for m in messages[:3]
+    ]
+    assert Conversation.objects.get(owner=reader, counterpart=writer).unread_count == 1
+    other.refresh_from_db()
+    assert not other.is_read
+
+
+@pytest.mark.django_db
+def test_http_read_requires_counterpart_and_watermark(pair):
+    api_client = APIClient()
+    api_client.force_authenticate(user=pair[0])
+
+    assert api_client.post('/api/messages/read/', {'counterpart': pair[1].id}, format='json').status_code == 400
+    assert api_client.post('/api/messages/read/', [pair[1].id, 1], format='json').status_code == 400
+
+
+@pytest.mark.django_db
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+def test_ws_read_receipt_reaches_the_sender(pair):
+    reader, writer = pair
+    message = Message.objects.create(sender=writer, receiver=reader, text='hi')
+
+    async def scenario():
+        reader_ws = WebsocketCommunicator(ChatConsumer.as_asgi(), f'/ws/chat/?token={AccessToken.for_user(reader)}')
+        writer_ws = WebsocketCommunicator(ChatConsumer.as_asgi(), f'/ws/chat/?token={AccessToken.for_user(writer)}')
+        assert (await reader_ws.connect())[0]
+        assert (await writer_ws.connect())[0]
+
+        await reader_ws.send_to(text_data=json.dumps({
+            'action': 'read', 'counterpart_id': writer.id, 'up_to': message.id,
+        }))
+        expected = {'read': {'reader_id': reader.id, 'counterpart_id': writer.id, 'up_to': message.id}}
+        assert json.loads(await writer_ws.receive_from()) == expected
+        assert json.loads(await reader_ws.receive_from()) == expected
+
+        await reader_ws.disconnect()
+        await writer_ws.disconnect()
+
+    async_to_sync(scenario)()
+
+    message.refresh_from_db()
+    assert message.is_read
+
+
+@pytest.mark.django_db
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+def test_ws_read_receipts_are_rate_limited(pair, monkeypatch):
+    monkeypatch.setattr('api.consumers.CHAT_WS_READ_RATE_LIMIT', 1)
+    reader, writer = pair
+    message = Message.objects.create(sender=writer, receiver=reader, text='hi')
+    receipt = json.dumps({'action': 'read', 'counterpart_id': writer.id, 'up_to': message.id})
+
+    async def scenario():
+        reader_ws = WebsocketCommunicator(ChatConsumer.as_asgi(), f'/ws/chat/?token={AccessToken.for_user(reader)}')
+        assert (await reader_ws.connect())[0]
+
+        await reader_ws.send_to(text_data=receipt)
+        assert 'read' in json.loads(await reader_ws.receive_from())
+        await reader_ws.send_to(text_data=receipt)
+        assert json.loads(await reader_ws.receive_from())['error'] == 'RATE_LIMITED'
+        await reader_ws.send_to(text_data='[1, 2]')
+        assert json.loads(await reader_ws.receive_from())['error'] == 'INVALID_JSON'
+
+        await reader_ws.disconnect()
+
+    async_to_sync(scenario)()
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.test import override_settings
+from django.utils import timezone
+
+from api.models import ResponseNotification, Task, TaskResponse
+from api.notifications import enqueue_response_notification, flush_response_digests
+
+
+@pytest.fixture
+def respond(make_specialist):
+    def make(task, index):
+        profile = make_specialist(f'digest_spec_{task.id}_{index}', first_name=f'Мастер {index}', description='d')
+        response = TaskResponse.objects.create(task=task, specialist=profile, message=f'Готов {index}', price=1000)
+        enqueue_response_notification(response)
+        return response
+    return make
+
+
+@pytest.mark.django_db
+@override_settings(RESPONSE_DIGEST_WINDOW_SECONDS=300)
+def test_responses_are_coalesced_into_one_digest_per_client(make_user, respond):
+    busy, quiet = make_user('digest_busy'), make_user('digest_quiet')
+    busy_task = Task.objects.create(client=busy, title='Popular', description='d', category='Ремонт')
+    quiet_task = Task.objects.create(client=quiet, title='Quiet', description='d', category='Ремонт')
+    for i in range(5):
+        respond(busy_task, i)
+    respond(quiet_task, 0)
+
+    assert flush_response_digests() == 0  # window still open
+    assert mail.outbox == []
+
+    later = timezone.now() + timedelta(seconds=301)
+    assert flush_response_digests(now=later) == 2
+
+    by_recipient = {message.to[0]: message for message in mail.outbox}
+    assert set(by_recipient) == {busy.email, quiet.email}
+    assert '(5)' in by_recipient[busy.email].subject
+    assert by_recipient[busy.email].body.count('«Popular»') == 5
+    assert not ResponseNotification.objects.exists()
+    assert flush_response_digests(now=later) == 0
+
+
+class _FailingConnection:
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        raise ConnectionError('smtp down')
+
+
+@pytest.mark.django_db
+@override_settings(RESPONSE_DIGEST_WINDOW_SECONDS=300)
+def test_failed_send_restores_the_rows_with_their_age(monkeypatch, make_user, respond):
+    client = make_user('digest_retry')
+    task = Task.objects.create(client=client, title='Retry', description='d', category='Ремонт')
+    for i in range(2):
+        respond(task, i)
+    ResponseNotification.objects.update(created_at=timezone.now() - timedelta(seconds=600))
+    before = dict(ResponseNotification.objects.values_list('id', 'created_at'))
+
+    monkeypatch.setattr('api.notifications.get_connection', lambda: _FailingConnection())
+    assert flush_response_digests() == 0
+    assert dict(ResponseNotification.objects.values_list('id', 'created_at')) == before
+
+    monkeypatch.undo()
+    assert flush_response_digests() == 1
+    assert not ResponseNotification.objects.exists()
+
+
+@pytest.mark.django_db
+@override_settings(RESPONSE_DIGEST_WINDOW_SECONDS=300)
+def test_clients_without_email_keep_their_rows(make_user, respond):
+    client = make_user('digest_no_email')
+    client.email = ''
+    client.save(update_fields=['email'])
+    task = Task.objects.create(client=client, title='Silent', description='d', category='Ремонт')
+    respond(task, 0)
+    later = timezone.now() + timedelta(seconds=301)
+
+    assert flush_response_digests(now=later) == 0
+    assert ResponseNotification.objects.filter(client=client).count() == 1
+
+    client.email = 'digest_no_email@test.com'
+    client.save(update_fields=['email'])
+    assert flush_response_digests(now=later) == 1
+    assert mail.outbox[0].to == ['digest_no_email@test.com']
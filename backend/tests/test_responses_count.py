@@ -0,0 +1,104 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import Task, TaskResponse, User
+
+
+@pytest.fixture
+def client_user(db):
+    return User.objects.create_user(username='count_client', email='count_client@test.com',
+                                    password='password123', role='CLIENT')
+
+
+@pytest.mark.django_db
+def test_responses_count_follows_creates_and_deletes(client_user, make_specialist):
+    task = Task.objects.create(client=client_user, title='Counted', description='d', category='Ремонт')
+    responses = [
+        TaskResponse.objects.create(task=task, specialist=make_specialist(f'count_spec_{i}'), message='hi', price=1000)
+        for i in range(3)
+    ]
+    task.refresh_from_db()
+    assert task.responses_count == 3
+
+    responses[0].delete()
+    task.refresh_from_db()
+    assert task.responses_count == 2
+
+
+@pytest.mark.django_db
+def test_rebuild_command_repairs_drift(client_user, make_specialist):
+    task = Task.objects.create(client=client_user, title='Drifted', description='d', category='Ремонт')
+    empty = Task.objects.create(client=client_user, title='Empty', description='d', category='Ремонт')
+    TaskResponse.objects.create(task=task, specialist=make_specialist('count_spec_0'), message='hi', price=1000)
+    Task.objects.update(responses_count=7)
+
+    call_command('rebuild_responses_count', batch_size=1)
+
+    task.refresh_from_db()
+    empty.refresh_from_db()
+    assert (task.responses_count, empty.responses_count) == (1, 0)
+
+
+@pytest.mark.django_db
+def test_task_feed_query_count_is_independent_of_page_size(client_user, make_specialist):
+    api_client = APIClient()
+    api_client.force_authenticate(user=client_user)
+    specialist = make_specialist('count_spec_0')
+
+    def add_tasks(count):
+        for _ in range(count):
+            task = Task.objects.create(client=client_user, title='Feed', description='d', category='Ремонт')
+            TaskResponse.objects.create(task=task, specialist=specialist, message='hi', price=1000)
+
+    add_tasks(2)
+    with CaptureQueriesContext(connection) as small:
+        api_client.get('/api/tasks/')
+    add_tasks(10)
+    with CaptureQueriesContext(connection) as large:
+        response = api_client.get('/api/tasks/')
+
+    assert [task['responses_count'] for task in response.data['results']][:2] == [1, 1]
+    assert len(large.captured_queries) == len(small.captured_queries)
+
+
+@pytest.mark.django_db
+def test_full_save_keeps_concurrent_count_changes(client_user, make_specialist):
+    task = Task.objects.create(client=client_user, title='Stale', description='d', category='Ремонт')
+    stale = Task.objects.get(pk=task.pk)
+    TaskResponse.objects.create(task=task, specialist=make_specialist('count_spec_0'), message='hi', price=1000)
+
+    stale.title = 'Renamed'
+    stale.save()
+
+    task.refresh_from_db()
+    assert (task.title, task.responses_count) == ('Renamed', 1)
+
+
+@pytest.mark.django_db
+def test_accept_does_not_overwrite_a_response_created_meanwhile(client_user, monkeypatch, make_specialist):
+    from api.views import TaskResponseViewSet
+
+    task = Task.objects.create(client=client_user, title='Accepting', description='d', category='Ремонт')
+    accepted = TaskResponse.objects.create(task=task, specialist=make_specialist('count_spec_0'), message='hi',
+                                           price=1000)
+    original_get_object = TaskResponseViewSet.get_object
+
+    def get_object_then_respond(view):
+        response = original_get_object(view)
+        response.task  # loaded with responses_count == 1
+        TaskResponse.objects.create(task=task, specialist=make_specialist('count_spec_1'), message='late', price=900)
+        return response
+
+    monkeypatch.setattr(TaskResponseViewSet, 'get_object', get_object_then_respond)
+    api_client = APIClient()
+    api_client.force_authenticate(user=client_user)
+
+    assert api_client.post(f'/api/responses/{accepted.id}/accept/').status_code == 200
+
+    task.refresh_from_db()
+    assert task.status == Task.Status.IN_PROGRESS
+    assert task.assigned_specialist_id == accepted.specialist_id
+    assert task.responses_count == 2
@@ -192,3 +192,15 @@ def test_chat_http_send_rate_limited(api_client, monkeypatch, client_user, speci
     assert r1.status_code == 201
     assert r2.status_code == 201
     assert r3.status_code == 429
+
+
+@pytest.mark.django_db
+def test_profile_update_cannot_set_balance(api_client, specialist_user):
+    profile = specialist_user.specialist_profile
+    api_client.force_authenticate(user=specialist_user)
+
+    response = api_client.patch(f'/api/specialists/{profile.id}/', {'balance': 999999999}, format='json')
+
+    assert response.status_code == 200
+    profile.refresh_from_db()
+    assert profile.balance == 100000
@@ -0,0 +1,69 @@
+import pytest
+from rest_framework.test import APIClient
+
+from api.models import Review, Task
+from api.serializers import SpecialistListSerializer, SpecialistProfileSerializer
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def specialist(make_specialist):
+    return make_specialist('sparse_spec', first_name='Sparse', description='Sparse specialist',
+                           tags=['Сантехник'], balance=70000)
+
+
+@pytest.mark.django_db
+def test_compact_list_matches_full_serializer_on_shared_fields(specialist):
+    compact = SpecialistListSerializer(specialist).data
+    full = SpecialistProfileSerializer(specialist).data
+
+    assert 'balance' not in compact
+    assert 'passport_image' not in compact
+    assert compact == {name: full[name] for name in compact}
+
+
+@pytest.mark.django_db
+def test_specialist_list_sparse_fields(api_client, specialist):
+    response = api_client.get('/api/specialists/', {'fields': 'id,name,unknown'})
+
+    assert response.json()['results'] == [{'id': specialist.id, 'name': 'Sparse'}]
+
+
+@pytest.mark.django_db
+def test_specialist_detail_keeps_full_representation(api_client, specialist):
+    response = api_client.get(f'/api/specialists/{specialist.id}/')
+
+    assert 'telegram' in response.data
+    assert 'description' in response.data
+
+
+@pytest.mark.django_db
+def test_task_and_review_sparse_fields(api_client, specialist, make_user):
+    client = make_user('sparse_client')
+    task = Task.objects.create(client=client, title='Sparse task', description='d', category='Ремонт')
+    Review.objects.create(specialist=specialist, author=client, task=task, text='Great')
+
+    tasks = api_client.get('/api/tasks/', {'fields': 'id,title'})
+    reviews = api_client.get('/api/reviews/', {'specialist': specialist.id, 'fields': 'text,score_overall'})
+
+    assert tasks.json()['results'] == [{'id': task.id, 'title': 'Sparse task'}]
+    assert reviews.json() == [{'text': 'Great', 'score_overall': 5}]
+
+
+@pytest.mark.django_db
+def test_fields_param_does_not_limit_writes(api_client, make_user):
+    client = make_user('sparse_writer')
+    api_client.force_authenticate(user=client)
+
+    response = api_client.post('/api/tasks/?fields=id', {
+        'title': 'Write',
+        'description': 'All fields still accepted',
+        'category': 'Ремонт',
+    }, format='json')
+
+    assert response.status_code == 201
+    assert response.data['title'] == 'Write'
@@ -0,0 +1,56 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def make_specialists(make_specialist):
+    def make(count, offset=0):
+        return [make_specialist(f'dir_spec_{i}', first_name=f'Spec{i}', description=f'Directory specialist {i}')
+                for i in range(offset, offset + count)]
+    return make
+
+
+@pytest.mark.django_db
+def test_specialist_list_is_cursor_paginated(api_client, make_specialists):
+    profiles = make_specialists(5)
+
+    response = api_client.get('/api/specialists/', {'page_size': 2})
+    assert response.status_code == 200
+    first = response.json()
+    assert [row['id'] for row in first['results']] == [profiles[4].id, profiles[3].id]
+    assert first['previous'] is None
+    assert first['next']
+
+    second = api_client.get(first['next'])
+    assert [row['id'] for row in second.json()['results']] == [profiles[2].id, profiles[1].id]
+
+
+@pytest.mark.django_db
+def test_specialist_list_query_count_is_constant(api_client, make_specialists):
+    make_specialists(2)
+    with CaptureQueriesContext(connection) as small:
+        api_client.get('/api/specialists/')
+
+    make_specialists(20, offset=2)
+    with CaptureQueriesContext(connection) as large:
+        response = api_client.get('/api/specialists/')
+
+    assert len(response.json()['results']) == 22
+    assert response.json()['results'][0]['name'] == 'Spec21'
+    assert len(large.captured_queries) == len(small.captured_queries)
+
+
+@pytest.mark.django_db
+def test_specialist_list_filters_by_user(api_client, make_specialists):
+    profiles = make_specialists(3)
+
+    response = api_client.get('/api/specialists/', {'user': profiles[1].user_id})
+
+    assert [row['id'] for row in response.json()['results']] == [profiles[1].id]
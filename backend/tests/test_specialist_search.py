@@ -0,0 +1,61 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.mark.django_db
+def test_search_matches_description_tags_and_name(api_client, make_specialist):
+    plumber = make_specialist('plumber', first_name='Алишер', description='Ремонт труб и смесителей',
+                              tags=['Сантехник', 'Трубы'])
+    tutor = make_specialist('tutor', first_name='Дилноза', description='Уроки английского языка', tags=['Английский'])
+
+    by_tag = api_client.get('/api/specialists/search/', {'q': 'сантех'})
+    by_name = api_client.get('/api/specialists/search/', {'q': 'Дилноза'})
+    by_description = api_client.get('/api/specialists/search/', {'q': 'смесител'})
+
+    assert [row['id'] for row in by_tag.data['results']] == [plumber.id]
+    assert [row['id'] for row in by_name.data['results']] == [tutor.id]
+    assert [row['id'] for row in by_description.data['results']] == [plumber.id]
+
+
+@pytest.mark.django_db
+def test_search_ranks_more_relevant_profiles_first(api_client, make_specialist):
+    weak = make_specialist('weak', first_name='Weak',
+                           description='Иногда чиню трубы, в основном крашу стены и кладу плитку')
+    strong = make_specialist('strong', first_name='Strong', description='Трубы', tags=['Трубы'])
+
+    response = api_client.get('/api/specialists/search/', {'q': 'трубы'})
+
+    assert response.data['count'] == 2
+    assert [row['id'] for row in response.data['results']] == [strong.id, weak.id]
+
+
+@pytest.mark.django_db
+def test_search_index_follows_profile_and_user_updates(api_client, make_specialist):
+    profile = make_specialist('mover', first_name='Тимур', description='Грузоперевозки', tags=['Переезд'])
+
+    profile.description = 'Сборка мебели'
+    profile.save()
+    profile.user.first_name = 'Рустам'
+    profile.user.save()
+
+    assert api_client.get('/api/specialists/search/', {'q': 'грузоперевозки'}).data['count'] == 0
+    assert api_client.get('/api/specialists/search/', {'q': 'мебели'}).data['count'] == 1
+    assert api_client.get('/api/specialists/search/', {'q': 'рустам'}).data['count'] == 1
+
+    profile.delete()
+    assert api_client.get('/api/specialists/search/', {'q': 'мебели'}).data['count'] == 0
+
+
+@pytest.mark.django_db
+def test_search_ignores_query_syntax(api_client, make_specialist):
+    make_specialist('quoted', first_name='Quoted', description='Plumbing')
+
+    response = api_client.get('/api/specialists/search/', {'q': '"plumb* OR) NEAR('})
+
+    assert response.status_code == 200
+    assert response.data['count'] == 0
@@ -0,0 +1,48 @@
+import pytest
+from rest_framework.test import APIClient
+
+from api.models import SpecialistTag
+from api.tags import MAX_FILTER_TAGS
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+def _ids(response):
+    return sorted(row['id'] for row in response.json()['results'])
+
+
+@pytest.mark.django_db
+def test_tag_links_follow_profile_tags(make_specialist):
+    profile = make_specialist('tag_sync', tags=['Сантехник', ' Трубы ', 'сантехник'])
+    assert set(SpecialistTag.objects.filter(profile=profile).values_list('name', flat=True)) == {'сантехник', 'трубы'}
+
+    profile.tags = ['Электрик']
+    profile.save(update_fields=['tags'])
+    assert list(SpecialistTag.objects.filter(profile=profile).values_list('name', flat=True)) == ['электрик']
+
+
+@pytest.mark.django_db
+def test_tag_filter_any_of_and_all_of(api_client, make_specialist):
+    plumber = make_specialist('tag_plumber', tags=['Сантехник', 'Трубы'])
+    electrician = make_specialist('tag_electrician', tags=['Электрик'])
+    make_specialist('tag_tutor', tags=['Английский'])
+
+    any_of = api_client.get('/api/specialists/', {'tag': ['трубы', 'ЭЛЕКТРИК']})
+    all_of = api_client.get('/api/specialists/', {'tag_all': ['Сантехник', 'Трубы']})
+    none = api_client.get('/api/specialists/', {'tag_all': ['Сантехник', 'Электрик']})
+
+    assert _ids(any_of) == sorted([plumber.id, electrician.id])
+    assert _ids(all_of) == [plumber.id]
+    assert _ids(none) == []
+
+
+@pytest.mark.django_db
+def test_too_many_filter_tags_is_rejected(api_client):
+    tags = [f'tag{i}' for i in range(MAX_FILTER_TAGS + 1)]
+
+    assert api_client.get('/api/specialists/', {'tag_all': tags}).status_code == 400
+    assert api_client.get('/api/specialists/', {'tag': tags}).status_code == 400
+    assert api_client.get('/api/specialists/', {'tag_all': tags[:MAX_FILTER_TAGS]}).status_code == 200
@@ -0,0 +1,160 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.db.models.deletion import Collector
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.archive import archive_finished_tasks
+from api.models import (
+    SET_NULL_UNLESS_ARCHIVED, ArchivedTask, ArchivedTaskResponse, Message, Review, Task, TaskResponse,
+)
+
+
+@pytest.fixture
+def client_user(make_user):
+    return make_user('archive_client')
+
+
+@pytest.fixture
+def specialist(make_specialist):
+    return make_specialist('archive_spec', description='d')
+
+
+def _make_task(client, status, age_days, title='Old task', finished_days_ago=None):
+    task = Task.objects.create(client=client, title=title, description='d', category='Ремонт', status=status)
+    created_at = timezone.now() - timedelta(days=age_days)
+    finished_at = task.finished_at and timezone.now() - timedelta(days=finished_days_ago or age_days)
+    Task.objects.filter(pk=task.pk).update(created_at=created_at, finished_at=finished_at)
+    return task
+
+
+@pytest.mark.django_db
+def test_only_old_finished_tasks_are_archived_in_batches(client_user, specialist):
+    old = [_make_task(client_user, Task.Status.COMPLETED, 400) for _ in range(3)]
+    canceled = _make_task(client_user, Task.Status.CANCELED, 400)
+    recent = _make_task(client_user, Task.Status.COMPLETED, 1)
+    still_open = _make_task(client_user, Task.Status.OPEN, 400)
+    TaskResponse.objects.create(task=old[0], specialist=specialist, message='hi', price=1000)
+
+    assert archive_finished_tasks(days=180, batch_size=2) == 4
+
+    assert set(Task.objects.values_list('id', flat=True)) == {recent.id, still_open.id}
+    assert set(ArchivedTask.objects.values_list('id', flat=True)) == {task.id for task in old} | {canceled.id}
+    assert ArchivedTask.objects.get(id=old[0].id).responses_count == 1
+    assert ArchivedTaskResponse.objects.filter(task_id=old[0].id).count() == 1
+    assert not TaskResponse.objects.exists()
+
+
+@pytest.mark.django_db
+def test_messages_and_reviews_keep_archived_task_id(client_user, specialist):
+    archived = _make_task(client_user, Task.Status.COMPLETED, 400)
+    deleted = _make_task(client_user, Task.Status.OPEN, 1, title='Deleted')
+    message = Message.objects.create(sender=client_user, receiver=specialist.user, task=archived, text='thanks')
+    review = Review.objects.create(specialist=specialist, author=client_user, task=archived, text='ok')
+    other = Message.objects.create(sender=client_user, receiver=specialist.user, task=deleted, text='bye')
+
+    archive_finished_tasks(days=180)
+    deleted.delete()
+
+    message.refresh_from_db()
+    review.refresh_from_db()
+    other.refresh_from_db()
+    assert message.task_id == archived.id
+    assert review.task_id == archived.id
+    assert other.task_id is None
+
+
+@pytest.mark.django_db
+def test_detail_endpoints_fall_back_to_archive(client_user, specialist, make_user):
+    task = _make_task(client_user, Task.Status.COMPLETED, 400)
+    response_obj = TaskResponse.objects.create(task=task, specialist=specialist, message='hi', price=1000)
+    archive_finished_tasks(days=180)
+    api_client = APIClient()
+
+    task_detail = api_client.get(f'/api/tasks/{task.id}/')
+    assert task_detail.status_code == 200
+    assert task_detail.data['title'] == 'Old task'
+    assert task_detail.data['archived_at'] is not None
+    assert api_client.get('/api/tasks/999999/').status_code == 404
+
+    api_client.force_authenticate(user=specialist.user)
+    response_detail = api_client.get(f'/api/responses/{response_obj.id}/')
+    assert response_detail.status_code == 200
+    assert response_detail.data['task'] == task.id
+
+    api_client.force_authenticate(user=make_user('archive_other'))
+    assert api_client.get(f'/api/responses/{response_obj.id}/').status_code == 404
+
+
+@pytest.mark.django_db
+def test_archived_task_ids_survive_when_the_collector_passes_rows(client_user, specialist):
+    archived = _make_task(client_user, Task.Status.COMPLETED, 400)
+    message = Message.objects.create(sender=client_user, receiver=specialist.user, task=archived, text='thanks')
+    archive_finished_tasks(days=180)
+    deleted = _make_task(client_user, Task.Status.OPEN, 1, title='Deleted')
+    other = Message.objects.create(sender=client_user, receiver=specialist.user, task=deleted, text='bye')
+
+    # Same handler, fed a list of loaded rows instead of a lazy queryset
+    collector = Collector(using='default')
+    SET_NULL_UNLESS_ARCHIVED(collector, Message._meta.get_field('task'), [message, other], 'default')
+    (field, value), querysets = next(iter(collector.field_updates.items()))
+    assert [m.id for qs in querysets for m in qs] == [other.id]
+
+    message.refresh_from_db()
+    assert message.task_id == archived.id
+    with pytest.raises(Task.DoesNotExist):
+        message.task
+
+
+@pytest.mark.django_db
+def test_my_stats_counts_archived_responses(client_user, specialist):
+    live = _make_task(client_user, Task.Status.OPEN, 1, title='Live')
+    done = _make_task(client_user, Task.Status.COMPLETED, 400)
+    TaskResponse.objects.create(task=live, specialist=specialist, message='hi', price=1000)
+    TaskResponse.objects.create(task=done, specialist=specialist, message='hi', price=1000)
+    Task.objects.filter(pk=done.pk).update(assigned_specialist=specialist)
+    archive_finished_tasks(days=180)
+    api_client = APIClient()
+    api_client.force_authenticate(user=specialist.user)
+
+    stats = api_client.get('/api/specialists/my-stats/').data
+
+    assert (stats['total_responses'], stats['accepted_responses'], stats['conversion_rate']) == (2, 1, 50.0)
+
+
+@pytest.mark.django_db
+def test_archive_age_counts_from_completion_not_creation(client_user, specialist):
+    long_running = _make_task(client_user, Task.Status.COMPLETED, 400, finished_days_ago=1)
+    task = _make_task(client_user, Task.Status.OPEN, 400)
+
+    task.status = Task.Status.CANCELED
+    task.save(update_fields=['status'])
+    task.refresh_from_db()
+    assert task.finished_at is not None
+
+    assert archive_finished_tasks(days=180) == 0
+    assert set(Task.objects.values_list('id', flat=True)) == {long_running.id, task.id}
+
+    task.status = Task.Status.OPEN
+    task.save()
+    task.refresh_from_db()
+    assert task.finished_at is None
+
+
+@pytest.mark.django_db
+def test_archive_batch_skips_per_row_delete_handlers(client_user, specialist, monkeypatch):
+    bumps = []
+    monkeypatch.setattr('api.archive.bump_catalog_version', lambda: bumps.append(1))
+    tasks = [_make_task(client_user, Task.Status.COMPLETED, 400) for _ in range(3)]
+    for task in tasks:
+        TaskResponse.objects.create(task=task, specialist=specialist, message='hi', price=1000)
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert archive_finished_tasks(days=180) == 3
+
+    assert bumps == [1]
+    assert not any(query['sql'].startswith('UPDATE') for query in ctx.captured_queries)
+    assert not TaskResponse.objects.exists() and ArchivedTaskResponse.objects.count() == 3
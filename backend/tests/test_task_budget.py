@@ -0,0 +1,51 @@
+import pytest
+from rest_framework.test import APIClient
+
+from api.budget import parse_budget
+from api.models import Task
+
+
+@pytest.fixture
+def client_user(make_user):
+    return make_user('budget_client')
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('100 000 UZS', (100_000, 100_000)),
+    ('100 000 - 200 000 UZS', (100_000, 200_000)),
+    ('от 50 000', (50_000, None)),
+    ('до 1,5 млн', (0, 1_500_000)),
+    ('200-300 тыс', (200_000, 300_000)),
+    ('150k', (150_000, 150_000)),
+    ('100.000 сум', (100_000, 100_000)),
+    ('Договорная', (None, None)),
+    ('', (None, None)),
+])
+def test_parse_budget(text, expected):
+    assert parse_budget(text) == expected
+
+
+@pytest.mark.django_db
+def test_budget_range_follows_budget_on_save(client_user):
+    task = Task.objects.create(client=client_user, title='t', description='d', category='Ремонт', budget='100 000 UZS')
+    assert (task.budget_min, task.budget_max) == (100_000, 100_000)
+
+    task.budget = 'от 300 тыс'
+    task.save(update_fields=['budget'])
+    task.refresh_from_db()
+    assert (task.budget_min, task.budget_max) == (300_000, None)
+
+
+@pytest.mark.django_db
+def test_feed_budget_filters(client_user):
+    for title, budget in [('Cheap', '50 000'), ('Range', '100 000 - 200 000'), ('Open', 'от 500 000'), ('Free', '')]:
+        Task.objects.create(client=client_user, title=title, description='d', category='Ремонт', budget=budget)
+    api_client = APIClient()
+
+    def titles(**params):
+        return sorted(task['title'] for task in api_client.get('/api/tasks/', params).json()['results'])
+
+    assert titles(budget_gte=150_000) == ['Open', 'Range']
+    assert titles(budget_lte=100_000) == ['Cheap', 'Range']
+    assert titles(budget_gte=60_000, budget_lte=120_000) == ['Range']
+    assert api_client.get('/api/tasks/', {'budget_gte': 'много'}).status_code == 400
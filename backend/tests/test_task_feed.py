@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import Task
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def client_user(make_user):
+    return make_user('feed_client')
+
+
+def _make_task(client, title, category='Ремонт', status=Task.Status.OPEN, age_minutes=0):
+    task = Task.objects.create(client=client, title=title, description='d', category=category, status=status)
+    if age_minutes:
+        Task.objects.filter(pk=task.pk).update(created_at=timezone.now() - timedelta(minutes=age_minutes))
+    return task
+
+
+def _titles(response):
+    return [task['title'] for task in response.json()['results']]
+
+
+@pytest.mark.django_db
+def test_feed_filters_by_status_and_category(api_client, client_user):
+    _make_task(client_user, 'Open repair')
+    _make_task(client_user, 'Open cleaning', category='Уборка')
+    _make_task(client_user, 'Done repair', status=Task.Status.COMPLETED)
+
+    response = api_client.get('/api/tasks/', {'status': 'OPEN', 'category': 'Ремонт'})
+    several = api_client.get('/api/tasks/', {'status': ['OPEN', 'COMPLETED'], 'category': 'Ремонт'})
+
+    assert _titles(response) == ['Open repair']
+    assert sorted(_titles(several)) == ['Done repair', 'Open repair']
+
+
+@pytest.mark.django_db
+def test_feed_created_before_and_cursor_pages(api_client, client_user):
+    for age in range(1, 6):
+        _make_task(client_user, f'Task {age}', age_minutes=age)
+    boundary = (timezone.now() - timedelta(minutes=2, seconds=30)).isoformat()
+
+    older = api_client.get('/api/tasks/', {'created_before': boundary})
+    first = api_client.get('/api/tasks/', {'page_size': 2}).json()
+    second = api_client.get(first['next']).json()
+
+    assert _titles(older) == ['Task 3', 'Task 4', 'Task 5']
+    assert [task['title'] for task in first['results']] == ['Task 1', 'Task 2']
+    assert [task['title'] for task in second['results']] == ['Task 3', 'Task 4']
+
+
+@pytest.mark.django_db
+def test_feed_rejects_bad_filters(api_client, client_user):
+    assert api_client.get('/api/tasks/', {'status': 'LOST'}).status_code == 400
+    assert api_client.get('/api/tasks/', {'created_before': 'yesterday'}).status_code == 400
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.test import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.consumers import TaskFeedConsumer
+from api.models import SpecialistProfile, Task, User
+from api.task_feed import category_group
+
+IN_MEMORY_LAYER = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+def test_category_groups_are_ascii():
+    assert category_group('Ремонт') == 'task_feed_REPAIR'
+    assert category_group('IT и фриланс') == 'task_feed_IT'
+    assert category_group('Unknown') is None
+
+
+@pytest.mark.django_db
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER)
+def test_subscribed_specialist_receives_new_tasks_and_status_changes(django_capture_on_commit_callbacks):
+    client = User.objects.create_user(username='feed_ws_client', email='feed_ws_client@test.com',
+                                      password='password123', role='CLIENT')
+    specialist = User.objects.create_user(username='feed_ws_spec', email='feed_ws_spec@test.com',
+                                          password='password123', role='SPECIALIST')
+    SpecialistProfile.objects.create(user=specialist, category='Ремонт', price_start=50000, description='d')
+    token = str(AccessToken.for_user(specialist))
+
+    @database_sync_to_async
+    def create_task(category, title):
+        with django_capture_on_commit_callbacks(execute=True):
+            return Task.objects.create(client=client, title=title, description='d', category=category)
+
+    @database_sync_to_async
+    def complete(task):
+        with django_capture_on_commit_callbacks(execute=True):
+            task.status = Task.Status.COMPLETED
+            task.save(update_fields=['status'])
+
+    async def scenario():
+        communicator = WebsocketCommunicator(TaskFeedConsumer.as_asgi(), f'/ws/tasks/?token={token}')
+        connected, _ = await communicator.connect()
+        assert connected
+
+        await communicator.send_to(text_data=json.dumps({'action': 'subscribe', 'categories': ['Ремонт']}))
+        assert json.loads(await communicator.receive_from()) == {'subscribed': ['Ремонт']}
+
+        await create_task('Уборка', 'Other category')
+        repair = await create_task('Ремонт', 'Fix the sink')
+        created = json.loads(await communicator.receive_from())
+        assert created['event'] == 'created'
+        assert created['task']['title'] == 'Fix the sink'
+
+        await complete(repair)
+        changed = json.loads(await communicator.receive_from())
+        assert (changed['event'], changed['task']['status']) == ('status', 'COMPLETED')
+        assert await communicator.receive_nothing()
+
+        await communicator.send_to(text_data=json.dumps({'action': 'subscribe', 'categories': ['Nope']}))
+        assert json.loads(await communicator.receive_from())['error'] == 'INVALID_CATEGORY'
+        await communicator.disconnect()
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db
+def test_feed_requires_token():
+    async def scenario():
+        communicator = WebsocketCommunicator(TaskFeedConsumer.as_asgi(), '/ws/tasks/')
+        connected, _ = await communicator.connect()
+        assert not connected
+
+    async_to_sync(scenario)()
+
+
+@pytest.mark.django_db
+def test_feed_rejects_users_without_specialist_profile():
+    client = User.objects.create_user(username='feed_ws_plain', email='feed_ws_plain@test.com',
+                                      password='password123', role='CLIENT')
+    token = str(AccessToken.for_user(client))
+
+    async def scenario():
+        communicator = WebsocketCommunicator(TaskFeedConsumer.as_asgi(), f'/ws/tasks/?token={token}')
+        connected, _ = await communicator.connect()
+        assert not connected
+
+    async_to_sync(scenario)()
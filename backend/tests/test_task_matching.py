@@ -0,0 +1,74 @@
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core import mail
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from api.matching import match_task, score_candidates
+from api.models import Task, User
+
+IN_MEMORY_LAYER = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@pytest.fixture
+def client_user(db):
+    return User.objects.create_user(username='match_client', email='match_client@test.com',
+                                    password='password123', role='CLIENT')
+
+
+def _make_task(client, **extra):
+    fields = {'title': 'Починить кран', 'description': 'Течёт смеситель, нужен сантехник', 'category': 'Ремонт'}
+    fields.update(extra)
+    return Task.objects.create(client=client, **fields)
+
+
+@pytest.mark.django_db
+def test_candidates_scored_by_category_tags_and_distance(client_user, make_specialist):
+    nearby_plumber = make_specialist('match_plumber', tags=['Сантехник'], lat=41.311, lng=69.241)
+    nearby_repair = make_specialist('match_repair', lat=41.32, lng=69.25)
+    tagged_other_category = make_specialist('match_other', category='Другое', tags=['сантехник'])
+    make_specialist('match_far', lat=39.65, lng=66.96)  # Samarkand, outside the radius
+    make_specialist('match_tutor', category='Репетиторы')
+
+    task = _make_task(client_user, lat=41.31, lng=69.24)
+    user_ids = [user_id for _score, user_id, _email in score_candidates(task)]
+
+    assert user_ids == [nearby_plumber.user_id, nearby_repair.user_id, tagged_other_category.user_id]
+
+
+@pytest.mark.django_db
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYER, TASK_MATCH_BATCH_SIZE=2)
+def test_matches_are_pushed_and_emailed_in_batches(client_user, make_specialist):
+    specialists = [make_specialist(f'match_batch_{i}') for i in range(3)]
+    channel_layer = get_channel_layer()
+    channel_name = async_to_sync(channel_layer.new_channel)()
+    async_to_sync(channel_layer.group_add)(f'user_{specialists[0].user_id}', channel_name)
+    task = _make_task(client_user)
+
+    assert match_task(task.id) == 3
+
+    event = async_to_sync(channel_layer.receive)(channel_name)
+    assert event['type'] == 'task_matched'
+    assert event['task']['id'] == task.id
+    assert len(mail.outbox) == 2
+    assert sorted(addr for message in mail.outbox for addr in message.bcc) == sorted(
+        s.user.email for s in specialists
+    )
+
+
+@pytest.mark.django_db
+def test_task_create_schedules_matching_after_commit(client_user, django_capture_on_commit_callbacks):
+    api_client = APIClient()
+    api_client.force_authenticate(user=client_user)
+
+    with mock.patch('api.tasks.match_task_specialists.delay') as delay:
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post('/api/tasks/', {
+                'title': 'Matched', 'description': 'd', 'category': 'Ремонт',
+            }, format='json')
+
+    assert response.status_code == 201
+    delay.assert_called_once_with(response.data['id'])
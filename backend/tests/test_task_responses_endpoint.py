@@ -0,0 +1,70 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import SpecialistProfile, Task, TaskResponse, User
+
+
+@pytest.fixture
+def client_user(db):
+    return User.objects.create_user(username='responses_client', email='responses_client@test.com',
+                                    password='password123', role='CLIENT')
+
+
+@pytest.fixture
+def task(client_user):
+    return Task.objects.create(client=client_user, title='Needs answers', description='d', category='Ремонт')
+
+
+def _respond(task, index):
+    user = User.objects.create_user(username=f'responder_{index}', email=f'responder_{index}@test.com',
+                                    password='password123', role='SPECIALIST', first_name=f'Мастер {index}')
+    profile = SpecialistProfile.objects.create(user=user, category='Ремонт', price_start=50000, description='d')
+    return TaskResponse.objects.create(task=task, specialist=profile, message=f'hi {index}', price=1000)
+
+
+@pytest.mark.django_db
+def test_owner_sees_all_responses_in_pages(client_user, task):
+    responses = [_respond(task, i) for i in range(3)]
+    api_client = APIClient()
+    api_client.force_authenticate(user=client_user)
+
+    first = api_client.get(f'/api/tasks/{task.id}/responses/', {'page_size': 2})
+    second = api_client.get(first.data['next'])
+
+    assert [row['id'] for row in first.data['results']] == [responses[0].id, responses[1].id]
+    assert first.data['results'][0]['specialistName'] == 'Мастер 0'
+    assert [row['id'] for row in second.data['results']] == [responses[2].id]
+
+
+@pytest.mark.django_db
+def test_other_users_only_see_their_own_response(task):
+    own = _respond(task, 0)
+    _respond(task, 1)
+    api_client = APIClient()
+
+    assert api_client.get(f'/api/tasks/{task.id}/responses/').status_code == 401
+
+    api_client.force_authenticate(user=own.specialist.user)
+    response = api_client.get(f'/api/tasks/{task.id}/responses/')
+    assert [row['id'] for row in response.data['results']] == [own.id]
+
+
+@pytest.mark.django_db
+def test_query_count_does_not_grow_with_responses(client_user, task):
+    api_client = APIClient()
+    api_client.force_authenticate(user=client_user)
+    url = f'/api/tasks/{task.id}/responses/'
+
+    for i in range(2):
+        _respond(task, i)
+    with CaptureQueriesContext(connection) as small:
+        api_client.get(url)
+    for i in range(2, 12):
+        _respond(task, i)
+    with CaptureQueriesContext(connection) as large:
+        response = api_client.get(url)
+
+    assert len(response.data['results']) == 12
+    assert len(large.captured_queries) == len(small.captured_queries)
@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from api.models import SpecialistProfile
+from api.typeahead import typeahead_index
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+def _labels(response):
+    return [(s['type'], s['label']) for s in response.data]
+
+
+@pytest.mark.django_db
+def test_suggest_matches_categories_tags_and_names(api_client, make_specialist):
+    make_specialist('ta_one', first_name='Алишер', last_name='Усманов', tags=['Сантехник', 'Сборка мебели'])
+    make_specialist('ta_two', first_name='Санжар', last_name='Каримов', tags=['Сантехник'])
+
+    response = api_client.get('/api/suggest/', {'q': 'Сан'})
+
+    assert _labels(response) == [('tag', 'Сантехник'), ('specialist', 'Санжар Каримов')]
+    assert response.data[0]['count'] == 2
+    assert _labels(api_client.get('/api/suggest/', {'q': 'мебел'})) == [('tag', 'Сборка мебели')]
+    assert _labels(api_client.get('/api/suggest/', {'q': 'усман'})) == [('specialist', 'Алишер Усманов')]
+    assert _labels(api_client.get('/api/suggest/', {'q': 'фриланс'})) == [('category', 'IT и фриланс')]
+
+
+@pytest.mark.django_db
+def test_suggest_updates_incrementally_without_db_reads(api_client, django_capture_on_commit_callbacks,
+                                                       make_specialist):
+    profile = make_specialist('ta_inc', first_name='Тимур', last_name='Ахмедов', tags=['Электрик'])
+    api_client.get('/api/suggest/', {'q': 'эл'})  # warm the index
+
+    with django_capture_on_commit_callbacks(execute=True):
+        profile.tags = ['Маляр']
+        profile.save(update_fields=['tags'])
+        profile.user.first_name = 'Рустам'
+        profile.user.save()
+
+    with CaptureQueriesContext(connection) as queries:
+        electric = api_client.get('/api/suggest/', {'q': 'элек'})
+        painter = api_client.get('/api/suggest/', {'q': 'мал'})
+        renamed = api_client.get('/api/suggest/', {'q': 'рус'})
+    assert len(queries.captured_queries) == 0
+
+    assert electric.data == []
+    assert _labels(painter) == [('tag', 'Маляр')]
+    assert _labels(renamed) == [('specialist', 'Рустам Ахмедов')]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        profile.delete()
+    assert api_client.get('/api/suggest/', {'q': 'мал'}).data == []
+
+
+@pytest.mark.django_db
+def test_rolled_back_save_leaves_no_phantom_entries(api_client, django_capture_on_commit_callbacks, make_specialist):
+    profile = make_specialist('ta_rollback', first_name='Олег', last_name='Ким', tags=['Электрик'])
+    api_client.get('/api/suggest/', {'q': 'эл'})  # warm the index
+
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                profile.tags = ['Кровельщик']
+                profile.save(update_fields=['tags'])
+                raise RuntimeError
+
+    assert api_client.get('/api/suggest/', {'q': 'кров'}).data == []
+    assert _labels(api_client.get('/api/suggest/', {'q': 'элек'})) == [('tag', 'Электрик')]
+
+
+@pytest.mark.django_db
+def test_stale_index_is_served_while_one_background_rebuild_runs(api_client, monkeypatch, settings, make_specialist):
+    make_specialist('ta_stale', first_name='Азиз', last_name='Назаров', tags=['Плиточник'])
+    api_client.get('/api/suggest/', {'q': 'пл'})  # warm the index
+    settings.TYPEAHEAD_REBUILD_SECONDS = 0
+    started, release, rebuilds = threading.Event(), threading.Event(), []
+
+    def slow_rebuild():
+        rebuilds.append(threading.current_thread().name)
+        started.set()
+        release.wait(5)
+        typeahead_index._loaded_at = time.monotonic()
+
+    monkeypatch.setattr(typeahead_index, 'rebuild', slow_rebuild)
+    time.sleep(0.01)
+
+    with CaptureQueriesContext(connection) as queries:
+        first = api_client.get('/api/suggest/', {'q': 'плит'})
+        second = api_client.get('/api/suggest/', {'q': 'плит'})
+    assert started.wait(5)
+    release.set()
+
+    assert _labels(first) == _labels(second) == [('tag', 'Плиточник')]
+    assert len(queries.captured_queries) == 0
+    assert rebuilds == ['typeahead-rebuild']
+
+
+@pytest.mark.django_db
+def test_edits_during_a_rebuild_survive_the_swap(api_client, monkeypatch, make_specialist):
+    profile = make_specialist('ta_race', first_name='Бахтиёр', last_name='Юсупов', tags=['Электрик'])
+    api_client.get('/api/suggest/', {'q': 'эл'})  # warm the index
+    values_list = SpecialistProfile.objects.values_list
+
+    class Snapshot(list):
+        def iterator(self):
+            return iter(self)
+
+    def read_then_edit(*fields):
+        rows = Snapshot(values_list(*fields))
+        # Committed after the rebuild read its rows: only the journal knows about it
+        typeahead_index._apply(profile.pk, 'Бахтиёр Юсупов', ['Маляр'])
+        return rows
+
+    monkeypatch.setattr(SpecialistProfile.objects, 'values_list', read_then_edit)
+    typeahead_index.rebuild()
+    monkeypatch.undo()
+
+    assert api_client.get('/api/suggest/', {'q': 'элек'}).data == []
+    assert _labels(api_client.get('/api/suggest/', {'q': 'мал'})) == [('tag', 'Маляр')]
+    assert typeahead_index._pending is None
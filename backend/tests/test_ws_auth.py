@@ -0,0 +1,77 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from api.auth_views import get_tokens_for_user
+from api.models import User
+from api.ws_auth import WebSocketUser, authenticate_ws_token, revoke_user_tokens
+
+authenticate = async_to_sync(authenticate_ws_token)
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(username='ws_auth_user', email='ws_auth@test.com', password='password123',
+                                    role='SPECIALIST')
+
+
+@pytest.mark.django_db
+def test_warm_handshake_does_not_query_the_database(user):
+    token = str(AccessToken.for_user(user))
+    assert isinstance(authenticate(token), WebSocketUser)
+
+    with CaptureQueriesContext(connection) as ctx:
+        principal = authenticate(token)
+
+    assert (principal.id, principal.role) == (user.id, 'SPECIALIST')
+    assert ctx.captured_queries == []
+
+
+@pytest.mark.django_db
+def test_deactivated_user_is_refused_despite_valid_token(user):
+    token = str(AccessToken.for_user(user))
+    assert isinstance(authenticate(token), WebSocketUser)
+
+    user.is_active = False
+    user.save(update_fields=['is_active'])
+
+    assert isinstance(authenticate(token), AnonymousUser)
+    assert isinstance(authenticate('not-a-token'), AnonymousUser)
+
+
+@pytest.mark.django_db
+def test_logout_revokes_the_access_token_for_sockets(user):
+    refresh = RefreshToken.for_user(user)
+    access = str(refresh.access_token)
+    api_client = APIClient()
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    assert api_client.post('/api/auth/logout/', {'refresh': str(refresh)}, format='json').status_code == 200
+
+    assert isinstance(authenticate(access), AnonymousUser)
+    assert isinstance(authenticate(str(AccessToken.for_user(user))), WebSocketUser)
+
+
+@pytest.mark.django_db
+def test_password_reset_revokes_earlier_tokens(user):
+    token = get_tokens_for_user(user)['access']
+
+    revoke_user_tokens(user.id)
+
+    assert isinstance(authenticate(token), AnonymousUser)
+
+
+@pytest.mark.django_db
+def test_login_right_after_password_reset_can_connect(user):
+    revoke_user_tokens(user.id)
+
+    tokens = get_tokens_for_user(user)
+
+    assert isinstance(authenticate(tokens['access']), WebSocketUser)
+    refreshed = APIClient().post('/api/auth/refresh/', {'refresh': tokens['refresh']}, format='json')
+    assert refreshed.status_code == 200
+    assert isinstance(authenticate(refreshed.data['access']), WebSocketUser)
@@ -31,6 +31,7 @@ interface AppContextType {
   sendMessage: (conversationId: string, text: string, media?: { url: string, type: 'image' }) => Promise<void>;
   startChat: (participantId: string) => void;
   markAsRead: (conversationId: string) => void;
+  loadConversationHistory: (conversationId: string) => Promise<void>;
   specialists: Specialist[];
   forgotPassword: (email: string) => Promise<void>;
   resetPassword: (token: string, password: string, passwordConfirm: string) => Promise<void>;
@@ -75,6 +76,33 @@ const sortConversations = (conversationList: Conversation[]): Conversation[] =>
 const sortMessages = (messages: Message[]): Message[] =>
   [...messages].sort((a, b) => a.timestamp - b.timestamp);
 
+const mergeMessages = (current: Message[], incoming: Message[]): Message[] => {
+  const byId = new Map(current.map((message) => [message.id, message]));
+  incoming.forEach((message) => byId.set(message.id, message));
+  return sortMessages(Array.from(byId.values()));
+};
+
+const mapApiMessage = (message: any): Message => ({
+  id: message.id.toString(),
+  senderId: message.sender.toString(),
+  text: message.text || '',
+  timestamp: new Date(message.created_at).getTime(),
+  isRead: Boolean(message.is_read),
+  mediaUrl: message.image || undefined,
+  mediaType: message.image ? 'image' : undefined,
+});
+
+// Follow DRF cursor pagination `next` links until the last page
+const fetchAllPages = async (url: string, params?: Record<string, any>): Promise<any[]> => {
+  const results: any[] = [];
+  let res = await api.get(url, { params });
+  while (true) {
+    if (Array.isArray(res.data?.results)) results.push(...res.data.results);
+    if (!res.data?.next) return results;
+    res = await api.get(res.data.next);
+  }
+};
+
 const getFallbackAvatar = (name: string): string =>
   `https://ui-avatars.com/api/?name=${encodeURIComponent(name || 'User')}`;
 
@@ -116,6 +144,8 @@ export const AppProvider: React.FC<{ children: React.ReactNode }> = ({ children
     description: t.description,
     category: t.category as ServiceCategory,
     budget: t.budget,
+    budgetMin: t.budget_min ?? null,
+    budgetMax: t.budget_max ?? null,
     location: t.location,
     date: t.date_info,
     status: t.status as TaskStatus,
@@ -164,47 +194,20 @@ export const AppProvider: React.FC<{ children: React.ReactNode }> = ({ children
     return sortConversations(updatedConversations);
   }, []);
 
-  const buildConversationsFromMessages = useCallback((messageList: any[]): Conversation[] => {
-    const conversationsMap = new Map<string, Conversation>();
-
-    messageList.forEach((message) => {
-      const isMe = Boolean(message.is_me);
-      const senderId = message.sender?.toString();
-      const receiverId = message.receiver?.toString();
-      if (!senderId || !receiverId) return;
-
-      const participantId = isMe ? receiverId : senderId;
-      if (!conversationsMap.has(participantId)) {
-        const participantName = (isMe ? message.receiver_name : message.sender_name) || 'Собеседник';
-        const participantAvatar = (isMe ? message.receiver_avatar : message.sender_avatar) || getFallbackAvatar(participantName);
-
-        conversationsMap.set(participantId, {
-          id: `conv_${participantId}`,
-          participantId,
-          participantName,
-          participantAvatar,
-          messages: [],
-        });
-      }
-
-      const conversation = conversationsMap.get(participantId)!;
-      conversation.messages.push({
-        id: message.id.toString(),
-        senderId,
-        text: message.text || '',
-        timestamp: new Date(message.created_at).getTime(),
-        isRead: Boolean(message.is_read),
-        mediaUrl: message.image || undefined,
-        mediaType: message.image ? 'image' : undefined,
-      });
+  const buildConversationsFromList = useCallback((rows: any[]): Conversation[] => {
+    // One row per counterpart from /messages/conversations/; the history is loaded when a chat is opened
+    const prepared = rows.map((row) => {
+      const participantId = row.counterpart.toString();
+      const participantName = row.counterpart_name || 'Собеседник';
+      return {
+        id: `conv_${participantId}`,
+        participantId,
+        participantName,
+        participantAvatar: row.counterpart_avatar || getFallbackAvatar(participantName),
+        messages: row.last_message ? [mapApiMessage(row.last_message)] : [],
+      };
     });
-
-    const preparedConversations = Array.from(conversationsMap.values()).map((conversation) => ({
-      ...conversation,
-      messages: sortMessages(conversation.messages),
-    }));
-
-    return sortConversations(preparedConversations);
+    return sortConversations(prepared);
   }, []);
 
   // ── WebSocket Setup ──────────────────────────────────────────────────
@@ -240,6 +243,33 @@ export const AppProvider: React.FC<{ children: React.ReactNode }> = ({ children
     if (!lastJsonMessage || !currentUser) return;
 
     const data = lastJsonMessage as any;
+    if (data?.task_match) {
+      // A new task matched this specialist; add it to the feed unless already there
+      const matched = mapTask(data.task_match);
+      setTasks((previousTasks) =>
+        previousTasks.some((task) => task.id === matched.id) ? previousTasks : [matched, ...previousTasks]
+      );
+      return;
+    }
+    if (data?.read) {
+      // Read receipt: the counterpart read our messages, or we read theirs in another tab
+      const readerId = data.read.reader_id?.toString();
+      const counterpartId = data.read.counterpart_id?.toString();
+      const upTo = Number(data.read.up_to);
+      const isMeReader = readerId === currentUser.id;
+      const participantId = isMeReader ? counterpartId : readerId;
+      const authorId = isMeReader ? counterpartId : currentUser.id;
+
+      setConversations((previousConversations) => previousConversations.map((conversation) =>
+        conversation.participantId !== participantId ? conversation : {
+          ...conversation,
+          messages: conversation.messages.map((message) =>
+            message.senderId === authorId && Number(message.id) <= upTo ? { ...message, isRead: true } : message
+          ),
+        }
+      ));
+      return;
+    }
     if (!data?.message) return;
 
     const incoming = data.message;
@@ -269,6 +299,42 @@ export const AppProvider: React.FC<{ children: React.ReactNode }> = ({ children
     );
   }, [lastJsonMessage, currentUser, findSpecialistByUserId, upsertConversationMessage]);
 
+  // ── Live task feed (specialists) ─────────────────────────────────────
+  const taskFeedUrl = currentUser?.role === UserRole.SPECIALIST && token ? `${WS_BASE_URL}/tasks/?token=${token}` : null;
+
+  const {
+    sendJsonMessage: sendTaskFeedMessage,
+    lastJsonMessage: lastTaskFeedMessage,
+    readyState: taskFeedReadyState,
+  } = useWebSocket(taskFeedUrl, {
+    shouldReconnect: () => !!currentUser,
+    reconnectInterval: 3000,
+  });
+
+  useEffect(() => {
+    // Subscribing without categories joins every category group
+    if (taskFeedReadyState === ReadyState.OPEN) {
+      sendTaskFeedMessage({ action: 'subscribe' });
+    }
+  }, [taskFeedReadyState, sendTaskFeedMessage]);
+
+  useEffect(() => {
+    const data = lastTaskFeedMessage as any;
+    if (!data?.event || !data?.task) return;
+
+    const taskId = data.task.id.toString();
+    if (data.event === 'deleted') {
+      setTasks((previousTasks) => previousTasks.filter((task) => task.id !== taskId));
+      return;
+    }
+    const feedTask = mapTask(data.task);
+    setTasks((previousTasks) =>
+      previousTasks.some((task) => task.id === taskId)
+        ? previousTasks.map((task) => (task.id === taskId ? { ...task, ...feedTask } : task))
+        : [feedTask, ...previousTasks]
+    );
+  }, [lastTaskFeedMessage]);
+
   // ── Init auth on mount ────────────────────────────────────────────────
   useEffect(() => {
     const initAuth = async () => {
@@ -299,8 +365,8 @@ export const AppProvider: React.FC<{ children: React.ReactNode }> = ({ children
 
     const fetchData = async () => {
       try {
-        const specRes = await api.get('/specialists/');
-        const specData = Array.isArray(specRes.data) ? specRes.data : [];
+        // Search, map, matching and favorites filter this list in memory, so load every page
+        const specData = await fetchAllPages('/specialists/', { page_size: 200 });
         setSpecialists(specData.map((s: any) => {
           const coords = getRandomCoords();
           return {
@@ -324,8 +390,12 @@ export const AppProvider: React.FC<{ children: React.ReactNode }> = ({ children
         }));
 
         const taskRes = await api.get('/tasks/');
-        const taskData = Array.isArray(taskRes.data) ? taskRes.data : [];
-        setTasks(taskData.map(mapTask));
+        const taskData = Array.isArray(taskRes.data?.results) ? taskRes.data.results : [];
+        // The feed is only its newest page; a client's own tasks are loaded in full
+        const ownTasks = currentUser ? await fetchAllPages('/tasks/', { client: currentUser.id }) : [];
+        const taskMap = new Map<string, Task>();
+        [...taskData, ...ownTasks].forEach((t: any) => taskMap.set(t.id.toString(), mapTask(t)));
+        setTasks(Array.from(taskMap.values()).sort((a, b) => b.createdAt - a.createdAt));
       } catch (error) {
         console.warn("Public data fetch failed", error);
       }
@@ -337,9 +407,9 @@ export const AppProvider: React.FC<{ children: React.ReactNode }> = ({ children
       }
 
       try {
-        const [responseRes, messageRes] = await Promise.all([
+        const [responseRes, conversationData] = await Promise.all([
           api.get('/responses/'),
-          api.get('/messages/'),
+          fetchAllPages('/messages/conversations/', { page_size: 100 }),
         ]);
 
         const responseData = Array.isArray(responseRes.data) ? responseRes.data : [];
@@ -356,15 +426,14 @@ export const AppProvider: React.FC<{ children: React.ReactNode }> = ({ children
           createdAt: r.created_at,
         })));
 
-        const messageData = Array.isArray(messageRes.data) ? messageRes.data : [];
-        setConversations(buildConversationsFromMessages(messageData));
+        setConversations(buildConversationsFromList(conversationData));
       } catch (error) {
         console.warn("Private data fetch failed", error);
       }
     };
 
     fetchData();
-  }, [isAuthLoading, currentUser?.id, buildConversationsFromMessages]);
+  }, [isAuthLoading, currentUser?.id, buildConversationsFromList]);
 
   const switchRole = () => {
     setRole(prev => prev === UserRole.CLIENT ? UserRole.SPECIALIST : UserRole.CLIENT);
@@ -769,10 +838,35 @@ export const AppProvider: React.FC<{ children: React.ReactNode }> = ({ children
       };
     }));
 
-    Promise.all(unreadIncoming.map((message) =>
-      api.patch(`/messages/${message.id}/`, { is_read: true }).catch(() => null)
-    )).catch(() => null);
-  }, [currentUser, conversations]);
+    // One read-up-to watermark instead of a PATCH per message
+    const upTo = Math.max(...unreadIncoming.map((message) => Number(message.id)));
+    if (sendJsonMessage && readyState === ReadyState.OPEN) {
+      sendJsonMessage({ action: 'read', counterpart_id: activeConversation.participantId, up_to: upTo });
+    } else {
+      api.post('/messages/read/', { counterpart: activeConversation.participantId, up_to: upTo }).catch(() => null);
+    }
+  }, [currentUser, conversations, sendJsonMessage, readyState]);
+
+  const loadConversationHistory = useCallback(async (conversationId: string) => {
+    const conversation = conversations.find((item) => item.id === conversationId);
+    if (!conversation || (conversation.historyLoaded && !conversation.historyNext)) return;
+
+    try {
+      // First call loads the newest page; later calls follow the cursor further back
+      const res = conversation.historyLoaded
+        ? await api.get(conversation.historyNext!)
+        : await api.get('/messages/history/', { params: { counterpart: conversation.participantId } });
+      const page = Array.isArray(res.data?.results) ? res.data.results.map(mapApiMessage) : [];
+
+      setConversations((previousConversations) => previousConversations.map((item) =>
+        item.id === conversationId
+          ? { ...item, messages: mergeMessages(item.messages, page), historyLoaded: true, historyNext: res.data?.next || null }
+          : item
+      ));
+    } catch (error) {
+      console.warn("Failed to load chat history", error);
+    }
+  }, [conversations]);
 
   const startChat = useCallback((participantId: string) => {
     if (!currentUser) return;
@@ -800,7 +894,7 @@ export const AppProvider: React.FC<{ children: React.ReactNode }> = ({ children
       deleteTask, currentUser, login, register, registerRequest, verifyEmail,
       registerSpecialist, logout, updateUser, toggleFavorite, conversations,
       chatConnectionStatus,
-      sendMessage, startChat, markAsRead, specialists,
+      sendMessage, startChat, markAsRead, loadConversationHistory, specialists,
       forgotPassword, resetPassword, resendVerification, updateProfile, isAuthLoading,
     }}>
       {children}
@@ -6,7 +6,7 @@ import { Send, Search, ArrowLeft, MoreVertical, Phone, Video, Info, Paperclip, X
 import { useSearchParams, useNavigate } from 'react-router-dom';
 
 export const MessagesPage: React.FC = () => {
-    const { conversations, currentUser, sendMessage, markAsRead, startChat, chatConnectionStatus } = useAppContext();
+    const { conversations, currentUser, sendMessage, markAsRead, loadConversationHistory, startChat, chatConnectionStatus } = useAppContext();
     const { t } = useLanguage();
     const [searchParams] = useSearchParams();
     const navigate = useNavigate();
@@ -48,6 +48,12 @@ export const MessagesPage: React.FC = () => {
         }
     }, [searchParams, conversations, selectedConversationId, currentUser, startChat]);
 
+    useEffect(() => {
+        // The conversation list only carries the last message; fetch the newest history page on open
+        const conversation = conversations.find(c => c.id === selectedConversationId);
+        if (conversation && !conversation.historyLoaded) loadConversationHistory(conversation.id);
+    }, [selectedConversationId, conversations, loadConversationHistory]);
+
     useEffect(() => {
         if (selectedConversationId && currentUser) {
             const conversation = conversations.find(c => c.id === selectedConversationId);
@@ -213,6 +219,16 @@ export const MessagesPage: React.FC = () => {
 
                         {/* Messages */}
                         <div className="flex-1 overflow-y-auto p-4 space-y-4 chat-bg">
+                            {selectedConversation.historyNext && (
+                                <div className="flex justify-center">
+                                    <button
+                                        onClick={() => loadConversationHistory(selectedConversation.id)}
+                                        className="text-xs text-fiverr-text-muted hover:text-fiverr-green px-3 py-1 rounded-full border border-fiverr-border transition-colors"
+                                    >
+                                        {t('loadOlderMessages') || 'Показать предыдущие сообщения'}
+                                    </button>
+                                </div>
+                            )}
                             {selectedConversation.messages.map((msg) => {
                                 const isMe = msg.senderId === currentUser.id;
                                 return (
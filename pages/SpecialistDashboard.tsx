@@ -95,9 +95,9 @@ export const SpecialistDashboard: React.FC = () => {
         if (filterCategory !== 'ALL' && t.category !== filterCategory) return false;
         if (filterCity !== 'ALL' && !t.location.includes(filterCity)) return false;
         if (minPrice) {
-            const taskPrice = parseInt(t.budget.replace(/\D/g, '')) || 0;
             const filterPriceVal = parseInt(minPrice) || 0;
-            if (taskPrice < filterPriceVal) return false;
+            if (t.budgetMin == null) return false;
+            if (t.budgetMax != null && t.budgetMax < filterPriceVal) return false;
         }
         if (aiAnalysis) {
             if (selectedTags.length > 0) {
@@ -155,8 +155,8 @@ export const SpecialistDashboard: React.FC = () => {
     const resolveSpecialistProfileId = async () => {
         if (currentUser?.specialistProfile?.id) return currentUser.specialistProfile.id;
 
-        const response = await api.get('/specialists/');
-        const specialists = Array.isArray(response.data) ? response.data : [];
+        const response = await api.get('/specialists/', { params: { user: currentUser?.id } });
+        const specialists = Array.isArray(response.data?.results) ? response.data.results : [];
         const match = specialists.find((specialist: any) => specialist.user?.toString() === currentUser?.id?.toString());
         return match ? match.id.toString() : null;
     };
@@ -76,6 +76,8 @@ export interface Task {
   description: string;
   category: ServiceCategory;
   budget: string;
+  budgetMin?: number | null; // Parsed from budget on the server, UZS
+  budgetMax?: number | null; // null for open-ended budgets ("от 50 000")
   location: string;
   date: string;
   status: TaskStatus;
@@ -114,4 +116,6 @@ export interface Conversation {
   participantName: string;
   participantAvatar: string;
   messages: Message[];
+  historyLoaded?: boolean; // true once the first history page was fetched
+  historyNext?: string | null; // URL of the next (older) history page
 }
\ No newline at end of file